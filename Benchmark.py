@@ -0,0 +1,178 @@
+import argparse
+import csv
+from dataclasses import asdict, dataclass, fields
+import json
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import Registry
+from SortingSteps import Opcode
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    Result of a single benchmark run.
+
+    Attributes
+    ----------
+    algorithm, initiator: str
+        Names of the sorting algorithm and the initiator (see Registry).
+    n: int
+        Size of the array that has been sorted.
+    seed: int
+        Seed of the random number generators for the batch of inputs and for the sorting algorithm.
+    sample, samples: int
+        Index of the input in the batch and number of inputs of the batch that has been created from the seed.
+    steps: int
+        Number of steps of the sorting process.
+    comparisons, swaps, replacements: int
+        Number of comparison, swap and replace steps.
+    time: float
+        Wall time for generating the trace (or counting the steps) in seconds.
+    peak_memory: int
+        Peak memory allocated while generating the trace (or counting the steps) in bytes, -1 if it has not been
+        measured.
+    """
+    algorithm: str
+    initiator: str
+    n: int
+    seed: int
+    sample: int
+    samples: int
+    steps: int
+    comparisons: int
+    swaps: int
+    replacements: int
+    time: float
+    peak_memory: int
+
+
+def run_benchmark(algorithm: str, initiator: str, n: int, seed: int | None = None,
+                  measure_memory: bool = True, count_only: bool = False) -> BenchmarkResult:
+    return run_benchmarks([algorithm], initiator, n, seed=seed, samples=1, measure_memory=measure_memory,
+                          count_only=count_only)[0]
+
+
+def run_benchmarks(algorithms: list[str], initiator: str, n: int, seed: int | None = None, samples: int = 1,
+                   measure_memory: bool = True, count_only: bool = False) -> list[BenchmarkResult]:
+    """
+    Benchmark sorting algorithms on a batch of inputs that are created at once by the initiator.
+
+    The batch is determined by the seed and the number of samples, which are recorded in every result together with
+    the index of the input, so every run can be reproduced. If no seed is given, a random seed is drawn.
+    """
+    if seed is None:
+        seed = int(np.random.SeedSequence().generate_state(1)[0])
+
+    # inputs of all samples
+    batch = Registry.InitializationAlgorithms[initiator].initiate_batch(samples, n, rng=np.random.default_rng(seed))
+
+    results = []
+    for sample, data in enumerate(batch):
+        for algorithm in algorithms:
+            results.append(_measure(algorithm, initiator, data, seed, sample, samples, measure_memory, count_only))
+
+    return results
+
+
+def _measure(algorithm: str, initiator: str, data: np.ndarray, seed: int, sample: int, samples: int,
+             measure_memory: bool, count_only: bool) -> BenchmarkResult:
+    sorter = Registry.SortingAlgorithms[algorithm]
+
+    # only count steps instead of recording a trace if requested
+    run = sorter.count if count_only else sorter.sort
+
+    # seed random number generator used by the sorting algorithms for every input
+    np.random.seed([seed, sample])
+
+    # state of random number generator for reproducing the sorting process
+    random_state = np.random.get_state()
+
+    # generate trace and measure wall time
+    start = time.perf_counter()
+    steps = run(data.copy())
+    wall_time = time.perf_counter() - start
+
+    result = BenchmarkResult(algorithm=algorithm, initiator=initiator, n=len(data), seed=seed, sample=sample,
+                             samples=samples, steps=len(steps), comparisons=steps.count(Opcode.COMPARISON),
+                             swaps=steps.count(Opcode.SWAP), replacements=steps.count(Opcode.REPLACE),
+                             time=wall_time, peak_memory=-1)
+
+    # tracing memory allocations slows down sorting considerably, hence memory is measured in a separate run
+    if measure_memory:
+        np.random.set_state(random_state)
+        tracemalloc.start()
+        run(data.copy())
+        result.peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return result
+
+
+def write_results(results: list[BenchmarkResult], file, output_format: str) -> None:
+    if output_format == 'json':
+        json.dump([asdict(result) for result in results], file, indent=2)
+        file.write('\n')
+    else:
+        writer = csv.DictWriter(file, fieldnames=[field.name for field in fields(BenchmarkResult)])
+        writer.writeheader()
+        writer.writerows(asdict(result) for result in results)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='Benchmark sorting algorithms without visualization.')
+    parser.add_argument('-a', '--algorithms', nargs='+', default=list(Registry.SortingAlgorithms.keys()),
+                        choices=list(Registry.SortingAlgorithms.keys()), metavar='ALGORITHM',
+                        help='sorting algorithms to benchmark (default: all)')
+    parser.add_argument('-i', '--initiators', nargs='+', default=list(Registry.InitializationAlgorithms.keys()),
+                        choices=list(Registry.InitializationAlgorithms.keys()), metavar='INITIATOR',
+                        help='initiators used for the data (default: all)')
+    parser.add_argument('-n', '--sizes', nargs='+', type=int, default=[50], metavar='N',
+                        help='sizes of the data (default: 50)')
+    parser.add_argument('-s', '--seed', type=int, default=None,
+                        help='seed of the random number generators (default: drawn at random and recorded)')
+    parser.add_argument('-k', '--samples', type=int, default=1,
+                        help='number of inputs per initiator and size, created at once (default: 1)')
+    parser.add_argument('-o', '--output', default=None,
+                        help='file the results are written to (default: stdout)')
+    parser.add_argument('-f', '--format', choices=['csv', 'json'], default=None,
+                        help='output format (default: derived from the output file, otherwise csv)')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='do not measure peak memory')
+    parser.add_argument('--count-only', action='store_true',
+                        help='only count the steps instead of recording them')
+    parser.add_argument('--list', action='store_true',
+                        help='list available sorting algorithms and initiators and exit')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print('Sorting algorithms:', ', '.join(Registry.SortingAlgorithms.keys()))
+        print('Initiators:', ', '.join(Registry.InitializationAlgorithms.keys()))
+        return
+
+    output_format = args.format or ('json' if args.output and args.output.endswith('.json') else 'csv')
+
+    # run benchmarks
+    results = []
+    for n in args.sizes:
+        for initiator in args.initiators:
+            for result in run_benchmarks(args.algorithms, initiator, n, seed=args.seed, samples=args.samples,
+                                         measure_memory=not args.no_memory, count_only=args.count_only):
+                results.append(result)
+                print(f'{result.algorithm} / {initiator} / n={n} / sample {result.sample}: {result.steps} steps '
+                      f'in {result.time:.3f}s', file=sys.stderr)
+
+    # write results
+    if args.output:
+        with open(args.output, 'w', newline='') as file:
+            write_results(results, file, output_format)
+    else:
+        write_results(results, sys.stdout, output_format)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+"""
+Analysis of the memory accesses of a sorting process with a model of a cache hierarchy.
+
+Every comparison and swap of a trace accesses both of its slots and every replacement accesses its slot. The slots are
+stored one after another with a fixed number of bytes per value. Every level of the hierarchy is a set-associative
+cache with least recently used replacement that sees the accesses which missed the level above.
+"""
+
+import argparse
+import csv
+from dataclasses import dataclass, field
+import json
+import sys
+
+import numpy as np
+
+import Registry
+import Trace
+from SortingSteps import Opcode
+
+
+@dataclass
+class CacheLevel:
+    """
+    Level of a cache hierarchy.
+
+    Attributes
+    ----------
+    name: str
+        Name of the level.
+    capacity: int
+        Size of the cache in bytes.
+    line_size: int
+        Size of a cache line in bytes.
+    associativity: int
+        Number of lines per set.
+    latency: int
+        Cycles of a hit.
+    """
+    name: str
+    capacity: int
+    line_size: int = 64
+    associativity: int = 8
+    latency: int = 4
+
+    @property
+    def sets(self) -> int:
+        return max(self.capacity // (self.line_size * self.associativity), 1)
+
+
+# default hierarchy of a typical desktop processor
+DEFAULT_LEVELS = [CacheLevel(name='L1', capacity=32 * 1024, line_size=64, associativity=8, latency=4),
+                  CacheLevel(name='L2', capacity=1024 * 1024, line_size=64, associativity=16, latency=14)]
+
+
+@dataclass
+class CacheAnalysisResult:
+    """
+    Result of the analysis of a trace.
+
+    Attributes
+    ----------
+    accesses: int
+        Number of memory accesses.
+    hits, misses: dict[str, int]
+        Number of hits and misses per level.
+    cycles: int
+        Estimated number of cycles of all accesses: every access costs the latency of the level it hits in or the
+        memory latency if it misses all levels.
+    """
+    accesses: int
+    hits: dict[str, int] = field(default_factory=dict)
+    misses: dict[str, int] = field(default_factory=dict)
+    cycles: int = 0
+
+
+def accessed_positions(steps: Trace.Trace) -> np.ndarray:
+    # positions of the slots accessed by the steps in order
+    opcode, pos_1, pos_2, _, _ = steps.columns()
+    two = (opcode == Opcode.COMPARISON) | (opcode == Opcode.SWAP)
+    one = opcode == Opcode.REPLACE
+
+    # first slot of every access, the second access of a comparison or swap is its second slot
+    counts = two.astype(np.int64) + one
+    index = np.repeat(np.arange(len(opcode)), counts)
+    positions = pos_1[index].astype(np.int64)
+    second = np.flatnonzero(np.diff(index, prepend=-1) == 0)
+    positions[second] = pos_2[index[second]]
+
+    return positions
+
+
+def simulate(lines: np.ndarray, level: CacheLevel, max_scan: int = 256) -> np.ndarray:
+    """
+    Simulate a set-associative cache with least recently used replacement.
+
+    An access hits if fewer lines of its set than the associativity have been accessed since the line has been
+    accessed last, which is determined for all accesses at once instead of access by access.
+
+    Parameters
+    ----------
+    lines: np.ndarray
+        Cache lines of the accesses in order.
+    level: CacheLevel
+        Cache that is simulated.
+    max_scan: int
+        Number of accesses of a set that are scanned at once for the lines accessed since the last access of a line.
+
+    Returns
+    -------
+    np.ndarray
+        True for every access that hits.
+    """
+    hits = np.zeros(len(lines), dtype=np.bool_)
+    if len(lines) == 0:
+        return hits
+
+    # accesses grouped by set in order, the line of an access determines its set, a stable sort of small integers
+    # is a radix sort
+    sets = lines % level.sets
+    order = np.argsort(sets.astype(np.uint16) if level.sets <= 1 << 16 else sets, kind='stable')
+    grouped = lines[order]
+
+    # accessing the most recently used line of a set hits and does not change the set
+    repeated = np.concatenate(([False], grouped[1:] == grouped[:-1]))
+    hits[order[repeated]] = True
+    order = order[~repeated]
+    grouped = grouped[~repeated]
+
+    # previous access of the same line, -1 for the first one
+    by_line = np.argsort(grouped, kind='stable')
+    same = np.concatenate(([False], grouped[by_line[1:]] == grouped[by_line[:-1]]))
+    previous = np.full(len(grouped), -1, dtype=np.int64)
+    previous[by_line[same]] = by_line[np.flatnonzero(same) - 1]
+
+    # accesses between the previous and the current access of a line, which are at least as many as their lines
+    index = np.arange(len(grouped))
+    window = index - previous - 1
+    hit = (previous >= 0) & (window < level.associativity)
+
+    # count lines since the previous access of the remaining accesses, a line is counted at its last access before
+    # the current access, which is an access whose previous access is before the previous access of the current line
+    pending = np.flatnonzero((previous >= 0) & (window >= level.associativity))
+    start = previous[pending]
+    count = np.zeros(len(pending), dtype=np.int64)
+    for distance in range(1, max_scan + 1):
+        if len(pending) == 0:
+            break
+        position = pending - distance
+        count += previous[position] < start
+
+        # accesses hit once the previous access is reached and miss once the set is full
+        full = count >= level.associativity
+        reached = position <= start + 1
+        hit[pending[reached & ~full]] = True
+        remaining = ~(reached | full)
+        pending, start, count = pending[remaining], start[remaining], count[remaining]
+
+    # remaining accesses with many accesses to few lines since their previous access
+    if len(pending):
+        count += _count_below(previous, start + 1, pending - max_scan, start)
+        hit[pending[count < level.associativity]] = True
+
+    hits[order] = hit
+    return hits
+
+
+def _count_below(values: np.ndarray, start: np.ndarray, stop: np.ndarray, threshold: np.ndarray,
+                 block_size: int = 1024, batch_size: int = 4096) -> np.ndarray:
+    # number of values[start:stop] below threshold for every query, values are sorted within blocks, so whole blocks
+    # are counted by a binary search and only the values at both ends of a range are compared one by one
+    blocks = np.arange(len(values)) // block_size
+    keys = np.sort((blocks << 32) | (values + 1))
+
+    counts = np.zeros(len(start), dtype=np.int64)
+    for batch in range(0, len(start), batch_size):
+        lo, hi, below = (array[batch:batch + batch_size] for array in (start, stop, threshold))
+
+        # whole blocks of the ranges
+        first_block = -(-lo // block_size)
+        last_block = np.maximum(hi // block_size, first_block)
+        counts[batch:batch + batch_size] += _ragged_sum(
+            first_block, last_block, lambda query, block: np.searchsorted(keys, (block << 32) | (below[query] + 1))
+            - block * block_size)
+
+        # values before the first and after the last whole block, or all values if there is no whole block
+        head_stop = np.minimum(first_block * block_size, hi)
+        tail_start = np.maximum(last_block * block_size, head_stop)
+        for range_start, range_stop in ((lo, head_stop), (tail_start, hi)):
+            counts[batch:batch + batch_size] += _ragged_sum(
+                range_start, range_stop, lambda query, position: values[position] < below[query])
+
+    return counts
+
+
+def _ragged_sum(start: np.ndarray, stop: np.ndarray, term) -> np.ndarray:
+    # sum of term(query, i) over i from start to stop for every query
+    lengths = np.maximum(stop - start, 0)
+    query = np.repeat(np.arange(len(start)), lengths)
+    offsets = np.cumsum(lengths) - lengths
+    i = start[query] + np.arange(len(query)) - offsets[query]
+    return np.bincount(query, weights=term(query, i), minlength=len(start)).astype(np.int64)
+
+
+def analyze(steps: Trace.Trace, levels: list[CacheLevel] = DEFAULT_LEVELS, element_size: int = 8,
+            memory_latency: int = 200) -> CacheAnalysisResult:
+    """
+    Analyze the memory accesses of the steps of a sorting process with a cache hierarchy.
+
+    Parameters
+    ----------
+    steps: Trace.Trace
+        Steps of the sorting process.
+    levels: list[CacheLevel]
+        Levels of the cache hierarchy from the level closest to the processor.
+    element_size: int
+        Bytes per value of the sorted array.
+    memory_latency: int
+        Cycles of an access that misses all levels.
+    """
+    addresses = accessed_positions(steps) * element_size
+    result = CacheAnalysisResult(accesses=len(addresses))
+
+    # every level sees the accesses that missed the level above
+    for level in levels:
+        hits = simulate(addresses // level.line_size, level)
+        result.hits[level.name] = int(np.count_nonzero(hits))
+        result.misses[level.name] = len(addresses) - result.hits[level.name]
+        result.cycles += result.hits[level.name] * level.latency
+        addresses = addresses[~hits]
+    result.cycles += len(addresses) * memory_latency
+
+    return result
+
+
+def parse_level(text: str, name: str) -> CacheLevel:
+    # level given as CAPACITY:LINE_SIZE:ASSOCIATIVITY:LATENCY, the capacity may end with K or M
+    capacity, line_size, associativity, latency = text.split(':')
+    factor = {'K': 1024, 'M': 1024 * 1024}.get(capacity[-1:].upper(), 1)
+    capacity = int(capacity[:-1]) * factor if factor > 1 else int(capacity)
+    return CacheLevel(name=name, capacity=capacity, line_size=int(line_size), associativity=int(associativity),
+                      latency=int(latency))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='Analyze the memory accesses of sorting algorithms with a model of '
+                                                 'a cache hierarchy.')
+    parser.add_argument('-a', '--algorithms', nargs='+', default=list(Registry.SortingAlgorithms.keys()),
+                        choices=list(Registry.SortingAlgorithms.keys()), metavar='ALGORITHM',
+                        help='sorting algorithms to analyze (default: all)')
+    parser.add_argument('-i', '--initiator', default='Permutation',
+                        choices=list(Registry.InitializationAlgorithms.keys()),
+                        help='initiator used for the data (default: Permutation)')
+    parser.add_argument('-n', '--size', type=int, default=100000,
+                        help='size of the data (default: 100000)')
+    parser.add_argument('-s', '--seed', type=int, default=0,
+                        help='seed of the random number generators (default: 0)')
+    parser.add_argument('-l', '--level', action='append', default=None, metavar='CAPACITY:LINE:WAYS:LATENCY',
+                        help='cache level from the processor outwards, may be repeated '
+                             '(default: 32K:64:8:4 and 1M:64:16:14)')
+    parser.add_argument('-m', '--memory-latency', type=int, default=200,
+                        help='cycles of an access that misses all levels (default: 200)')
+    parser.add_argument('-e', '--element-size', type=int, default=8,
+                        help='bytes per value (default: 8)')
+    parser.add_argument('-o', '--output', default=None,
+                        help='file the results are written to (default: stdout)')
+    parser.add_argument('-f', '--format', choices=['csv', 'json'], default=None,
+                        help='output format (default: derived from the output file, otherwise csv)')
+    args = parser.parse_args(argv)
+
+    levels = [parse_level(text, f'L{i + 1}') for i, text in enumerate(args.level)] if args.level else DEFAULT_LEVELS
+    output_format = args.format or ('json' if args.output and args.output.endswith('.json') else 'csv')
+
+    # analyze every algorithm on the same data
+    data = Registry.InitializationAlgorithms[args.initiator].initiate(args.size, rng=np.random.default_rng(args.seed))
+    records = []
+    for algorithm in args.algorithms:
+        np.random.seed(args.seed)
+        result = analyze(Registry.SortingAlgorithms[algorithm].sort(data.copy()), levels,
+                         element_size=args.element_size, memory_latency=args.memory_latency)
+        record = dict(algorithm=algorithm, initiator=args.initiator, n=args.size, seed=args.seed,
+                      accesses=result.accesses)
+        for level in levels:
+            record[f'{level.name}_hits'] = result.hits[level.name]
+            record[f'{level.name}_misses'] = result.misses[level.name]
+        record['cycles'] = result.cycles
+        records.append(record)
+        print(f'{algorithm}: {result.accesses} accesses, ' +
+              ', '.join(f'{level.name} {result.misses[level.name]} misses' for level in levels) +
+              f', {result.cycles} cycles', file=sys.stderr)
+
+    # write results
+    file = open(args.output, 'w', newline='') if args.output else sys.stdout
+    if output_format == 'json':
+        json.dump(records, file, indent=2)
+        file.write('\n')
+    else:
+        writer = csv.DictWriter(file, fieldnames=list(records[0].keys()) if records else [])
+        writer.writeheader()
+        writer.writerows(records)
+    if args.output:
+        file.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,30 @@
+import queue
+import threading
+
 import numpy as np
 
 import Initiator
 import Sorter
 import SortingSteps
+import Timeline
+import Trace
+import TraceFile
+import TraceOptimizer
+
+
+
+def _count_steps(delay: np.ndarray, max_delayed: int, window: int = 4096) -> int:
+    # number of steps from the beginning of delay up to and including the max_delayed-th delayed step
+    window = max(window, 2 * max_delayed)
+    start = 0
+    while start < len(delay):
+        delayed = np.flatnonzero(delay[start:start + window])
+        if len(delayed) >= max_delayed:
+            return start + int(delayed[max_delayed - 1]) + 1
+        max_delayed -= len(delayed)
+        start += window
 
+    return len(delay)
 
 
 class Data:
@@ -11,30 +32,70 @@ class Data:
     Data structure for the data that will be sorted and the steps of the sorting process.
     """
 
-    def __init__(self, initiator: Initiator.Initiator, sorter: Sorter.Sorter, n):
+    def __init__(self, initiator: Initiator.Initiator, sorter: Sorter.Sorter, n,
+                 keyframe_memory: int = 64 * 1024 * 1024, rng: np.random.Generator | None = None,
+                 optimize: bool = False):
         # initial data
-        self._initial_data: np.ndarray = initiator.initiate(n)
+        self._initial_data: np.ndarray = initiator.initiate(n, rng=rng)
 
-        # swaps
-        self._steps: list[SortingSteps.Step] = sorter.sort(self._initial_data.copy())
+        # swaps, without the steps that do not change the visualization if requested
+        self._steps: Trace.Trace = sorter.sort(self._initial_data.copy())
+        if optimize:
+            self._steps = TraceOptimizer.optimize(self._steps)
 
         # index for iterating swaps
         self._index: int = -1
 
+        # memory limit for the keyframes of the timeline
+        self._keyframe_memory: int = keyframe_memory
+
+        # timeline for seeking, created on first use
+        self._timeline: Timeline.Timeline | None = None
+
+    @classmethod
+    def from_steps(cls, initial_data: np.ndarray, steps: Trace.Trace,
+                   keyframe_memory: int = 64 * 1024 * 1024) -> 'Data':
+        # data whose steps have already been recorded, neither the initial data nor the steps are changed
+        data = cls.__new__(cls)
+        data._initial_data = initial_data
+        data._steps = steps
+        data._index = -1
+        data._keyframe_memory = keyframe_memory
+        data._timeline = None
+        return data
+
+    @classmethod
+    def from_file(cls, path: str, keyframe_memory: int = 64 * 1024 * 1024) -> 'Data':
+        # data whose steps are mapped into memory from a trace file (see TraceFile) instead of being sorted
+        _, initial_data, steps = TraceFile.read(path)
+        return cls.from_steps(initial_data, steps, keyframe_memory=keyframe_memory)
+
     def get_initial_data(self) -> np.ndarray:
         return self._initial_data
 
+    def get_steps(self) -> Trace.Trace:
+        return self._steps
+
     def get_next_step(self) -> SortingSteps.Step:
         if self.next_step_available():
             self._index += 1
             return self._steps[self._index]
 
-    def get_previous_steps(self) -> SortingSteps.Step:
-        if self.previous_step_available():
-            # return current step and then decrement index
-            current_step = self._steps[self._index]
-            self._index -= 1
-            return current_step
+    def get_next_steps(self, max_delayed: int) -> tuple[np.ndarray, ...]:
+        # columns of the next steps up to and including the max_delayed-th delayed step
+        columns = self._steps.columns()
+        start = self._index + 1
+        stop = start + _count_steps(columns[3][start:], max_delayed)
+        self._index = stop - 1
+        return tuple(column[start:stop] for column in columns)
+
+    def get_previous_steps(self, max_delayed: int) -> tuple[np.ndarray, ...]:
+        # columns of the previous steps back to and including the max_delayed-th delayed step, in order of the trace
+        columns = self._steps.columns()
+        stop = self._index + 1
+        start = stop - _count_steps(columns[3][:stop][::-1], max_delayed)
+        self._index = start - 1
+        return tuple(column[start:stop] for column in columns)
 
     def next_step_available(self) -> bool:
         return True if self._index < len(self._steps) - 1 else False
@@ -42,6 +103,145 @@ class Data:
     def previous_step_available(self) -> bool:
         return True if self._index >= 0 else False
 
+    def next_step_ready(self) -> bool:
+        # True if the next step can be taken without waiting for it
+        return self.next_step_available()
+
+    def steps_pending(self) -> bool:
+        # True if further steps are still being generated
+        return False
+
     def checkout_previous_step(self) -> SortingSteps.Step:
         if self.previous_step_available():
             return self._steps[self._index - 1]
+
+    def get_markings(self) -> tuple[tuple[int, int] | None, list[int]]:
+        # focused and marked slots after the steps that have been taken
+        return self._steps.markings(self.get_position())
+
+    def get_highlights(self) -> tuple[tuple[int, ...], tuple[int, ...], list[int]]:
+        # compared, swapped and replaced slots after the steps that have been taken
+        return self._steps.highlights(self.get_position())
+
+    def get_number_of_steps(self) -> int:
+        return len(self._steps)
+
+    def get_position(self) -> int:
+        # number of steps that have been taken
+        return self._index + 1
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, position: int) -> tuple[np.ndarray, tuple[int, int, int]]:
+        # create timeline on first use
+        if self._timeline is None:
+            self._timeline = Timeline.Timeline(self._initial_data, self._steps, memory_limit=self._keyframe_memory)
+
+        # continue iterating steps after position
+        state, counts = self._timeline.seek(position)
+        self._index = min(max(position, 0), len(self._steps)) - 1
+
+        # data and number of comparisons, swaps and replacements after the steps up to position
+        return state, counts
+
+    def close(self) -> None:
+        pass
+
+
+class StreamingData(Data):
+    """
+    Data structure for the data that will be sorted whose steps are generated while they are visualized.
+
+    The sorter runs as a producer in a separate thread and hands its steps over through a bounded buffer, so the
+    visualization can start right away and memory stays flat. Steps that have been taken are not kept, hence there
+    are no previous steps.
+    """
+
+    def __init__(self, initiator: Initiator.Initiator, sorter: Sorter.Sorter, n, buffer_size: int = 16,
+                 rng: np.random.Generator | None = None):
+        # initial data
+        self._initial_data: np.ndarray = initiator.initiate(n, rng=rng)
+
+        # stream of steps
+        self._stream: Trace.TraceStream = Trace.TraceStream(buffer_size=buffer_size)
+
+        # current chunk of steps
+        self._chunk: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray] | None = None
+
+        # index for iterating steps of current chunk
+        self._index: int = -1
+
+        # True if all steps have been taken from the stream
+        self._finished: bool = False
+
+        # generate steps in separate thread
+        self._producer: threading.Thread = threading.Thread(target=sorter.stream,
+                                                            args=(self._initial_data.copy(), self._stream),
+                                                            daemon=True)
+        self._producer.start()
+
+    def get_next_step(self) -> SortingSteps.Step:
+        if self.next_step_available():
+            self._index += 1
+            return Trace.Trace.decode(*(column[self._index] for column in self._chunk))
+
+    def get_next_steps(self, max_delayed: int) -> tuple[np.ndarray, ...]:
+        # columns of the next steps of the current chunk up to and including the max_delayed-th delayed step
+        if self.next_step_available():
+            start = self._index + 1
+            stop = start + _count_steps(self._chunk[3][start:], max_delayed)
+            self._index = stop - 1
+            return tuple(column[start:stop] for column in self._chunk)
+
+    def get_previous_steps(self, max_delayed: int) -> tuple[np.ndarray, ...]:
+        pass
+
+    def next_step_available(self) -> bool:
+        # wait for next chunk if current chunk is exhausted
+        return self._next_chunk(block=True)
+
+    def next_step_ready(self) -> bool:
+        # take next chunk only if it has already been generated
+        return self._next_chunk(block=False)
+
+    def steps_pending(self) -> bool:
+        return not self._finished
+
+    def previous_step_available(self) -> bool:
+        return False
+
+    def checkout_previous_step(self) -> SortingSteps.Step:
+        pass
+
+    def get_number_of_steps(self) -> int:
+        # number of steps is unknown until the sorting process has finished
+        return 0
+
+    def get_position(self) -> int:
+        return 0
+
+    def seekable(self) -> bool:
+        return False
+
+    def close(self) -> None:
+        # stop producer
+        self._stream.cancel()
+
+    def _next_chunk(self, block: bool) -> bool:
+        # take next chunk from the stream if current chunk is exhausted
+        while self._chunk is None or self._index >= len(self._chunk[0]) - 1:
+            if self._finished:
+                return False
+            try:
+                chunk = self._stream.get_chunk(block)
+            except queue.Empty:
+                return False
+            if chunk is None:
+                # end of stream
+                self._finished = True
+                continue
+            self._chunk = chunk
+            self._index = -1
+
+        return True
@@ -3,7 +3,8 @@ from dataclasses import dataclass
 import tkinter as tk
 import numpy as np
 
-import SortingSteps
+import Framebuffer
+import Scene
 
 
 @dataclass
@@ -59,6 +60,7 @@ class Settings:
         slot_body_default: str = 'sky blue'
         slot_body_mark: str = 'indian red'
         slot_body_replace: str = 'MediumPurple4'
+        slot_body_range: str = 'light blue'
         focus_rectangle: str = 'gainsboro'
 
 
@@ -80,7 +82,8 @@ class DiagramSlot:
 
 class Diagram(tk.Canvas):
     """
-    Visualizes the bars that will be sorted and provides methods for visualizing the steps in the sorting process.
+    Visualizes the bars that will be sorted and draws the changes of a Scene.Scene as the steps of the sorting process
+    are applied to it.
     """
 
     def __init__(self, master: tk.Widget, n: int):
@@ -93,15 +96,8 @@ class Diagram(tk.Canvas):
         # vertical offset for coordinates
         self._vertical_offset: int = 2
 
-        # width of widget
-        self._width: int = Settings.horizontal_margin_left + self._number_of_slots * Settings.width_of_slots + \
-                           (self._number_of_slots - 1) * Settings.separation_between_slots + \
-                           Settings.horizontal_margin_right + 1
-
-        # height of widget
-        self._height: int = Settings.vertical_margin_top + (
-                self._number_of_slots + 2) * Settings.width_of_slots + \
-                            Settings.vertical_margin_bottom + 1
+        # width and height of widget
+        self._width, self._height = Diagram.size(n)
 
         # initiate canvas widget
         tk.Canvas.__init__(self, master=master, width=self._width, height=self._height)
@@ -125,24 +121,33 @@ class Diagram(tk.Canvas):
         # slots
         self._slots: list[DiagramSlot] = []
 
-        # currently compared slots
-        self._currently_compared_slots: list[DiagramSlot] = []
-
-        # currently swapped slots
-        self._currently_swapped_slots: list[DiagramSlot] = []
+        # colors of the spaces that are not colored by default
+        self._space_colors: dict[int, str] = {}
 
-        # currently marked slots
-        self._currently_marked_slots: list[DiagramSlot] = []
+        # colors of the bodies that are not colored by default
+        self._body_colors: dict[int, str] = {}
 
-        # currently replaced slots
-        self._currently_replaced_slots: list[DiagramSlot] = []
+        # currently drawn focus
+        self._focus: tuple[int, int] | None = None
 
         # current focus rectangle
         self._focus_rectangle = None
 
+    @staticmethod
+    def size(n: int) -> tuple[int, int]:
+        # width and height of the widget for n slots
+        width = Settings.horizontal_margin_left + n * Settings.width_of_slots + \
+                (n - 1) * Settings.separation_between_slots + Settings.horizontal_margin_right + 1
+        height = Settings.vertical_margin_top + (n + 2) * Settings.width_of_slots + Settings.vertical_margin_bottom + 1
+        return width, height
+
     def create_slots(self, heights: np.ndarray) -> None:
         # clear diagram
         self._slots.clear()
+        self._space_colors = {}
+        self._body_colors = {}
+        self._focus = None
+        self._focus_rectangle = None
         tk.Canvas.delete(self, 'all')
 
         # check if the number of provided heights is equal to the number of slots
@@ -173,184 +178,64 @@ class Diagram(tk.Canvas):
                     outline=Settings.ColorPalette.slot_body_default,
                     fill=Settings.ColorPalette.slot_body_default)
 
-    def compare_slots(self, comparison: SortingSteps.Comparison) -> None:
-        # colorize space of currently compared slots
-        self._uncompare_slots()
-
-        # colorize space of currently swapped slots
-        self._unswap_slots()
-
-        # colorize space of comparison
-        self._colorize_slot_space(slot=self._slots[comparison.pos_1], color=Settings.ColorPalette.slot_space_compare)
-        self._colorize_slot_space(slot=self._slots[comparison.pos_2], color=Settings.ColorPalette.slot_space_compare)
-
-        # append slots to currently compared slots
-        self._currently_compared_slots.append(self._slots[comparison.pos_1])
-        self._currently_compared_slots.append(self._slots[comparison.pos_2])
-
-    def swap_slots(self, swap: SortingSteps.Swap) -> None:
-        # colorize space of current comparison
-        self._uncompare_slots()
-
-        # colorize space of current swap
-        self._unswap_slots()
-
-        # colorize space of swap
-        self._colorize_slot_space(slot=self._slots[swap.pos_1], color=Settings.ColorPalette.slot_space_swap)
-        self._colorize_slot_space(slot=self._slots[swap.pos_2], color=Settings.ColorPalette.slot_space_swap)
-
-        # swap the slots
-        self._swap_slots(pos_1=swap.pos_1, pos_2=swap.pos_2)
-
-        # append slots to currently swapped slots
-        self._currently_swapped_slots.append(self._slots[swap.pos_1])
-        self._currently_swapped_slots.append(self._slots[swap.pos_2])
-
-    def mark_slot(self, mark: SortingSteps.Mark) -> None:
-        #
-        if not mark.multiple:
-            self.unmark_slots()
-
-        # colorize body of slot
-        self._colorize_slot_body(slot=self._slots[mark.pos], color=Settings.ColorPalette.slot_body_mark)
-
-        # append slot to list of currently marked slots
-        self._currently_marked_slots.append(self._slots[mark.pos])
-
-    def unmark_slots(self) -> None:
-        # unmark slots
-        for slot in self._currently_marked_slots:
-            self._colorize_slot_body(slot=slot, color=Settings.ColorPalette.slot_body_default)
-
-        # clear list of currently marked slots
-        self._currently_marked_slots.clear()
-
-    def replace_slot(self, replace: SortingSteps.Replace):
-        # unreplace slot
-        self.unreplace_slots()
-
-        # uncompare slots
-        self._uncompare_slots()
-
-        # unswap slots
-        self._unswap_slots()
-
-        # replace space of slot
-        tk.Canvas.delete(self, self._slots[replace.pos].space)
-        self._slots[replace.pos].space = self._create_cartesian_rectangle(
-            Point(self._bottom_left_x_slot_position[replace.pos], (replace.height + 1) * Settings.width_of_slots),
-            Point(self._up_right_x_slot_position[replace.pos], self._up_right.y),
-            outline=Settings.ColorPalette.slot_space_default,
-            fill=Settings.ColorPalette.slot_space_default)
-
-        # replace head of slot
-        tk.Canvas.delete(self, self._slots[replace.pos].head)
-        self._slots[replace.pos].head = self._create_cartesian_rectangle(
-            Point(self._bottom_left_x_slot_position[replace.pos], replace.height * Settings.width_of_slots),
-            Point(self._up_right_x_slot_position[replace.pos], (replace.height + 1) * Settings.width_of_slots),
-            outline=Settings.ColorPalette.slot_head_default,
-            fill=Settings.ColorPalette.slot_head_default)
-
-        # replace body of slot
-        tk.Canvas.delete(self, self._slots[replace.pos].body)
-        self._slots[replace.pos].body = self._create_cartesian_rectangle(
-            Point(self._bottom_left_x_slot_position[replace.pos], self._bottom_left.y),
-            Point(self._up_right_x_slot_position[replace.pos], replace.height * Settings.width_of_slots),
-            outline=Settings.ColorPalette.slot_body_replace,
-            fill=Settings.ColorPalette.slot_body_replace)
-
-        # append slot to list of currently replaced slots
-        self._currently_replaced_slots.append(self._slots[replace.pos])
-
-    def unreplace_slots(self):
-        # colorize body of currently replaced slots
-        for slot in self._currently_replaced_slots:
-            self._colorize_slot_body(slot=slot, color=Settings.ColorPalette.slot_body_default)
-
-        # clear list of currently replaced slots
-        self._currently_replaced_slots.clear()
-
-    def focus_slots(self, focus: SortingSteps.Focus) -> None:
-        # clean slots
-        self.clean_slots()
-
-        # create focus rectangle at positions from from_pos to to_pos
-        self._focus_rectangle = tk.Canvas.create_rectangle(self, self._convert_cartesian_x_to_canvas_x(
-            self._bottom_left_x_slot_position[focus.from_pos]),
-                                                           self._convert_cartesian_y_to_canvas_y(self._bottom_left.y),
-                                                           self._convert_cartesian_x_to_canvas_x(
-                                                               self._up_right_x_slot_position[focus.to_pos]),
-                                                           self._convert_cartesian_y_to_canvas_y(self._up_right.y),
-                                                           outline=Settings.ColorPalette.focus_rectangle,
-                                                           fill=Settings.ColorPalette.focus_rectangle)
-
-        # set focus rectangle to background
-        tk.Canvas.tag_lower(self, self._focus_rectangle)
-
-    def unfocus_slots(self) -> None:
-        # if slots are focused
-        if self._focus_rectangle:
+    def draw_scene(self, scene: Scene.Scene) -> None:
+        """
+        Draw the net change of the scene since it has been drawn last.
+        """
+        # move heads of slots whose height changed
+        for pos in scene.take_dirty():
+            self._set_slot_height(pos, int(scene.heights[pos]))
+
+        # colorize space of compared and swapped slots
+        space_colors = {pos: Settings.ColorPalette.slot_space_compare for pos in scene.compared}
+        space_colors.update({pos: Settings.ColorPalette.slot_space_swap for pos in scene.swapped})
+        for pos in self._space_colors.keys() | space_colors.keys():
+            color = space_colors.get(pos, Settings.ColorPalette.slot_space_default)
+            if color != self._space_colors.get(pos, Settings.ColorPalette.slot_space_default):
+                self._colorize_slot_space(slot=self._slots[pos], color=color)
+        self._space_colors = space_colors
+
+        # colorize body of replaced and marked slots
+        body_colors = {pos: Settings.ColorPalette.slot_body_replace for pos in scene.replaced}
+        body_colors.update({pos: Settings.ColorPalette.slot_body_mark for pos in scene.marked})
+        for pos in self._body_colors.keys() | body_colors.keys():
+            color = body_colors.get(pos, Settings.ColorPalette.slot_body_default)
+            if color != self._body_colors.get(pos, Settings.ColorPalette.slot_body_default):
+                self._colorize_slot_body(slot=self._slots[pos], color=color)
+        self._body_colors = body_colors
+
+        # if focus changed
+        if scene.focus != self._focus:
             # remove focus rectangle
-            tk.Canvas.delete(self, self._focus_rectangle)
-            self._focus_rectangle = None
-
-    def clean_slots(self) -> None:
-        # colorize space of current comparison
-        self._uncompare_slots()
-
-        # colorize space of current swap
-        self._unswap_slots()
-
-        # unmark slots
-        self.unmark_slots()
-
-        # unreplace slots
-        self.unreplace_slots()
-
-        # unfocus slots
-        self.unfocus_slots()
-
-    def _uncompare_slots(self):
-        # colorize space of currently compared slots
-        for slot in self._currently_compared_slots:
-            self._colorize_slot_space(slot=slot, color=Settings.ColorPalette.slot_space_default)
-
-        # clear currently compared slots
-        self._currently_compared_slots.clear()
-
-    def _unswap_slots(self):
-        # colorize space of current swap
-        for slot in self._currently_swapped_slots:
-            self._colorize_slot_space(slot=slot, color=Settings.ColorPalette.slot_space_default)
-
-        # clear currently swapped slots
-        self._currently_swapped_slots.clear()
-
-    def _swap_slots(self, pos_1: int, pos_2: int) -> None:
-        # if slots exist
-        if self._slots[pos_1].space and self._slots[pos_2].space:
-            # swap space of slots on canvas
-            tk.Canvas.move(self, self._slots[pos_1].space, self._bottom_left_x_slot_position[pos_2] -
-                           self._bottom_left_x_slot_position[pos_1], 0)
-            tk.Canvas.move(self, self._slots[pos_2].space, self._bottom_left_x_slot_position[pos_1] -
-                           self._bottom_left_x_slot_position[pos_2], 0)
-
-            # swap head of slots on canvas
-            tk.Canvas.move(self, self._slots[pos_1].head, self._bottom_left_x_slot_position[pos_2] -
-                           self._bottom_left_x_slot_position[pos_1], 0)
-            tk.Canvas.move(self, self._slots[pos_2].head, self._bottom_left_x_slot_position[pos_1] -
-                           self._bottom_left_x_slot_position[pos_2], 0)
-
-            # swap body of slots on canvas
-            tk.Canvas.move(self, self._slots[pos_1].body, self._bottom_left_x_slot_position[pos_2] -
-                           self._bottom_left_x_slot_position[pos_1], 0)
-            tk.Canvas.move(self, self._slots[pos_2].body, self._bottom_left_x_slot_position[pos_1] -
-                           self._bottom_left_x_slot_position[pos_2], 0)
-
-            # swap slots in list of slots
-            temp = self._slots[pos_1]
-            self._slots[pos_1] = self._slots[pos_2]
-            self._slots[pos_2] = temp
+            if self._focus_rectangle:
+                tk.Canvas.delete(self, self._focus_rectangle)
+                self._focus_rectangle = None
+
+            # create focus rectangle at positions from from_pos to to_pos
+            if scene.focus:
+                self._focus_rectangle = self._create_cartesian_rectangle(
+                    Point(self._bottom_left_x_slot_position[scene.focus[0]], self._bottom_left.y),
+                    Point(self._up_right_x_slot_position[scene.focus[1]], self._up_right.y),
+                    outline=Settings.ColorPalette.focus_rectangle,
+                    fill=Settings.ColorPalette.focus_rectangle)
+
+                # set focus rectangle to background
+                tk.Canvas.tag_lower(self, self._focus_rectangle)
+
+            self._focus = scene.focus
+
+    def _set_slot_height(self, pos: int, height: int) -> None:
+        # move space, head and body of slot to the new height
+        slot = self._slots[pos]
+        tk.Canvas.coords(self, slot.space, *self._convert_cartesian_rectangle(
+            Point(self._bottom_left_x_slot_position[pos], (height + 1) * Settings.width_of_slots),
+            Point(self._up_right_x_slot_position[pos], self._up_right.y)))
+        tk.Canvas.coords(self, slot.head, *self._convert_cartesian_rectangle(
+            Point(self._bottom_left_x_slot_position[pos], height * Settings.width_of_slots),
+            Point(self._up_right_x_slot_position[pos], (height + 1) * Settings.width_of_slots)))
+        tk.Canvas.coords(self, slot.body, *self._convert_cartesian_rectangle(
+            Point(self._bottom_left_x_slot_position[pos], self._bottom_left.y),
+            Point(self._up_right_x_slot_position[pos], height * Settings.width_of_slots)))
 
     def _colorize_slot_body(self, slot: DiagramSlot, color: str) -> None:
         tk.Canvas.itemconfig(self, slot.body, outline=color, fill=color)
@@ -364,11 +249,91 @@ class Diagram(tk.Canvas):
     def _convert_cartesian_y_to_canvas_y(self, y: int) -> int:
         return self._height - Settings.vertical_margin_bottom + self._vertical_offset - y
 
+    def _convert_cartesian_rectangle(self, bottom_left: Point, up_right: Point) -> tuple[int, int, int, int]:
+        # canvas coordinates of a rectangle given in cartesian coordinates
+        return (self._convert_cartesian_x_to_canvas_x(bottom_left.x), self._convert_cartesian_y_to_canvas_y(bottom_left.y),
+                self._convert_cartesian_x_to_canvas_x(up_right.x), self._convert_cartesian_y_to_canvas_y(up_right.y))
+
     def _create_cartesian_rectangle(self, bottom_left: Point, up_right: Point,
                                     outline: str = 'black', fill: str = ''):
         # create a rectangle using cartesian coordinates
-        return tk.Canvas.create_rectangle(self, self._convert_cartesian_x_to_canvas_x(bottom_left.x),
-                                          self._convert_cartesian_y_to_canvas_y(bottom_left.y),
-                                          self._convert_cartesian_x_to_canvas_x(up_right.x),
-                                          self._convert_cartesian_y_to_canvas_y(up_right.y),
+        return tk.Canvas.create_rectangle(self, *self._convert_cartesian_rectangle(bottom_left, up_right),
                                           outline=outline, fill=fill)
+
+
+class RasterDiagram(tk.Label):
+    """
+    Visualizes the bars that will be sorted like Diagram, but draws them into a Framebuffer.Framebuffer which is shown
+    as a single image. Only the pixel columns that changed are copied to the image. The image fills the space that is
+    given to the widget and any number of slots is fit into it.
+    """
+
+    def __init__(self, master: tk.Widget, width: int, height: int):
+        # image shown by the widget
+        self._image: tk.PhotoImage = tk.PhotoImage(master=master, width=width, height=height)
+
+        # initiate label widget, its requested size does not follow the size of the image
+        tk.Label.__init__(self, master=master, image=self._image, width=width, height=height, borderwidth=0)
+
+        # colors of the palette
+        self._palette: Framebuffer.Palette = Framebuffer.Palette(**{name: self._convert_color(color) for name, color in (
+            ('background', Settings.ColorPalette.background),
+            ('slot_space_compare', Settings.ColorPalette.slot_space_compare),
+            ('slot_space_swap', Settings.ColorPalette.slot_space_swap),
+            ('slot_head_default', Settings.ColorPalette.slot_head_default),
+            ('slot_body_default', Settings.ColorPalette.slot_body_default),
+            ('slot_body_mark', Settings.ColorPalette.slot_body_mark),
+            ('slot_body_replace', Settings.ColorPalette.slot_body_replace),
+            ('slot_body_range', Settings.ColorPalette.slot_body_range),
+            ('focus_rectangle', Settings.ColorPalette.focus_rectangle))})
+
+        # framebuffer for the current number of slots and size of the image
+        self._framebuffer: Framebuffer.Framebuffer | None = None
+
+        # heights given to create_slots and scene that has been drawn last, for redrawing after a resize
+        self._heights: np.ndarray | None = None
+        self._scene: Scene.Scene | None = None
+
+        # follow size of widget
+        self.bind('<Configure>', self._on_configure)
+
+    def create_slots(self, heights: np.ndarray) -> None:
+        # draw all bars
+        self._heights = np.array(heights)
+        self._scene = None
+        self._redraw()
+
+    def draw_scene(self, scene: Scene.Scene) -> None:
+        """
+        Draw the net change of the scene since it has been drawn last.
+        """
+        self._scene = scene
+        columns = self._framebuffer.draw(scene)
+        if columns:
+            self._blit(*columns)
+
+    def _redraw(self) -> None:
+        # create framebuffer for the size of the image and draw everything
+        self._framebuffer = Framebuffer.Framebuffer(len(self._heights), self._image.width(), self._image.height(),
+                                                    self._palette)
+        self._framebuffer.reset(self._scene.heights if self._scene else self._heights,
+                                max_height=int(np.max(self._heights, initial=0)))
+        if self._scene:
+            self._framebuffer.draw(self._scene)
+        self._blit(0, self._framebuffer.width)
+
+    def _on_configure(self, event) -> None:
+        # resize image to the size of the widget
+        if event.width > 0 and event.height > 0 and (event.width, event.height) != (self._image.width(),
+                                                                                     self._image.height()):
+            self._image.config(width=event.width, height=event.height)
+            if self._heights is not None:
+                self._redraw()
+
+    def _blit(self, start: int, stop: int) -> None:
+        # copy pixel columns from start to stop to the image
+        self._image.put(self._framebuffer.ppm(start, stop), to=(start, 0))
+
+    def _convert_color(self, color: str) -> tuple[int, int, int]:
+        # RGB values of a color name
+        return tuple(value // 256 for value in self.winfo_rgb(color))
@@ -0,0 +1,307 @@
+"""
+Offline export of the visualization of a sorting process as animated GIF, without Tk.
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import astuple, fields
+import os
+import sys
+
+import numpy as np
+
+import Data
+import Framebuffer
+import Registry
+import Replay
+import Scene
+
+# palette whose colors are (i, 0, 0) for the i-th color of Framebuffer.Palette, so the first channel of a framebuffer
+# that uses it holds the index into the color table of the GIF
+_INDEX_PALETTE = Framebuffer.Palette(**{field.name: (i, 0, 0) for i, field in enumerate(fields(Framebuffer.Palette))})
+
+# minimum code size of the LZW code, the color table has 2 ** _MIN_CODE_SIZE colors
+_MIN_CODE_SIZE = max(2, (len(fields(Framebuffer.Palette)) - 1).bit_length())
+
+
+def frame_positions(length: int, frames: int | None = None, every: int | None = None) -> np.ndarray:
+    """
+    Positions of the frames in a trace of the given length, i.e. the number of steps that have been applied before
+    a frame is drawn.
+
+    Either a fixed number of frames is spread evenly over the trace or every-th step is drawn. The first frame
+    shows the initial data and the last frame the sorted data.
+    """
+    if every:
+        positions = np.arange(0, length + every, every)
+    else:
+        positions = np.linspace(0, length, max(frames or 2, 2))
+
+    return np.unique(np.minimum(np.round(positions).astype(np.int64), length))
+
+
+def encode_lzw(indices: bytes, min_code_size: int) -> bytes:
+    """
+    Compress color indices with the variable-length LZW code of the GIF format.
+    """
+    clear = 1 << min_code_size
+    end = clear + 1
+
+    # code table maps prefix code and next index to a code
+    table = {}
+    next_code = end + 1
+    code_size = min_code_size + 1
+    limit = 1 << code_size
+
+    # codes are packed into bytes starting with the least significant bit
+    output = bytearray()
+    buffer = clear
+    bits = code_size
+
+    iterator = iter(indices)
+    prefix = next(iterator)
+    for index in iterator:
+        key = prefix << 8 | index
+        code = table.get(key)
+        if code is not None:
+            prefix = code
+            continue
+
+        # emit code of longest known prefix
+        buffer |= prefix << bits
+        bits += code_size
+        while bits >= 8:
+            output.append(buffer & 255)
+            buffer >>= 8
+            bits -= 8
+
+        if next_code < 4096:
+            # add prefix followed by index to the table
+            table[key] = next_code
+            if next_code == limit:
+                code_size += 1
+                limit <<= 1
+            next_code += 1
+        else:
+            # table is full, start over
+            buffer |= clear << bits
+            bits += code_size
+            while bits >= 8:
+                output.append(buffer & 255)
+                buffer >>= 8
+                bits -= 8
+            table.clear()
+            next_code = end + 1
+            code_size = min_code_size + 1
+            limit = 1 << code_size
+
+        prefix = index
+
+    # emit last prefix and end of information
+    buffer |= prefix << bits
+    bits += code_size
+    buffer |= end << bits
+    bits += code_size
+    while bits > 0:
+        output.append(buffer & 255)
+        buffer >>= 8
+        bits -= 8
+
+    return bytes(output)
+
+
+def write_gif(file, width: int, height: int, colors: list[tuple[int, int, int]],
+              frames: list[tuple[int, int, int, int, bytes, int]], min_code_size: int) -> None:
+    """
+    Write a looping animated GIF.
+
+    Parameters
+    ----------
+    colors: list[tuple[int, int, int]]
+        Color table, its length has to be 2 ** min_code_size.
+    frames: list[tuple[int, int, int, int, bytes, int]]
+        Left, top, width and height of the rectangle that is drawn, its LZW-compressed color indices and the delay
+        after the frame in hundredths of a second.
+    """
+    size = min_code_size - 1
+
+    # header, logical screen with global color table and application extension for looping
+    file.write(b'GIF89a')
+    file.write(np.array([width, height], dtype='<u2').tobytes() + bytes([0xf0 | size, 0, 0]))
+    file.write(bytes(value for color in colors for value in color))
+    file.write(b'\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00')
+
+    for left, top, frame_width, frame_height, data, delay in frames:
+        # graphic control extension, the previous frame is kept so a frame only needs to cover what changed
+        file.write(b'\x21\xf9\x04\x04' + np.array([delay], dtype='<u2').tobytes() + b'\x00\x00')
+
+        # image descriptor
+        file.write(b'\x2c' + np.array([left, top, frame_width, frame_height], dtype='<u2').tobytes() + b'\x00')
+
+        # image data in sub-blocks of at most 255 bytes
+        file.write(bytes([min_code_size]))
+        for start in range(0, len(data), 255):
+            block = data[start:start + 255]
+            file.write(bytes([len(block)]) + block)
+        file.write(b'\x00')
+
+    file.write(b'\x3b')
+
+
+def _render_segment(width: int, height: int, max_height: int, state: np.ndarray, highlights: tuple, markings: tuple,
+                    columns: tuple[np.ndarray, ...], start: int, positions: list[int],
+                    first: bool) -> list[tuple[int, int, int, int, bytes] | None]:
+    # render the frames at positions starting from state after the steps up to start, the columns hold the steps from
+    # start up to the last position; every frame is encoded as the rectangle that changed since the previous frame
+    # or None if nothing changed, the first frame of the animation is encoded completely
+    scene = Scene.Scene(state)
+    scene.compared, scene.swapped, scene.replaced = highlights
+    scene.set_markings(*markings)
+
+    framebuffer = Framebuffer.Framebuffer(len(state), width, height, _INDEX_PALETTE)
+    framebuffer.reset(state, max_height=max_height)
+    framebuffer.draw(scene)
+    previous = framebuffer.pixels[:, :, 0].copy()
+
+    frames = []
+    offset = start
+    for position in positions:
+        # apply steps since last frame
+        scene.apply(tuple(column[start - offset:position - offset] for column in columns))
+        start = position
+
+        # draw net change
+        changed = framebuffer.draw(scene)
+        current = framebuffer.pixels[:, :, 0]
+        if first:
+            frames.append((0, 0, width, height, encode_lzw(current.tobytes(), _MIN_CODE_SIZE)))
+            previous[:] = current
+            first = False
+            continue
+
+        # rectangle that changed
+        if changed:
+            difference = previous[:, changed[0]:changed[1]] != current[:, changed[0]:changed[1]]
+            rows = np.flatnonzero(difference.any(axis=1))
+            if len(rows):
+                changed_columns = np.flatnonzero(difference.any(axis=0)) + changed[0]
+                left, right = int(changed_columns[0]), int(changed_columns[-1]) + 1
+                top, bottom = int(rows[0]), int(rows[-1]) + 1
+                frames.append((left, top, right - left, bottom - top,
+                               encode_lzw(current[top:bottom, left:right].tobytes(), _MIN_CODE_SIZE)))
+                previous[top:bottom, left:right] = current[top:bottom, left:right]
+                continue
+
+        frames.append(None)
+
+    return frames
+
+
+def export_gif(data: Data.Data, path: str, frames: int | None = None, every: int | None = None, fps: float = 25,
+               width: int = 640, height: int = 360, workers: int | None = None) -> int:
+    """
+    Render the sorting process of data without Tk and write it to path as an animated GIF.
+
+    The frames are rendered in parallel processes, each of which renders a segment of the trace starting from the
+    data at its first step, which is restored by Replay.
+
+    Parameters
+    ----------
+    frames, every: int | None
+        Number of frames spread evenly over the trace or number of steps between two frames (see frame_positions).
+    fps: float
+        Frames per second of the animation.
+    width, height: int
+        Size of the animation in pixels.
+    workers: int | None
+        Number of processes, by default the number of CPUs.
+
+    Returns
+    -------
+    int
+        Number of frames.
+    """
+    steps = data.get_steps()
+    initial_data = data.get_initial_data()
+    max_height = int(np.max(initial_data, initial=0))
+    columns = steps.columns()
+    positions = frame_positions(len(steps), frames=frames, every=every).tolist()
+
+    # split frames into segments, several per process for balancing the load
+    workers = workers or os.cpu_count() or 1
+    bounds = np.linspace(0, len(positions), min(4 * workers, len(positions)) + 1).round().astype(int)
+
+    # segments start at the frame before their first frame, the first segment at its first frame
+    starts = [positions[max(i - 1, 0)] for i in bounds[:-1]]
+    states = Replay.states(initial_data, columns, starts)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for i, j, start, state in zip(bounds[:-1], bounds[1:], starts, states):
+            futures.append(executor.submit(_render_segment, width, height, max_height, state,
+                                           steps.highlights(start), steps.markings(start),
+                                           tuple(column[start:positions[j - 1]] for column in columns),
+                                           start, positions[i:j], i == 0))
+
+        # delay of every frame, an unchanged frame extends the delay of the previous one
+        gif_frames = []
+        for k, frame in enumerate(frame for future in futures for frame in future.result()):
+            delay = round((k + 1) * 100 / fps) - round(k * 100 / fps)
+            if frame is None:
+                left, top, frame_width, frame_height, frame_data, previous_delay = gif_frames[-1]
+                gif_frames[-1] = (left, top, frame_width, frame_height, frame_data, previous_delay + delay)
+            else:
+                gif_frames.append(frame + (delay,))
+
+    # color table of the framebuffer palette padded to the size given by the code size
+    colors = list(astuple(Framebuffer.Palette()))
+    colors += [(0, 0, 0)] * ((1 << _MIN_CODE_SIZE) - len(colors))
+
+    with open(path, 'wb') as file:
+        write_gif(file, width, height, colors, gif_frames, _MIN_CODE_SIZE)
+
+    return len(gif_frames)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='Export the visualization of a sorting algorithm as animated GIF.')
+    parser.add_argument('-a', '--algorithm', default='Quicksort', choices=list(Registry.SortingAlgorithms.keys()),
+                        help='sorting algorithm (default: Quicksort)')
+    parser.add_argument('-i', '--initiator', default='Permutation',
+                        choices=list(Registry.InitializationAlgorithms.keys()),
+                        help='initiator used for the data (default: Permutation)')
+    parser.add_argument('-n', '--size', type=int, default=1000,
+                        help='size of the data (default: 1000)')
+    parser.add_argument('-s', '--seed', type=int, default=None,
+                        help='seed of the random number generator (default: not seeded)')
+    parser.add_argument('-o', '--output', default='sorting.gif',
+                        help='GIF file the animation is written to (default: sorting.gif)')
+    parser.add_argument('-d', '--duration', type=float, default=60,
+                        help='duration of the animation in seconds if --every is not given (default: 60)')
+    parser.add_argument('-e', '--every', type=int, default=None, metavar='K',
+                        help='draw a frame every K steps')
+    parser.add_argument('--fps', type=float, default=25,
+                        help='frames per second (default: 25)')
+    parser.add_argument('--width', type=int, default=640,
+                        help='width of the animation in pixels (default: 640)')
+    parser.add_argument('--height', type=int, default=360,
+                        help='height of the animation in pixels (default: 360)')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='number of processes (default: number of CPUs)')
+    args = parser.parse_args(argv)
+
+    # seed random number generator used by the sorting algorithms
+    if args.seed is not None:
+        np.random.seed(args.seed)
+
+    data = Data.Data(initiator=Registry.InitializationAlgorithms[args.initiator],
+                     sorter=Registry.SortingAlgorithms[args.algorithm], n=args.size,
+                     rng=np.random.default_rng(args.seed) if args.seed is not None else None)
+    count = export_gif(data, args.output, frames=None if args.every else round(args.duration * args.fps),
+                       every=args.every, fps=args.fps, width=args.width, height=args.height, workers=args.workers)
+    print(f'{args.algorithm} / {args.initiator} / n={args.size}: {count} frames written to {args.output}',
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,276 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+import Scene
+
+
+@dataclass
+class Palette:
+    """
+    RGB colors for the parts of a Framebuffer, by default the colors of Diagram.Settings.ColorPalette.
+    """
+    background: tuple[int, int, int] = (255, 255, 255)
+    slot_space_compare: tuple[int, int, int] = (179, 179, 179)
+    slot_space_swap: tuple[int, int, int] = (60, 179, 113)
+    slot_head_default: tuple[int, int, int] = (0, 0, 0)
+    slot_body_default: tuple[int, int, int] = (135, 206, 235)
+    slot_body_mark: tuple[int, int, int] = (205, 92, 92)
+    slot_body_replace: tuple[int, int, int] = (93, 71, 139)
+    slot_body_range: tuple[int, int, int] = (173, 216, 230)
+    focus_rectangle: tuple[int, int, int] = (220, 220, 220)
+
+
+class Framebuffer:
+    """
+    RGB image of the bars of a Scene.Scene that is updated incrementally.
+
+    If there are at least as many pixel columns as slots, every slot is drawn as a bar of one or more pixel columns,
+    followed by separating columns if there is enough space. Otherwise every pixel column shows a range of slots: the
+    body reaches up to the lowest of their heights, a lighter band up to the highest and the head is drawn at the
+    height of the last slot of the range.
+
+    Drawing a scene only redraws the pixel columns whose heights or colors changed since the scene has been drawn
+    last. The lowest, highest and last height of every pixel column are kept and updated from the changed slots: a new
+    height can only widen the range of its column, and the slots of a column are only scanned again if a slot that
+    held its lowest or highest height has been changed. Thus the cost of a frame depends on the number of changed
+    slots and pixel columns rather than on the number of slots.
+
+    Attributes
+    ----------
+    pixels: np.ndarray
+        Image of shape (height, width, 3) with the first row at the top.
+    """
+
+    def __init__(self, n: int, width: int, height: int, palette: Palette = Palette()):
+        self._palette: Palette = palette
+
+        self.pixels: np.ndarray = np.empty((height, width, 3), dtype=np.uint8)
+
+        if n <= width:
+            # horizontal layout: pixel columns per slot, of which the last ones separate the slot from the next one
+            pitch = width // n
+            separation = round(pitch * 3 / 11)
+            margin = (width - n * pitch) // 2
+
+            # first pixel column of the bar of every slot and number of pixel columns of a bar
+            self._slot_column: np.ndarray = margin + np.arange(n) * pitch
+            self._bar_width: int = pitch - separation
+
+            # range of slots drawn in every pixel column, empty for separating columns and margins
+            column = np.arange(width) - margin
+            bar = (column >= 0) & (column < n * pitch) & (column % pitch < self._bar_width)
+            self._column_start: np.ndarray = np.where(bar, column // pitch, 0)
+            self._column_stop: np.ndarray = np.where(bar, column // pitch + 1, 0)
+        else:
+            # range of slots drawn in every pixel column
+            self._column_start: np.ndarray = np.arange(width) * n // width
+            self._column_stop: np.ndarray = np.arange(1, width + 1) * n // width
+
+            # pixel column of every slot
+            self._slot_column: np.ndarray = np.searchsorted(self._column_stop, np.arange(n), side='right')
+            self._bar_width: int = 1
+
+        # for a range of slots per pixel column: heights of the slots that have been drawn and lowest, highest and
+        # last height of every pixel column
+        self._aggregated: bool = n > width
+        self._heights: np.ndarray = np.empty(0)
+        self._low: np.ndarray = np.empty(0)
+        self._high: np.ndarray = np.empty(0)
+        self._last: np.ndarray = np.empty(0)
+
+        # vertical layout: height of the head of a bar in pixels and pixels per unit of height
+        self._head: int = max(1, min(self._bar_width, height // 64))
+        self._scale: float = 1.0
+
+        # currently drawn colors of spaces and bodies that are not colored by default and currently drawn focus
+        self._space_colors: dict[int, tuple[int, int, int]] = {}
+        self._body_colors: dict[int, tuple[int, int, int]] = {}
+        self._focus: tuple[int, int] | None = None
+
+        # pixel rows counted from the bottom
+        self._rows: np.ndarray = np.arange(height)[::-1, None]
+
+    @property
+    def width(self) -> int:
+        return self.pixels.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.pixels.shape[0]
+
+    def reset(self, heights: np.ndarray, max_height: int | None = None) -> None:
+        # scale heights so that max_height, by default the highest bar, fits
+        if max_height is None:
+            max_height = int(np.max(heights, initial=0))
+        self._scale = (self.height - self._head) / max(max_height, 1)
+
+        # lowest, highest and last height of every pixel column
+        if self._aggregated:
+            self._heights = np.array(heights)
+            self._low, self._high, self._last = self._aggregate(self._heights, self._column_start, self._column_stop)
+
+        # draw all bars without highlights
+        self._space_colors = {}
+        self._body_colors = {}
+        self._focus = None
+        self._draw_columns(np.arange(self.width), np.asarray(heights))
+
+    def draw(self, scene: Scene.Scene) -> tuple[int, int] | None:
+        """
+        Draw the net change of the scene since it has been drawn last.
+
+        Returns
+        -------
+        tuple[int, int] | None
+            First and last + 1 pixel column that changed, None if nothing changed.
+        """
+        # pixel columns whose lowest, highest or last height changed, or slots whose height changed
+        columns = []
+        dirty = scene.take_dirty()
+        if self._aggregated:
+            columns.append(self._update_aggregates(np.array(dirty, dtype=np.int64), scene.heights))
+            slots = set()
+        else:
+            slots = set(dirty)
+
+        # slots whose space changed color
+        space_colors = {pos: self._palette.slot_space_compare for pos in scene.compared}
+        space_colors.update({pos: self._palette.slot_space_swap for pos in scene.swapped})
+        slots.update(pos for pos in self._space_colors.keys() | space_colors.keys()
+                     if self._space_colors.get(pos) != space_colors.get(pos))
+        self._space_colors = space_colors
+
+        # slots whose body changed color
+        body_colors = {pos: self._palette.slot_body_replace for pos in scene.replaced}
+        body_colors.update({pos: self._palette.slot_body_mark for pos in scene.marked})
+        slots.update(pos for pos in self._body_colors.keys() | body_colors.keys()
+                     if self._body_colors.get(pos) != body_colors.get(pos))
+        self._body_colors = body_colors
+
+        # pixel columns of these slots
+        slots = np.fromiter(slots, dtype=np.int64, count=len(slots))
+        columns.append((self._slot_column[slots][:, None] + np.arange(self._bar_width)).ravel())
+
+        # pixel columns that are covered by either the previous or the current focus
+        if scene.focus != self._focus:
+            bounds = sorted(bound for focus in (self._focus, scene.focus) if focus
+                            for bound in self._focus_columns(focus))
+            columns.extend(np.arange(start, stop) for start, stop in zip(bounds[::2], bounds[1::2]))
+            self._focus = scene.focus
+
+        columns = np.unique(np.concatenate(columns))
+        if not len(columns):
+            return None
+
+        self._draw_columns(columns, scene.heights)
+
+        return int(columns[0]), int(columns[-1]) + 1
+
+    def ppm(self, start: int = 0, stop: int | None = None) -> bytes:
+        # binary PPM image of the pixel columns from start to stop
+        pixels = self.pixels[:, start:stop]
+        return b'P6 %d %d 255 ' % (pixels.shape[1], pixels.shape[0]) + pixels.tobytes()
+
+    def _focus_columns(self, focus: tuple[int, int]) -> tuple[int, int]:
+        # first and last + 1 pixel column of the focus rectangle
+        return int(self._slot_column[focus[0]]), int(self._slot_column[focus[1]]) + self._bar_width
+
+    def _draw_columns(self, columns: np.ndarray, heights: np.ndarray) -> None:
+        # draw the given pixel columns
+        start = self._column_start[columns]
+        stop = self._column_stop[columns]
+        bars = stop > start
+        palette = self._palette
+
+        # background is the focus rectangle or the background of the diagram
+        background = np.empty((len(columns), 3), dtype=np.uint8)
+        background[:] = palette.background
+        if self._focus:
+            focus_start, focus_stop = self._focus_columns(self._focus)
+            background[(columns >= focus_start) & (columns < focus_stop)] = palette.focus_rectangle
+
+        # colors of spaces and bodies, a column is highlighted if any of its slots is highlighted
+        space = background.copy()
+        for pos, color in self._space_colors.items():
+            space[(start <= pos) & (pos < stop)] = color
+        body = np.empty_like(background)
+        body[:] = palette.slot_body_default
+        for pos, color in self._body_colors.items():
+            body[(start <= pos) & (pos < stop)] = color
+
+        # lowest, highest and last height of the slots of every column
+        if self._aggregated:
+            low, high, last = self._low[columns], self._high[columns], self._last[columns]
+        else:
+            low, high, last = (np.zeros(len(columns), dtype=heights.dtype) for _ in range(3))
+            low[bars] = high[bars] = last[bars] = heights[start[bars]]
+
+        # heights in pixels
+        low_top = np.round(low * self._scale).astype(np.int32)
+        high_top = np.round(high * self._scale).astype(np.int32)
+        head_bottom = np.round(last * self._scale).astype(np.int32)
+        head_top = np.where(bars, head_bottom + self._head, 0)
+
+        # colors of the parts of every column: space, head, body and range
+        colors = np.stack((np.where(bars[:, None], space, background),
+                           np.broadcast_to(np.array(palette.slot_head_default, dtype=np.uint8), space.shape),
+                           body,
+                           np.broadcast_to(np.array(palette.slot_body_range, dtype=np.uint8), space.shape)),
+                          axis=1).reshape(-1, 3)
+
+        # part of every pixel: 0 for space, 1 for head, 2 for body and 3 for range, looked up in colors of its column
+        part = 3 * (self._rows < high_top).view(np.uint8) - (self._rows < low_top).view(np.uint8)
+        part[(self._rows >= head_bottom) & (self._rows < head_top)] = 1
+        image = np.take(colors, part.astype(np.int32) + np.arange(len(columns), dtype=np.int32) * 4, axis=0)
+
+        # copy columns into the image
+        if columns[-1] - columns[0] + 1 == len(columns):
+            self.pixels[:, columns[0]:columns[-1] + 1] = image
+        else:
+            self.pixels[:, columns] = image
+
+    def _update_aggregates(self, slots: np.ndarray, heights: np.ndarray) -> np.ndarray:
+        # update lowest, highest and last height of the pixel columns of the slots whose height changed and return
+        # the pixel columns where any of them changed, the others look the same
+        old = self._heights[slots]
+        new = heights[slots]
+        changed = old != new
+        slots, old, new = slots[changed], old[changed], new[changed]
+        if not len(slots):
+            return np.empty(0, dtype=np.int64)
+        self._heights[slots] = new
+        columns = self._slot_column[slots]
+        touched = np.unique(columns)
+        before = (self._low[touched], self._high[touched], self._last[touched])
+
+        # a column has to be scanned again if a slot that held its lowest or highest height changed
+        rescan = np.unique(columns[(old == self._low[columns]) | (old == self._high[columns])])
+
+        # new heights widen the range of their columns
+        np.minimum.at(self._low, columns, new)
+        np.maximum.at(self._high, columns, new)
+
+        # the last slot of a column determines its last height
+        last = slots == self._column_stop[columns] - 1
+        self._last[columns[last]] = new[last]
+
+        if len(rescan):
+            self._low[rescan], self._high[rescan], _ = self._aggregate(self._heights, self._column_start[rescan],
+                                                                      self._column_stop[rescan])
+
+        return touched[(self._low[touched] != before[0]) | (self._high[touched] != before[1]) |
+                       (self._last[touched] != before[2])]
+
+    @staticmethod
+    def _aggregate(heights: np.ndarray, start: np.ndarray,
+                   stop: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # lowest, highest and last height of the slots from start to stop
+        last = heights[stop - 1]
+        lengths = stop - start
+        if np.all(lengths == 1):
+            return last, last, last
+
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        values = heights[np.repeat(start - offsets, lengths) + np.arange(offsets[-1] + lengths[-1])]
+        return np.minimum.reduceat(values, offsets), np.maximum.reduceat(values, offsets), last
@@ -4,54 +4,76 @@ import numpy as np
 class Initiator:
     """
     Base class for initiating the array that will be sorted.
+
+    Subclasses implement initiate_batch, which creates many arrays at once with operations on whole batches instead
+    of one array after another.
     """
 
-    @staticmethod
-    def initiate(n: int) -> np.ndarray:
+    def initiate(self, n: int, rng: np.random.Generator | None = None) -> np.ndarray:
         """
 
         Parameters
         ----------
         n: int
             Size of array that will be initiated.
+        rng: np.random.Generator | None
+            Random number generator, by default a generator seeded from the global random state, so np.random.seed
+            makes the array reproducible.
 
         Returns
         -------
         np.ndarray
             Array that will be sorted.
         """
+        return self.initiate_batch(1, n, rng)[0]
+
+    def initiate_batch(self, k: int, n: int, rng: np.random.Generator | None = None) -> np.ndarray:
+        """
+
+        Parameters
+        ----------
+        k: int
+            Number of arrays that will be initiated.
+        n: int
+            Size of every array.
+        rng: np.random.Generator | None
+            Random number generator, by default a generator seeded from the global random state.
+
+        Returns
+        -------
+        np.ndarray
+            Arrays that will be sorted as rows of an array of shape (k, n).
+        """
         pass
 
 
 class PermutationInitiator(Initiator):
 
-    @staticmethod
-    def initiate(n: int) -> np.ndarray:
-        return np.random.permutation(np.arange(1, n + 1))
+    def initiate_batch(self, k: int, n: int, rng: np.random.Generator | None = None) -> np.ndarray:
+        return _permutations(k, n, _generator(rng), start=1)
 
 
 class ReverseInitiator(Initiator):
 
-    @staticmethod
-    def initiate(n: int) -> np.ndarray:
-        return np.arange(n, 0, -1)
+    def initiate_batch(self, k: int, n: int, rng: np.random.Generator | None = None) -> np.ndarray:
+        return np.broadcast_to(np.arange(n, 0, -1), (k, n)).copy()
 
 
 class TranspositionInitiater(Initiator):
 
-    @staticmethod
-    def initiate(n: int) -> np.ndarray:
-        # determine random positions to swap
-        pos_1 = np.random.randint(0, n - 2)
-        pos_2 = pos_1 + np.random.randint(1, n - pos_1 - 1)
+    def initiate_batch(self, k: int, n: int, rng: np.random.Generator | None = None) -> np.ndarray:
+        rng = _generator(rng)
+
+        # determine random positions to swap in every row
+        pos_1 = rng.integers(0, n - 2, size=k)
+        pos_2 = pos_1 + rng.integers(1, n - pos_1 - 1)
 
         # generate data
-        data = np.arange(1, n + 1)
+        data = _ascending(k, n)
 
         # swap
-        temp = data[pos_1]
-        data[pos_1] = data[pos_2]
-        data[pos_2] = temp
+        rows = np.arange(k)
+        data[rows, pos_1], data[rows, pos_2] = data[rows, pos_2], data[rows, pos_1]
 
         # return data
         return data
@@ -59,26 +81,95 @@ class TranspositionInitiater(Initiator):
 
 class LocalInitiator(Initiator):
 
-    @staticmethod
-    def initiate(n: int) -> np.ndarray:
-        # length of section for shuffling
-        length = int(np.floor(n / np.random.randint(2, 7)))
+    def initiate_batch(self, k: int, n: int, rng: np.random.Generator | None = None) -> np.ndarray:
+        rng = _generator(rng)
+
+        # length of section for shuffling in every row
+        length = n // rng.integers(2, 7, size=k)
 
         # determine local section for shuffling
-        pos = np.random.randint(0, n - length - 1)
+        pos = rng.integers(0, n - length - 1)
 
         # generate data
-        data = np.arange(1, n + 1)
+        data = _ascending(k, n)
 
-        # perform shuffling
-        data[pos:pos + length] = np.random.permutation(data[pos:pos + length])
+        # perform shuffling, all rows with sections of the same length at once
+        for section_length in np.unique(length):
+            rows = np.flatnonzero(length == section_length)
+            columns = pos[rows, None] + np.arange(section_length)
+            data[rows[:, None], columns] = pos[rows, None] + _permutations(len(rows), section_length, rng, start=1)
 
         # return data
         return data
 
 
-class SortedInitiator:
+class SortedInitiator(Initiator):
+
+    def initiate_batch(self, k: int, n: int, rng: np.random.Generator | None = None) -> np.ndarray:
+        return _ascending(k, n)
+
+
+class FewUniqueInitiator(Initiator):
+    """
+    Permuted data of only a few distinct values, which are spread evenly over 1, ..., n and occur about equally often.
+    """
+
+    def __init__(self, unique: int = 8):
+        # number of distinct values
+        self._unique: int = unique
+
+    def initiate_batch(self, k: int, n: int, rng: np.random.Generator | None = None) -> np.ndarray:
+        rng = _generator(rng)
+
+        # distinct values and a random one of them for every entry
+        values = np.maximum(np.arange(1, self._unique + 1) * n // self._unique, 1)
+        return values[rng.integers(0, self._unique, size=(k, n))]
+
+
+class ZipfInitiator(Initiator):
+    """
+    Data whose values follow a Zipf distribution over 1, ..., n: the i-th most frequent value occurs about
+    1 / i ** exponent times as often as the most frequent one. Which values are frequent is random, so frequent values
+    are not only the smallest ones.
+    """
+
+    def __init__(self, exponent: float = 1.0):
+        # exponent of the distribution, larger exponents give fewer frequent values
+        self._exponent: float = exponent
+
+    def initiate_batch(self, k: int, n: int, rng: np.random.Generator | None = None) -> np.ndarray:
+        rng = _generator(rng)
+
+        # draw the rank of every entry from the cumulative distribution of the ranks
+        cumulative = np.cumsum(np.arange(1, n + 1, dtype=np.float64) ** -self._exponent)
+        ranks = np.searchsorted(cumulative, rng.random(size=(k, n)) * cumulative[-1:], side='right')
+        ranks = np.minimum(ranks, n - 1)
+
+        # value of every rank in every row
+        return np.take_along_axis(_permutations(k, n, rng, start=1), ranks, axis=1)
+
+
+def _generator(rng: np.random.Generator | None) -> np.random.Generator:
+    # given generator or a generator seeded from the global random state
+    if rng is None:
+        return np.random.default_rng(np.random.randint(2 ** 32, dtype=np.int64))
+    return rng
+
+
+def _ascending(k: int, n: int) -> np.ndarray:
+    # k rows of 1, ..., n
+    return np.broadcast_to(np.arange(1, n + 1), (k, n)).copy()
+
 
-    @staticmethod
-    def initiate(n: int) -> np.ndarray:
-        return np.arange(1, n + 1)
\ No newline at end of file
+def _permutations(k: int, n: int, rng: np.random.Generator, start: int = 0) -> np.ndarray:
+    # k independent random permutations of start, ..., start + n - 1 as rows, sorting random keys whose lowest bits
+    # hold the position is considerably faster than shuffling every row
+    bits = max(int(n - 1).bit_length(), 1)
+    keys = rng.integers(0, 2 ** 64, size=(k, n), dtype=np.uint64)
+    keys &= np.uint64(~((1 << bits) - 1) & (2 ** 64 - 1))
+    keys |= np.arange(n, dtype=np.uint64)
+    keys.sort(axis=1)
+    keys &= np.uint64((1 << bits) - 1)
+    permutations = keys.view(np.int64)
+    permutations += start
+    return permutations
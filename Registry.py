@@ -0,0 +1,48 @@
+"""
+Available initiators and sorting algorithms by name.
+
+This module does not depend on tkinter, so it can be used by the headless tools as well as by the View.
+
+Attributes
+----------
+InitializationAlgorithms: dict[str, Initiator.Initiator]
+    Name and a class instance of an initiator used for initializing the array that should be sorted.
+
+SortingAlgorithms: dict[str, Sorter.Sorter]
+    Name and a class instance of a sorting algorithm.
+"""
+
+import Initiator
+import SortingAlgorithms
+
+InitializationAlgorithms = {'Permutation': Initiator.PermutationInitiator(),
+                            'Local': Initiator.LocalInitiator(),
+                            'Transposition': Initiator.TranspositionInitiater(),
+                            'Reverse': Initiator.ReverseInitiator(),
+                            'Sorted': Initiator.SortedInitiator(),
+                            'Few Unique': Initiator.FewUniqueInitiator(),
+                            'Zipf': Initiator.ZipfInitiator()}
+
+SortingAlgorithms = {'Selectionsort': SortingAlgorithms.SelectionSorter(),
+                     'Heapsort': SortingAlgorithms.HeapSorter(),
+                     'Insertionsort': SortingAlgorithms.InsertionSorter(),
+                     'Shellsort': SortingAlgorithms.ShellSorter(),
+                     'Bubblesort': SortingAlgorithms.BubbleSorter(),
+                     'Shakersort': SortingAlgorithms.ShakerSorter(),
+                     'Combsort': SortingAlgorithms.CombSorter(),
+                     'Quicksort': SortingAlgorithms.QuickSorter(),
+                     'Quicksort (Median)': SortingAlgorithms.MedianQuickSorter(),
+                     'Quicksort (Random)': SortingAlgorithms.RandomQuickSorter(),
+                     'Quicksort (Cutoff)': SortingAlgorithms.MedianQuickSorter(cutoff=16),
+                     'Quicksort (3-Way)': SortingAlgorithms.ThreeWayQuickSorter(),
+                     'Quicksort (Dual Pivot)': SortingAlgorithms.DualPivotQuickSorter(),
+                     'Introsort': SortingAlgorithms.IntroSorter(),
+                     'Pdqsort': SortingAlgorithms.PdqSorter(),
+                     'Mergesort': SortingAlgorithms.MergeSorter(),
+                     'Mergesort (Straight)': SortingAlgorithms.StraightMergeSorter(),
+                     'Mergesort (Natural)': SortingAlgorithms.NaturalMergeSorter(),
+                     'Timsort': SortingAlgorithms.TimSorter(),
+                     'Radixsort': SortingAlgorithms.DecimalRadixSorter(),
+                     'Radixsort (Binary)': SortingAlgorithms.BinaryRadixSorter(),
+                     'Radixsort (LSD)': SortingAlgorithms.LSDRadixSorter(radix_bits=8),
+                     'Radixsort (LSD, Radix 16)': SortingAlgorithms.LSDRadixSorter(radix_bits=4)}
@@ -0,0 +1,146 @@
+"""
+Replay of the steps of a trace without visualizing them.
+
+Swaps and replacements are applied to a NumPy array in blocks of steps instead of one step after another. Every swap
+writes both of its slots and every replacement writes its slot. The value written by a replacement is its height and
+the value written by a swap into one slot is the value of the last write into the other slot before the swap, or the
+value of the other slot before the block if there is none. Following these links from every write with pointer
+jumping determines all values that are written in a block in a logarithmic number of vectorized passes, so the data
+after any step is restored without a loop over the steps.
+"""
+
+import numpy as np
+
+import Scene
+import Trace
+from SortingSteps import Opcode
+
+
+def states(initial_data: np.ndarray, columns: tuple[np.ndarray, ...], positions: np.ndarray,
+           block_size: int = 1 << 18) -> np.ndarray:
+    """
+    Determine the data after the steps up to every position.
+
+    Parameters
+    ----------
+    initial_data: np.ndarray
+        Data before the first step.
+    columns: tuple[np.ndarray, ...]
+        Columns of the steps (see Trace.Trace.columns).
+    positions: np.ndarray
+        Ascending numbers of steps that have been applied.
+    block_size: int
+        Number of steps that are applied at once.
+
+    Returns
+    -------
+    np.ndarray
+        Data after the steps up to every position as rows of an array of shape (len(positions), len(initial_data)).
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    result = np.empty((len(positions), len(initial_data)), dtype=initial_data.dtype)
+    state = initial_data.copy()
+
+    # apply blocks of steps and take the states of the positions within every block
+    start = 0
+    taken = 0
+    while taken < len(positions):
+        stop = min(start + block_size, len(columns[0]))
+        end = taken + int(np.searchsorted(positions[taken:], stop, side='right'))
+        result[taken:end] = _apply_block(state, tuple(column[start:stop] for column in columns[:3]),
+                                         positions[taken:end] - start)
+        taken = end
+        start = stop
+
+    return result
+
+
+def apply(state: np.ndarray, columns: tuple[np.ndarray, ...], block_size: int = 1 << 18) -> None:
+    """
+    Apply the swaps and replacements of the steps given by columns to state.
+    """
+    for start in range(0, len(columns[0]), block_size):
+        _apply_block(state, tuple(column[start:start + block_size] for column in columns[:3]),
+                     np.empty(0, dtype=np.int64))
+
+
+def counts(opcode: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """
+    Number of comparisons, swaps and replacements up to every position as rows of an array of shape
+    (len(positions), 3).
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    return np.stack([np.searchsorted(np.flatnonzero(opcode == op), positions)
+                     for op in (Opcode.COMPARISON, Opcode.SWAP, Opcode.REPLACE)], axis=1).astype(np.int64)
+
+
+def seek(initial_data: np.ndarray, steps: Trace.Trace, position: int) -> Scene.Scene:
+    """
+    Scene after the steps up to position have been applied, with the data, the number of comparisons, swaps and
+    replacements, the highlighted slots and the focused and marked slots.
+    """
+    position = min(max(position, 0), len(steps))
+    columns = steps.columns()
+    state = initial_data.copy()
+    apply(state, tuple(column[:position] for column in columns))
+    scene = Scene.Scene(state, tuple(int(count) for count in counts(columns[0], [position])[0]))
+    scene.set_highlights(*steps.highlights(position))
+    scene.set_markings(*steps.markings(position))
+    return scene
+
+
+def _apply_block(state: np.ndarray, columns: tuple[np.ndarray, ...], positions: np.ndarray) -> np.ndarray:
+    # apply the steps of a block to state and return the states after the steps up to the positions in the block
+    opcode, pos_1, pos_2 = columns
+    length = len(opcode)
+    swaps = np.flatnonzero(opcode == Opcode.SWAP)
+    replacements = np.flatnonzero(opcode == Opcode.REPLACE)
+
+    # writes of the block: slot that is written, slot that is read (-1 for a replacement), step and written height
+    # of a replacement
+    written = np.concatenate((pos_1[swaps], pos_2[swaps], pos_1[replacements])).astype(np.int64)
+    read = np.concatenate((pos_2[swaps], pos_1[swaps], np.full(len(replacements), -1))).astype(np.int64)
+    time = np.concatenate((swaps, swaps, replacements))
+    heights = pos_2[replacements]
+
+    # writes in order of slot and step
+    keys = written * (length + 1) + time
+    order = np.argsort(keys, kind='stable')
+    keys, written, read, time = keys[order], written[order], read[order], time[order]
+    is_replacement = order >= 2 * len(swaps)
+
+    # last write into the read slot before the step, which is the write the value comes from
+    link = np.searchsorted(keys, read * (length + 1) + time) - 1
+    linked = (read >= 0) & (link >= 0)
+    linked[linked] = written[link[linked]] == read[linked]
+
+    # values of writes without a link, which are the written heights or the values before the block
+    values = np.empty(len(keys), dtype=state.dtype)
+    values[is_replacement] = heights[order[is_replacement] - 2 * len(swaps)]
+    unlinked = ~linked & ~is_replacement
+    values[unlinked] = state[read[unlinked]]
+
+    # follow the links until a write without a link is reached, every pass doubles the distance that is skipped
+    active = np.flatnonzero(linked)
+    while len(active):
+        target = link[active]
+        resolved = ~linked[target]
+        values[active[resolved]] = values[target[resolved]]
+        linked[active[resolved]] = False
+        active = active[~resolved]
+        link[active] = link[target[~resolved]]
+
+    # states after the steps up to the positions, which are the last writes into every slot before the position
+    slots, first = np.unique(written, return_index=True)
+    result = np.empty((len(positions), len(state)), dtype=state.dtype)
+    for k, position in enumerate(positions.tolist()):
+        last = np.searchsorted(keys, slots * (length + 1) + position) - 1
+        valid = last >= first
+        result[k] = state
+        result[k, slots[valid]] = values[last[valid]]
+
+    # state after the block
+    last = np.searchsorted(written, slots, side='right') - 1
+    state[slots] = values[last]
+
+    return result
@@ -0,0 +1,166 @@
+import numpy as np
+
+from SortingSteps import Opcode
+
+
+class Scene:
+    """
+    State of the visualization after a number of steps: heights of the slots, the highlighted, marked and focused
+    slots and the number of comparisons, swaps and replacements.
+
+    Steps are applied to the scene without drawing anything and a diagram draws the net change of the scene since it
+    was drawn last. Thus any number of steps can be applied between two frames.
+
+    Attributes
+    ----------
+    heights: np.ndarray
+        Heights of the slots.
+    compared, swapped: tuple[int, ...]
+        Positions of the slots of the last comparison or swap, empty if the highlight has been cleared.
+    marked: list[int]
+        Positions of the marked slots. Marked slots move along when they are swapped.
+    replaced: list[int]
+        Positions of the replaced slots.
+    focus: tuple[int, int] | None
+        from_pos and to_pos of the focused slots, None if no slots are focused.
+    comparison_count, swap_count, replace_count: int
+        Number of comparisons, swaps and replacements.
+    """
+
+    def __init__(self, heights: np.ndarray, counts: tuple[int, int, int] = (0, 0, 0)):
+        self.heights: np.ndarray = np.array(heights)
+        self.compared: tuple[int, ...] = ()
+        self.swapped: tuple[int, ...] = ()
+        self.marked: list[int] = []
+        self.replaced: list[int] = []
+        self.focus: tuple[int, int] | None = None
+        self.comparison_count, self.swap_count, self.replace_count = counts
+
+        # positions of the slots whose height changed since the scene has been drawn
+        self._dirty: set[int] = set()
+
+    def apply(self, columns: tuple[np.ndarray, ...]) -> None:
+        """
+        Apply the steps given by the columns of a trace (see Trace.Trace.columns) in order.
+        """
+        opcode, pos_1, pos_2 = columns[:3]
+
+        # count steps
+        self.comparison_count += int(np.count_nonzero(opcode == Opcode.COMPARISON))
+        self.swap_count += int(np.count_nonzero(opcode == Opcode.SWAP))
+        self.replace_count += int(np.count_nonzero(opcode == Opcode.REPLACE))
+
+        heights = self.heights
+        for op, p_1, p_2 in zip(opcode.tolist(), pos_1.tolist(), pos_2.tolist()):
+            match op:
+                case Opcode.COMPARISON:
+                    self.compared = (p_1, p_2)
+                    self.swapped = ()
+
+                case Opcode.SWAP:
+                    heights[p_1], heights[p_2] = heights[p_2], heights[p_1]
+                    self._swap_markings(p_1, p_2)
+                    self._dirty.update((p_1, p_2))
+                    self.compared = ()
+                    self.swapped = (p_1, p_2)
+
+                case Opcode.MARK:
+                    if not p_2:
+                        self.marked = []
+                    self.marked.append(p_1)
+
+                case Opcode.UNMARK:
+                    self.marked = []
+
+                case Opcode.FOCUS:
+                    self.clean()
+                    self.focus = (p_1, p_2)
+
+                case Opcode.UNFOCUS:
+                    self.focus = None
+
+                case Opcode.REPLACE:
+                    heights[p_1] = p_2
+                    self._dirty.add(p_1)
+                    self.compared = ()
+                    self.swapped = ()
+                    self.replaced = [p_1]
+
+                case Opcode.UNREPLACE:
+                    self.replaced = []
+
+    def undo(self, columns: tuple[np.ndarray, ...]) -> bool:
+        """
+        Undo the steps given by the columns of a trace in reverse order.
+
+        The highlights after the remaining steps depend on steps before the undone ones, so they have to be restored
+        by set_highlights.
+
+        Returns
+        -------
+        bool
+            True if a mark or focus has been undone, then the markings have to be restored by set_markings.
+        """
+        opcode, pos_1, pos_2, _, aux = columns
+
+        # count steps
+        self.comparison_count -= int(np.count_nonzero(opcode == Opcode.COMPARISON))
+        self.swap_count -= int(np.count_nonzero(opcode == Opcode.SWAP))
+        self.replace_count -= int(np.count_nonzero(opcode == Opcode.REPLACE))
+
+        markings_changed = False
+        heights = self.heights
+        for op, p_1, p_2, old_height in zip(opcode[::-1].tolist(), pos_1[::-1].tolist(), pos_2[::-1].tolist(),
+                                            aux[::-1].tolist()):
+            match op:
+                case Opcode.SWAP:
+                    # swapping the slots again undoes the swap
+                    heights[p_1], heights[p_2] = heights[p_2], heights[p_1]
+                    self._swap_markings(p_1, p_2)
+                    self._dirty.update((p_1, p_2))
+
+                case Opcode.REPLACE:
+                    heights[p_1] = old_height
+                    self._dirty.add(p_1)
+
+                case Opcode.COMPARISON | Opcode.UNREPLACE:
+                    pass
+
+                case _:
+                    markings_changed = True
+
+        return markings_changed
+
+    def set_highlights(self, compared: tuple[int, ...], swapped: tuple[int, ...], replaced: list[int]) -> None:
+        # restore compared, swapped and replaced slots
+        self.compared = tuple(compared)
+        self.swapped = tuple(swapped)
+        self.replaced = list(replaced)
+
+    def set_markings(self, focus: tuple[int, int] | None, marks: list[int]) -> None:
+        # restore focused and marked slots
+        self.focus = focus
+        self.marked = list(marks)
+
+    def clean(self) -> None:
+        # clear all highlights, marks and the focus
+        self.compared = ()
+        self.swapped = ()
+        self.marked = []
+        self.replaced = []
+        self.focus = None
+
+    def take_dirty(self) -> list[int]:
+        # positions of the slots whose height changed since the last call
+        dirty = sorted(self._dirty)
+        self._dirty.clear()
+        return dirty
+
+    def _swap_markings(self, pos_1: int, pos_2: int) -> None:
+        # marked and replaced slots move along with the swapped slots
+        for markings in (self.marked, self.replaced):
+            for i, pos in enumerate(markings):
+                if pos == pos_1:
+                    markings[i] = pos_2
+                elif pos == pos_2:
+                    markings[i] = pos_1
@@ -1,31 +1,82 @@
+import copy
+import threading
+
 import numpy as np
 
-import SortingSteps
+import Trace
+from SortingSteps import Opcode
+
+
+class _Recording(threading.local):
+    """
+    Trace the steps of the sorting process running in the current thread are recorded into.
+    """
+
+    def __init__(self):
+        self.steps: Trace.Trace | Trace.StepCounter = Trace.Trace()
 
 
 class Sorter:
     """
     Base class for a sorting algorithm.
 
+    Every round of sorting records its steps into its own trace. The trace is held per thread, so several sorting
+    processes can run in parallel threads, and every round of sorting works on its own copy of the sorter.
+
     Methods
     -------
     sort(data)
-        Wrapper for sorting data. Returns list of steps of sorting processes.
+        Wrapper for sorting data. Returns the trace of the steps of the sorting process.
+    stream(data, steps)
+        Wrapper for sorting data that hands the steps of the sorting process over to a trace stream.
+    count(data)
+        Wrapper for sorting data that only counts the steps of the sorting process by type.
+    record(data, steps)
+        Wrapper for sorting data that records the steps of the sorting process into steps.
     execute(data)
         This method should be overridden by the concrete sorting algorithm.
     """
 
-    _steps = []
+    _recording: _Recording = _Recording()
 
-    def sort(self, data: np.ndarray) -> list[SortingSteps.Step]:
-        # prepare new round of sorting
-        Sorter._steps.clear()
+    def sort(self, data: np.ndarray) -> Trace.Trace:
+        # record steps of this round of sorting into a new trace
+        steps = Trace.Trace()
+        self.record(data, steps)
 
-        # sort data
-        self.execute(data)
+        # data is sorted now
+        return steps
+
+    def stream(self, data: np.ndarray, steps: Trace.TraceStream) -> None:
+        try:
+            # record steps of this round of sorting into the stream
+            self.record(data, steps)
+        except Trace.TraceStream.Cancelled:
+            # consumer is not interested in further steps
+            pass
+        finally:
+            # hand over remaining steps
+            steps.close()
+
+    def count(self, data: np.ndarray) -> Trace.StepCounter:
+        # count steps of this round of sorting without keeping them
+        counter = Trace.StepCounter()
+        self.record(data, counter)
 
         # data is sorted now
-        return Sorter._steps
+        return counter
+
+    def record(self, data: np.ndarray, steps: Trace.Trace | Trace.StepCounter) -> None:
+        # record steps of the current thread into steps
+        previous_steps = Sorter._recording.steps
+        Sorter._recording.steps = steps
+
+        try:
+            # sort data using a copy of the sorter, so its working memory is not shared with other rounds of sorting
+            copy.copy(self).execute(data)
+        finally:
+            # restore steps of the current thread
+            Sorter._recording.steps = previous_steps
 
     def execute(self, data: np.ndarray) -> None:
         pass
@@ -33,7 +84,7 @@ class Sorter:
     @staticmethod
     def compare(data: np.ndarray, pos_1: int, pos_2: int, delay: bool = True) -> int:
         # append comparison step to steps
-        Sorter._steps.append(SortingSteps.Comparison(pos_1=pos_1, pos_2=pos_2, delay=delay))
+        Sorter._recording.steps.record(Opcode.COMPARISON, pos_1, pos_2, delay)
 
         # compare and return True if data[pos_1] is smaller than or equal to data[pos_2]
         return True if data[pos_1] <= data[pos_2] else False
@@ -46,39 +97,55 @@ class Sorter:
         data[pos_2] = temp
 
         # append swap step to steps
-        Sorter._steps.append(SortingSteps.Swap(pos_1=pos_1, pos_2=pos_2, delay=delay))
+        Sorter._recording.steps.record(Opcode.SWAP, pos_1, pos_2, delay)
+
+    @staticmethod
+    def swap_many(data: np.ndarray, pos_1: np.ndarray, pos_2: np.ndarray, delay: bool = True) -> None:
+        # swap entries at distinct positions at once
+        data[pos_1], data[pos_2] = data[pos_2], data[pos_1]
+
+        # append swap steps to steps in order
+        Sorter._recording.steps.record_many(Opcode.SWAP, pos_1, pos_2, delay)
 
     @staticmethod
     def mark(pos: int, multiple: bool = False, delay: bool = True) -> None:
         # append mark step to steps
-        Sorter._steps.append(SortingSteps.Mark(pos=pos, multiple=multiple, delay=delay))
+        Sorter._recording.steps.record(Opcode.MARK, pos, multiple, delay)
 
     @staticmethod
     def unmark(delay: bool = True) -> None:
         # append unmark step to steps
-        Sorter._steps.append(SortingSteps.Unmark(delay=delay))
+        Sorter._recording.steps.record(Opcode.UNMARK, delay=delay)
 
     @staticmethod
     def replace(data: np.ndarray, pos:int, height: int, delay: bool = True) -> None:
+        # append replace step to steps, keeping the old height for undoing the step
+        Sorter._recording.steps.record(Opcode.REPLACE, pos, height, delay, data[pos])
+
         # replace entry in data
         data[pos] = height
 
-        # append replace step to steps
-        Sorter._steps.append(SortingSteps.Replace(pos=pos, height=height, delay=delay))
+    @staticmethod
+    def replace_many(data: np.ndarray, positions: np.ndarray, heights: np.ndarray, delay: bool = True) -> None:
+        # append replace steps for distinct positions in order at once, keeping the old heights for undoing the steps
+        Sorter._recording.steps.record_many(Opcode.REPLACE, positions, heights, delay, data[positions])
+
+        # replace entries in data
+        data[positions] = heights
 
     @staticmethod
     def unreplace(delay: bool = True) -> None:
         # append unreplace step to steps
-        Sorter._steps.append(SortingSteps.Unreplace(delay=delay))
+        Sorter._recording.steps.record(Opcode.UNREPLACE, delay=delay)
 
 
     @staticmethod
     def focus(from_pos: int, to_pos: int, delay: bool = True) -> None:
         # append focus step to steps
-        Sorter._steps.append(SortingSteps.Focus(from_pos=from_pos, to_pos=to_pos, delay=delay))
+        Sorter._recording.steps.record(Opcode.FOCUS, from_pos, to_pos, delay)
 
     @staticmethod
     def unfocus(delay: bool = True) -> None:
         # append unfocus step to steps
-        Sorter._steps.append(SortingSteps.Unfocus(delay=delay))
+        Sorter._recording.steps.record(Opcode.UNFOCUS, delay=delay)
 
@@ -1,7 +1,7 @@
 import numpy as np
 
-import SortingSteps
 from Sorter import Sorter
+from SortingSteps import Opcode
 
 
 class SelectionSorter(Sorter):
@@ -26,29 +26,33 @@ class SelectionSorter(Sorter):
 class HeapSorter(Sorter):
 
     def execute(self, data: np.ndarray) -> None:
-        # heapify data
-        HeapSorter._heapify(data)
+        HeapSorter._heapsort(data, 0, len(data) - 1)
+
+    @staticmethod
+    def _heapsort(data: np.ndarray, l: int, r: int) -> None:
+        # heapify data[l], ..., data[r]
+        HeapSorter._heapify(data, l, r)
 
         # sort heap
-        for i in range(len(data) - 1, 0, -1):
-            Sorter.swap(data, 0, i)
-            HeapSorter._sift_down(data, 0, i - 1)
+        for i in range(r, l, -1):
+            Sorter.swap(data, l, i)
+            HeapSorter._sift_down(data, l, i - 1, l)
 
     @staticmethod
-    def _heapify(data: np.ndarray) -> None:
-        # transform data into a heap
-        n = len(data)
-        for i in range(int(n/2) - 1, -1, -1):
-            HeapSorter._sift_down(data, i, n - 1)
+    def _heapify(data: np.ndarray, l: int, r: int) -> None:
+        # transform data[l], ..., data[r] into a heap
+        n = r - l + 1
+        for i in range(l + n // 2 - 1, l - 1, -1):
+            HeapSorter._sift_down(data, i, r, l)
 
     @staticmethod
-    def _sift_down(data: np.ndarray, i: int, m: int) -> None:
-        # sift down data[i] up to data[m]
+    def _sift_down(data: np.ndarray, i: int, m: int, l: int = 0) -> None:
+        # sift down data[i] up to data[m] in the heap whose root is data[l]
         Sorter.focus(i, m)
         Sorter.mark(i)
-        while 2 * i + 1 <= m:
+        while 2 * i + 1 - l <= m:
             # data[i] has left child
-            j = 2 * i + 1
+            j = 2 * i + 1 - l
             # data[j] is left child
             if j < m:
                 # data[i] has right child (data[j + 1] is right child)
@@ -68,12 +72,17 @@ class HeapSorter(Sorter):
 class InsertionSorter(Sorter):
 
     def execute(self, data: np.ndarray) -> None:
-        for i in range(1, len(data)):
-            # insert data[i] at correct position in data[0], ..., data[i-1]
-            Sorter.focus(0, i, delay=False)
+        InsertionSorter._insertion_sort(data, 0, len(data) - 1)
+
+    @staticmethod
+    def _insertion_sort(data: np.ndarray, l: int, r: int) -> None:
+        # sort data[l], ..., data[r]
+        for i in range(l + 1, r + 1):
+            # insert data[i] at correct position in data[l], ..., data[i-1]
+            Sorter.focus(l, i, delay=False)
             Sorter.mark(i, delay=False)
             j = i
-            while j > 0:
+            while j > l:
                 # if data[j - 1] > data[j]
                 if Sorter.compare(data, j, j - 1):
                     Sorter.swap(data, j - 1, j)
@@ -209,55 +218,86 @@ class CombSorter(Sorter):
 
             for i in range(n - h):
                 j = i + h
-                # if data[i] > data[j]
-                if Sorter.compare(data, j, i):
+                # if data[i] > data[j], equal entries are not swapped, otherwise they would be swapped back and forth
+                # and the data would never be found sorted
+                if not Sorter.compare(data, i, j):
                     Sorter.swap(data, i, j)
                     sorted_flag = False
 
 
 class QuickSorter(Sorter):
+    """
+    Quicksort whose subarrays are kept on an explicit stack instead of being sorted recursively. The smaller subarray
+    of a partition is sorted first, so the stack holds O(log n) subarrays even if every partition is unbalanced.
+    Subarrays of at most cutoff entries are sorted by insertion sort.
 
-    def execute(self, data: np.ndarray) -> None:
-        self._quicksort(data, 0, len(data) - 1)
-
-    def _quicksort(self, data: np.ndarray, l: int, r: int) -> None:
+    Variants override _split, which partitions a subarray and returns the subarrays that are left to sort.
+    """
 
-        if r > l:
-            # set focus to subarray data[l], ..., data[r]
-            Sorter.focus(l, r)
+    def __init__(self, cutoff: int = 1):
+        # largest subarray that is sorted by insertion sort
+        self._cutoff: int = cutoff
 
-            # select position of pivot element
-            p = self._select_pivot_element(data, l, r)
-
-            # partition the data into two subarrays
-            # - the first containing the elements smaller than the pivot element
-            # - the second containing the elements bigger than the pivot element
-            i = l - 1
-            j = r
+    def execute(self, data: np.ndarray) -> None:
+        # subarrays data[l], ..., data[r] that are left to sort and the number of further partitions that are allowed
+        stack = [(0, len(data) - 1, self._max_depth(len(data)))]
+        while stack:
+            l, r, depth = stack.pop()
+            if r - l + 1 <= self._cutoff:
+                # sort small subarray
+                InsertionSorter._insertion_sort(data, l, r)
+            elif r > l:
+                subarrays = self._split(data, l, r, depth)
+
+                # sort the smaller subarrays first, they are put on top of the stack
+                subarrays.sort(key=lambda subarray: subarray[0] - subarray[1])
+                stack.extend((sub_l, sub_r, depth - 1) for sub_l, sub_r in subarrays)
+
+    def _max_depth(self, n: int) -> int:
+        # number of nested partitions after which _split is told to stop partitioning, partitions are never nested
+        # more than n times
+        return n
+
+    def _split(self, data: np.ndarray, l: int, r: int, depth: int) -> list[tuple[int, int]]:
+        # partition data[l], ..., data[r] around a pivot element and return the subarrays on both sides of it
+        i = self._partition(data, l, r)
+        return [(l, i - 1), (i + 1, r)]
+
+    def _partition(self, data: np.ndarray, l: int, r: int) -> int:
+        # set focus to subarray data[l], ..., data[r]
+        Sorter.focus(l, r)
+
+        # select position of pivot element
+        p = self._select_pivot_element(data, l, r)
+
+        # partition the data into two subarrays
+        # - the first containing the elements smaller than the pivot element
+        # - the second containing the elements bigger than the pivot element
+        i = l - 1
+        j = r
+        while i < j:
+            # find an element that is bigger than the pivot element
             while i < j:
-                # find an element that is bigger than the pivot element
-                while i < j:
-                    i += 1
-                    # if data[i] >= data[p]
-                    if Sorter.compare(data, p, i):
-                        break
-                # find an element that is smaller than the pivot element
-                while i < j:
-                    j -= 1
-                    # if data[j] <= data[p]
-                    if Sorter.compare(data, j, p):
-                        break
-                if i < j:
-                    # swap the elements if they are not the same
-                    Sorter.swap(data, i, j)
+                i += 1
+                # if data[i] >= data[p]
+                if Sorter.compare(data, p, i):
+                    break
+            # find an element that is smaller than the pivot element
+            while i < j:
+                j -= 1
+                # if data[j] <= data[p]
+                if Sorter.compare(data, j, p):
+                    break
+            if i < j:
+                # swap the elements if they are not the same
+                Sorter.swap(data, i, j)
+
+        # put the pivot element on its correct position if it is not already there
+        if i < p:
+            Sorter.swap(data, i, p)
 
-            # put the pivot element on its correct position if it is not already there
-            if i < p:
-                Sorter.swap(data, i, p)
-            # sort the first subarray
-            QuickSorter._quicksort(self, data, l, i - 1)
-            # sort the second subarray
-            QuickSorter._quicksort(self, data, i + 1, r)
+        # position of the pivot element
+        return i
 
     def _select_pivot_element(self, data: np.ndarray, l: int, r: int) -> int:
         # select element at position r as pivot element
@@ -307,6 +347,397 @@ class RandomQuickSorter(QuickSorter):
         return r
 
 
+class ThreeWayQuickSorter(RandomQuickSorter):
+    """
+    Quicksort with the three-way partition of Dijkstra (Dutch national flag), which splits a subarray into the entries
+    smaller than, equal to and bigger than the pivot element. The entries equal to the pivot element are in place
+    after the partition, so data with few distinct values takes far fewer steps. The pivot element is random, since
+    the partition leaves the bigger entries in reverse order, which a median of three pivot does not handle well.
+    """
+
+    def _split(self, data: np.ndarray, l: int, r: int, depth: int) -> list[tuple[int, int]]:
+        # the entries equal to the pivot element are in place
+        lt, gt = self._partition_three_way(data, l, r)
+        return [(l, lt - 1), (gt + 1, r)]
+
+    def _partition_three_way(self, data: np.ndarray, l: int, r: int) -> tuple[int, int]:
+        # set focus to subarray data[l], ..., data[r]
+        Sorter.focus(l, r)
+
+        # select position of pivot element and place it at the start of data[l], ..., data[r]
+        p = self._select_pivot_element(data, l, r)
+        if p != l:
+            Sorter.swap(data, p, l)
+
+        # partition the data into three subarrays
+        # - data[l], ..., data[lt - 1] containing the elements smaller than the pivot element
+        # - data[lt], ..., data[i - 1] containing the elements equal to the pivot element, data[lt] is always one of
+        #   them and is compared instead of the pivot element
+        # - data[gt + 1], ..., data[r] containing the elements bigger than the pivot element
+        lt = l
+        i = l + 1
+        gt = r
+        while i <= gt:
+            # if data[i] < data[lt]
+            if not Sorter.compare(data, lt, i):
+                Sorter.swap(data, lt, i)
+                lt += 1
+                i += 1
+            # if data[i] > data[lt]
+            elif not Sorter.compare(data, i, lt):
+                Sorter.swap(data, i, gt)
+                gt -= 1
+            else:
+                i += 1
+
+        # positions of the first and the last element equal to the pivot element
+        Sorter.unmark(delay=False)
+        return lt, gt
+
+
+class DualPivotQuickSorter(QuickSorter):
+    """
+    Quicksort with the dual pivot partition of Yaroslavskiy, which splits a subarray into the entries smaller than
+    the first pivot element, the entries between both pivot elements and the entries bigger than the second pivot
+    element. The pivot elements are taken at a third and two thirds of the subarray, so sorted data is split evenly.
+    If both pivot elements are equal, the entries between them are equal as well and are not sorted any further.
+    """
+
+    def _split(self, data: np.ndarray, l: int, r: int, depth: int) -> list[tuple[int, int]]:
+        # the entries between equal pivot elements are in place
+        lt, gt, distinct = self._partition_dual_pivot(data, l, r)
+        return [(l, lt - 1), (gt + 1, r), (lt + 1, gt - 1)] if distinct else [(l, lt - 1), (gt + 1, r)]
+
+    def _partition_dual_pivot(self, data: np.ndarray, l: int, r: int) -> tuple[int, int, bool]:
+        # set focus to subarray data[l], ..., data[r]
+        Sorter.focus(l, r)
+
+        # place the pivot elements at l and r, the smaller one at l
+        third = (r - l + 1) // 3
+        if third > 0:
+            Sorter.swap(data, l, l + third)
+            Sorter.swap(data, r, r - third)
+        # if data[l] > data[r]
+        if not Sorter.compare(data, l, r):
+            Sorter.swap(data, l, r)
+        Sorter.mark(l)
+        Sorter.mark(r, multiple=True)
+
+        # partition the data into three subarrays
+        # - data[l + 1], ..., data[lt - 1] containing the elements smaller than data[l]
+        # - data[lt], ..., data[k - 1] containing the elements between data[l] and data[r]
+        # - data[gt + 1], ..., data[r - 1] containing the elements bigger than data[r]
+        lt = l + 1
+        gt = r - 1
+        k = l + 1
+        while k <= gt:
+            # if data[k] < data[l]
+            if not Sorter.compare(data, l, k):
+                if k != lt:
+                    Sorter.swap(data, k, lt)
+                lt += 1
+            # if data[k] > data[r]
+            elif not Sorter.compare(data, k, r):
+                # skip elements at the end that are bigger than data[r] as well
+                while k < gt and not Sorter.compare(data, gt, r):
+                    gt -= 1
+                Sorter.swap(data, k, gt)
+                gt -= 1
+                # if the element taken from the end is smaller than data[l]
+                if not Sorter.compare(data, l, k):
+                    if k != lt:
+                        Sorter.swap(data, k, lt)
+                    lt += 1
+            k += 1
+
+        # put the pivot elements on their correct positions
+        lt -= 1
+        gt += 1
+        if lt != l:
+            Sorter.swap(data, l, lt)
+        if gt != r:
+            Sorter.swap(data, r, gt)
+        Sorter.unmark(delay=False)
+
+        # positions of the pivot elements and whether they are distinct, data[lt] < data[gt]
+        return lt, gt, not Sorter.compare(data, gt, lt)
+
+
+class IntroSorter(MedianQuickSorter):
+    """
+    Introsort: quicksort with a median of three pivot that sorts a subarray by heapsort once the partitions have been
+    nested more than 2 log2(n) times, so it takes O(n log n) steps in the worst case. Subarrays of at most cutoff
+    entries are sorted by insertion sort.
+    """
+
+    def __init__(self, cutoff: int = 16):
+        MedianQuickSorter.__init__(self, cutoff)
+
+    def _max_depth(self, n: int) -> int:
+        return 2 * int(np.log2(n)) if n > 1 else 0
+
+    def _split(self, data: np.ndarray, l: int, r: int, depth: int) -> list[tuple[int, int]]:
+        if depth == 0:
+            # partitions have been too unbalanced
+            HeapSorter._heapsort(data, l, r)
+            return []
+
+        return MedianQuickSorter._split(self, data, l, r, depth)
+
+
+class PdqSorter(Sorter):
+    """
+    Pattern-defeating quicksort after O. Peters (pdqsort), which is used by the sorting functions of Rust and Go.
+
+    - Pivots are the median of three entries or, for large subarrays, the median of three medians of three.
+    - Partitions compare blocks of block_size entries from both ends before they swap the entries that are on the
+      wrong side, instead of swapping after every comparison.
+    - A partition that needed no swaps is finished by an insertion sort that gives up after a few moves, so sorted
+      and reverse sorted runs take linear time.
+    - Entries equal to the pivot of an enclosing partition are split off at once, so many equal entries take linear
+      time.
+    - After a highly unbalanced partition some entries are swapped to break patterns, and after log2(n) of them the
+      subarray is sorted by heapsort, so it takes O(n log n) steps in the worst case.
+
+    Subarrays are kept on an explicit stack and subarrays of fewer than cutoff entries are sorted by insertion sort.
+    """
+
+    def __init__(self, cutoff: int = 24, ninther_threshold: int = 128, block_size: int = 64):
+        # size below which subarrays are sorted by insertion sort, the pivot selection and the swaps that break
+        # patterns need at least 8 entries
+        self._cutoff: int = max(cutoff, 8)
+
+        # size above which the pivot is the median of three medians, which needs at least 17 entries
+        self._ninther_threshold: int = max(ninther_threshold, 16)
+
+        # number of entries that are compared at once from each end during a partition
+        self._block_size: int = block_size
+
+    def execute(self, data: np.ndarray) -> None:
+        n = len(data)
+
+        # subarrays data[begin], ..., data[end - 1] that are left to sort, the number of highly unbalanced partitions
+        # that are allowed and whether the subarray is the leftmost one, otherwise data[begin - 1] is not greater than
+        # any of its entries
+        stack = [(0, n, int(np.log2(n)) if n > 1 else 0, True)]
+        while stack:
+            begin, end, bad_allowed, leftmost = stack.pop()
+            size = end - begin
+
+            # sort small subarray
+            if size < self._cutoff:
+                InsertionSorter._insertion_sort(data, begin, end - 1)
+                continue
+
+            Sorter.focus(begin, end - 1)
+
+            # move pivot to data[begin]
+            half = size // 2
+            if size > self._ninther_threshold:
+                PdqSorter._sort3(data, begin, begin + half, end - 1)
+                PdqSorter._sort3(data, begin + 1, begin + half - 1, end - 2)
+                PdqSorter._sort3(data, begin + 2, begin + half + 1, end - 3)
+                PdqSorter._sort3(data, begin + half - 1, begin + half, begin + half + 1)
+                Sorter.swap(data, begin, begin + half)
+            else:
+                PdqSorter._sort3(data, begin + half, begin, end - 1)
+            Sorter.mark(begin)
+
+            # if the pivot equals the entry before the subarray, which is not greater than any entry, then the entries
+            # equal to the pivot are already in place
+            if not leftmost and not PdqSorter._less(data, begin - 1, begin):
+                stack.append((self._partition_left(data, begin, end) + 1, end, bad_allowed, False))
+                continue
+
+            pivot, already_partitioned = self._partition_right(data, begin, end)
+            left_size = pivot - begin
+            right_size = end - pivot - 1
+
+            if left_size < size // 8 or right_size < size // 8:
+                # sort highly unbalanced partitions by heapsort once there have been too many of them
+                bad_allowed -= 1
+                if bad_allowed == 0:
+                    HeapSorter._heapsort(data, begin, end - 1)
+                    continue
+
+                # break patterns that may have caused the unbalanced partition
+                if left_size >= self._cutoff:
+                    quarter = left_size // 4
+                    Sorter.swap(data, begin, begin + quarter)
+                    Sorter.swap(data, pivot - 1, pivot - quarter)
+                    if left_size > self._ninther_threshold:
+                        Sorter.swap(data, begin + 1, begin + quarter + 1)
+                        Sorter.swap(data, begin + 2, begin + quarter + 2)
+                        Sorter.swap(data, pivot - 2, pivot - quarter - 1)
+                        Sorter.swap(data, pivot - 3, pivot - quarter - 2)
+                if right_size >= self._cutoff:
+                    quarter = right_size // 4
+                    Sorter.swap(data, pivot + 1, pivot + quarter + 1)
+                    Sorter.swap(data, end - 1, end - quarter)
+                    if right_size > self._ninther_threshold:
+                        Sorter.swap(data, pivot + 2, pivot + quarter + 2)
+                        Sorter.swap(data, pivot + 3, pivot + quarter + 3)
+                        Sorter.swap(data, end - 2, end - quarter - 1)
+                        Sorter.swap(data, end - 3, end - quarter - 2)
+
+            elif already_partitioned and PdqSorter._partial_insertion_sort(data, begin, pivot) and \
+                    PdqSorter._partial_insertion_sort(data, pivot + 1, end):
+                # both sides have been sorted with few moves
+                continue
+
+            # sort the left side first, it is put on top of the stack
+            stack.append((pivot + 1, end, bad_allowed, False))
+            stack.append((begin, pivot, bad_allowed, leftmost))
+
+    def _partition_right(self, data: np.ndarray, begin: int, end: int) -> tuple[int, bool]:
+        # partition data[begin + 1], ..., data[end - 1] into entries less than the pivot data[begin] and entries
+        # greater than or equal to it and put the pivot in between, returns the position of the pivot and whether no
+        # entries had to be swapped
+        first = begin
+        last = end
+
+        # find the first entry that is greater than or equal to the pivot, the median of three guarantees that there
+        # is one
+        first += 1
+        while PdqSorter._less(data, first, begin):
+            first += 1
+
+        # find the last entry that is less than the pivot, there is an entry before it if the first entry has not been
+        # the first of the subarray
+        if first - 1 == begin:
+            while first < last:
+                last -= 1
+                if PdqSorter._less(data, last, begin):
+                    break
+        else:
+            last -= 1
+            while not PdqSorter._less(data, last, begin):
+                last -= 1
+
+        already_partitioned = first >= last
+        if not already_partitioned:
+            # data[first] and data[last] are on the wrong side, entries from first up to last are left to partition
+            Sorter.swap(data, first, last)
+            first = self._partition_blocks(data, begin, first + 1, last)
+
+        # put the pivot between the partitions
+        pivot = first - 1
+        if pivot != begin:
+            Sorter.swap(data, begin, pivot)
+
+        return pivot, already_partitioned
+
+    def _partition_blocks(self, data: np.ndarray, begin: int, first: int, last: int) -> int:
+        # partition data[first], ..., data[last - 1] by the pivot data[begin], returns the position of the first
+        # entry that is greater than or equal to the pivot
+        block = self._block_size
+
+        # compare a block of entries at each end and then swap the entries that are on the wrong side, a block whose
+        # entries are all on the right side is done
+        left = []
+        right = []
+        while last - first >= 2 * block:
+            if not left:
+                left = [first + k for k in range(block) if not PdqSorter._less(data, first + k, begin)]
+            if not right:
+                right = [last - 1 - k for k in range(block) if PdqSorter._less(data, last - 1 - k, begin)]
+
+            count = min(len(left), len(right))
+            for k in range(count):
+                Sorter.swap(data, left[k], right[k])
+            left = left[count:]
+            right = right[count:]
+
+            if not left:
+                first += block
+            if not right:
+                last -= block
+
+        # partition the remaining entries, including an unfinished block, one by one
+        while True:
+            while first < last and PdqSorter._less(data, first, begin):
+                first += 1
+            while first < last and not PdqSorter._less(data, last - 1, begin):
+                last -= 1
+            if first >= last:
+                return first
+            Sorter.swap(data, first, last - 1)
+            first += 1
+            last -= 1
+
+    @staticmethod
+    def _partition_left(data: np.ndarray, begin: int, end: int) -> int:
+        # partition data[begin + 1], ..., data[end - 1] into entries less than or equal to the pivot data[begin] and
+        # entries greater than it and put the pivot in between, returns the position of the pivot
+        first = begin
+        last = end
+
+        # find the last entry that is less than or equal to the pivot
+        last -= 1
+        while PdqSorter._less(data, begin, last):
+            last -= 1
+
+        # find the first entry that is greater than the pivot
+        if last + 1 == end:
+            while first < last:
+                first += 1
+                if PdqSorter._less(data, begin, first):
+                    break
+        else:
+            first += 1
+            while not PdqSorter._less(data, begin, first):
+                first += 1
+
+        while first < last:
+            Sorter.swap(data, first, last)
+            last -= 1
+            while PdqSorter._less(data, begin, last):
+                last -= 1
+            first += 1
+            while not PdqSorter._less(data, begin, first):
+                first += 1
+
+        # put the pivot between the partitions
+        if last != begin:
+            Sorter.swap(data, begin, last)
+
+        return last
+
+    @staticmethod
+    def _partial_insertion_sort(data: np.ndarray, begin: int, end: int, limit: int = 8) -> bool:
+        # insertion sort of data[begin], ..., data[end - 1] that gives up once more than limit moves have been needed,
+        # returns True if the subarray has been sorted
+        moves = 0
+        for i in range(begin + 1, end):
+            j = i
+            while j > begin and PdqSorter._less(data, j, j - 1):
+                Sorter.swap(data, j - 1, j)
+                j -= 1
+            moves += i - j
+            if moves > limit:
+                return False
+
+        return True
+
+    @staticmethod
+    def _sort3(data: np.ndarray, a: int, b: int, c: int) -> None:
+        # sort data[a], data[b] and data[c]
+        PdqSorter._sort2(data, a, b)
+        PdqSorter._sort2(data, b, c)
+        PdqSorter._sort2(data, a, b)
+
+    @staticmethod
+    def _sort2(data: np.ndarray, a: int, b: int) -> None:
+        # sort data[a] and data[b]
+        if PdqSorter._less(data, b, a):
+            Sorter.swap(data, a, b)
+
+    @staticmethod
+    def _less(data: np.ndarray, pos_1: int, pos_2: int) -> bool:
+        # True if data[pos_1] is smaller than data[pos_2]
+        return not Sorter.compare(data, pos_2, pos_1)
+
+
 class MergeSorter(Sorter):
 
     def __init__(self):
@@ -472,67 +903,565 @@ class NaturalMergeSorter(MergeSorter):
                 break
 
 
-class RadixSorter(Sorter):
+class TimSorter(Sorter):
+    """
+    Timsort after T. Peters, the sorting algorithm of Python's list.sort.
 
-    def __init__(self):
-        # length of representation
-        self._length = 0
+    - Runs are ascending or strictly descending sequences of entries, descending runs are reversed. Runs shorter than
+      minrun entries are extended by binary insertion sort, where minrun is between 32 and 64 and is chosen so the
+      number of runs is a power of two or slightly less.
+    - Runs are kept on a stack whose lengths grow faster than the Fibonacci numbers from top to bottom, adjacent runs
+      are merged as soon as a new run breaks this invariant, so merges are balanced.
+    - Merges copy the smaller run into temporary memory and merge into the gap it leaves. Once one run wins
+      min_gallop times in a row, the merge gallops: it searches where the next entry of the other run goes
+      exponentially and moves the entries in between at once. The threshold adapts to how well galloping pays off.
 
-    def get_digit(self, index: int, representation: str) -> str:
-        return representation[self._length - index - 1]
+    Comparisons with entries in temporary memory are visualized at the slots of the gap where these entries are
+    headed, since their own slots may have been overwritten already.
+    """
 
+    def __init__(self, min_gallop: int = 7):
+        # number of wins in a row after which a merge starts to gallop
+        self._initial_min_gallop: int = min_gallop
 
-class BinaryRadixSorter(RadixSorter):
+        # current threshold for galloping, adapted while merging
+        self._min_gallop: int = min_gallop
+
+        # start and length of the runs that are still to merge, from bottom to top
+        self._runs: list[tuple[int, int]] = []
 
     def execute(self, data: np.ndarray) -> None:
-        # generate binary representation of data
-        binary_data = self._binarize_data(data)
+        n = len(data)
+        self._min_gallop = self._initial_min_gallop
+        self._runs = []
+
+        # find runs from left to right and extend short runs to minrun entries
+        minrun = TimSorter._compute_minrun(n)
+        lo = 0
+        while lo < n:
+            length = self._count_run(data, lo, n)
+            if length < minrun:
+                force = min(minrun, n - lo)
+                Sorter.focus(lo, lo + force - 1)
+                TimSorter._binary_insertion_sort(data, lo, lo + force, lo + length)
+                length = force
+
+            # push the run and restore the invariant of the stack
+            self._runs.append((lo, length))
+            self._merge_collapse(data)
+            lo += length
+
+        # merge all remaining runs
+        self._merge_force_collapse(data)
+
+    @staticmethod
+    def _compute_minrun(n: int) -> int:
+        # the six most significant bits of n, plus one if any of the remaining bits is set
+        r = 0
+        while n >= 64:
+            r |= n & 1
+            n >>= 1
+        return n + r
 
-        # sort the data using the radix exchange sort algorithm
-        self._binary_radix_sort(binary_data, 0, len(binary_data) - 1, self._length - 1)
+    @staticmethod
+    def _less(value_1: int, value_2: int, pos_1: int, pos_2: int) -> bool:
+        # append comparison step to steps, the compared values need not be in data
+        # (don't use Sorter.compare method as entries in temporary memory are compared as well)
+        Sorter._recording.steps.record(Opcode.COMPARISON, pos_1, pos_2, True)
 
-    def _binary_radix_sort(self, data: list[str], l: int, r: int, b: int) -> None:
-        if r > l:
+        # return True if value_1 is smaller than value_2
+        return value_1 < value_2
 
-            # set focus to subarray data[l], ..., data[r]
-            Sorter.focus(l, r)
+    @staticmethod
+    def _count_run(data: np.ndarray, lo: int, hi: int) -> int:
+        # length of the run starting at data[lo], a descending run is reversed
+        if lo + 1 == hi:
+            return 1
+
+        k = lo + 2
+        # if data[lo + 1] < data[lo] the run is strictly descending, so reversing it keeps equal entries in order
+        if TimSorter._less(data[lo + 1], data[lo], lo + 1, lo):
+            while k < hi and TimSorter._less(data[k], data[k - 1], k, k - 1):
+                k += 1
+
+            # reverse run
+            for i in range(lo, lo + (k - lo) // 2):
+                Sorter.swap(data, i, k - 1 - (i - lo))
+        else:
+            while k < hi and not TimSorter._less(data[k], data[k - 1], k, k - 1):
+                k += 1
 
-            i = l - 1
-            j = r + 1
+        return k - lo
 
-            while True:
+    @staticmethod
+    def _binary_insertion_sort(data: np.ndarray, lo: int, hi: int, start: int) -> None:
+        # sort data[lo], ..., data[hi - 1] whose entries data[lo], ..., data[start - 1] are already sorted
+        for i in range(start, hi):
+            pivot = data[i]
+
+            # find position after the last entry that is not bigger than the pivot
+            l = lo
+            r = i
+            while l < r:
+                m = (l + r) // 2
+                if TimSorter._less(pivot, data[m], i, m):
+                    r = m
+                else:
+                    l = m + 1
+
+            # shift bigger entries to the right and insert pivot
+            for k in range(i, l, -1):
+                Sorter.replace(data, k, data[k - 1])
+            Sorter.replace(data, l, pivot)
+            Sorter.unreplace(delay=False)
+
+    def _merge_collapse(self, data: np.ndarray) -> None:
+        # merge runs until the lengths of the topmost runs a, b and c satisfy len(a) > len(b) + len(c) and
+        # len(b) > len(c), the invariant is also checked one run deeper, since merging may break it there
+        runs = self._runs
+        while len(runs) > 1:
+            n = len(runs) - 2
+            if (n > 0 and runs[n - 1][1] <= runs[n][1] + runs[n + 1][1]) or \
+                    (n > 1 and runs[n - 2][1] <= runs[n - 1][1] + runs[n][1]):
+                # merge the middle run with the shorter of its neighbours
+                if runs[n - 1][1] < runs[n + 1][1]:
+                    n -= 1
+                self._merge_at(data, n)
+            elif runs[n][1] <= runs[n + 1][1]:
+                self._merge_at(data, n)
+            else:
+                break
+
+    def _merge_force_collapse(self, data: np.ndarray) -> None:
+        # merge all runs, always merging the middle run with the shorter of its neighbours
+        runs = self._runs
+        while len(runs) > 1:
+            n = len(runs) - 2
+            if n > 0 and runs[n - 1][1] < runs[n + 1][1]:
+                n -= 1
+            self._merge_at(data, n)
+
+    def _merge_at(self, data: np.ndarray, i: int) -> None:
+        # merge the runs i and i + 1 of the stack
+        base_a, na = self._runs[i]
+        base_b, nb = self._runs[i + 1]
+        self._runs[i] = (base_a, na + nb)
+        del self._runs[i + 1]
+        Sorter.focus(base_a, base_b + nb - 1)
+
+        # entries at the start of run a that are not bigger than the first entry of run b are already in place
+        k = self._gallop_right(data[base_b], base_b, data, 0, base_a, na, 0)
+        base_a += k
+        na -= k
+        if na == 0:
+            return
+
+        # entries at the end of run b that are not smaller than the last entry of run a are already in place
+        nb = self._gallop_left(data[base_a + na - 1], base_a + na - 1, data, 0, base_b, nb, nb - 1)
+        if nb == 0:
+            return
+
+        # merge with temporary memory for the smaller run
+        if na <= nb:
+            self._merge_lo(data, base_a, na, base_b, nb)
+        else:
+            self._merge_hi(data, base_a, na, base_b, nb)
+        Sorter.unreplace()
+
+    @staticmethod
+    def _gallop_left(key: int, key_pos: int, a: np.ndarray, offset: int, base: int, n: int, hint: int) -> int:
+        # position k in a[base], ..., a[base + n - 1] with a[base + k - 1] < key <= a[base + k], searching
+        # exponentially from a[base + hint], the entry a[j] is visualized at slot j + offset
+        last_ofs = 0
+        ofs = 1
+        if TimSorter._less(a[base + hint], key, base + hint + offset, key_pos):
+            # a[base + hint] < key, gallop to the right
+            max_ofs = n - hint
+            while ofs < max_ofs and TimSorter._less(a[base + hint + ofs], key, base + hint + ofs + offset, key_pos):
+                last_ofs = ofs
+                ofs = (ofs << 1) + 1
+            ofs = min(ofs, max_ofs)
+            last_ofs += hint
+            ofs += hint
+        else:
+            # key <= a[base + hint], gallop to the left
+            max_ofs = hint + 1
+            while ofs < max_ofs and \
+                    not TimSorter._less(a[base + hint - ofs], key, base + hint - ofs + offset, key_pos):
+                last_ofs = ofs
+                ofs = (ofs << 1) + 1
+            ofs = min(ofs, max_ofs)
+            last_ofs, ofs = hint - ofs, hint - last_ofs
+
+        # binary search in a[base + last_ofs + 1], ..., a[base + ofs]
+        last_ofs += 1
+        while last_ofs < ofs:
+            m = last_ofs + ((ofs - last_ofs) >> 1)
+            if TimSorter._less(a[base + m], key, base + m + offset, key_pos):
+                last_ofs = m + 1
+            else:
+                ofs = m
+        return ofs
 
-                while True:
+    @staticmethod
+    def _gallop_right(key: int, key_pos: int, a: np.ndarray, offset: int, base: int, n: int, hint: int) -> int:
+        # position k in a[base], ..., a[base + n - 1] with a[base + k - 1] <= key < a[base + k], searching
+        # exponentially from a[base + hint], the entry a[j] is visualized at slot j + offset
+        last_ofs = 0
+        ofs = 1
+        if TimSorter._less(key, a[base + hint], key_pos, base + hint + offset):
+            # key < a[base + hint], gallop to the left
+            max_ofs = hint + 1
+            while ofs < max_ofs and TimSorter._less(key, a[base + hint - ofs], key_pos, base + hint - ofs + offset):
+                last_ofs = ofs
+                ofs = (ofs << 1) + 1
+            ofs = min(ofs, max_ofs)
+            last_ofs, ofs = hint - ofs, hint - last_ofs
+        else:
+            # a[base + hint] <= key, gallop to the right
+            max_ofs = n - hint
+            while ofs < max_ofs and \
+                    not TimSorter._less(key, a[base + hint + ofs], key_pos, base + hint + ofs + offset):
+                last_ofs = ofs
+                ofs = (ofs << 1) + 1
+            ofs = min(ofs, max_ofs)
+            last_ofs += hint
+            ofs += hint
+
+        # binary search in a[base + last_ofs + 1], ..., a[base + ofs]
+        last_ofs += 1
+        while last_ofs < ofs:
+            m = last_ofs + ((ofs - last_ofs) >> 1)
+            if TimSorter._less(key, a[base + m], key_pos, base + m + offset):
+                ofs = m
+            else:
+                last_ofs = m + 1
+        return ofs
+
+    def _merge_lo(self, data: np.ndarray, base_a: int, na: int, base_b: int, nb: int) -> None:
+        # merge run a = data[base_a], ..., data[base_a + na - 1] and the longer run b that follows it from left to
+        # right, run a is copied to temporary memory, whose entry temp[i] is headed for slot dest
+        temp = data[base_a:base_a + na].copy()
+        i = 0
+        j = base_b
+        dest = base_a
+
+        # the first entry of run b is smaller than all entries of run a
+        Sorter.replace(data, dest, data[j])
+        dest += 1
+        j += 1
+        nb -= 1
+        if nb == 0 or na == 1:
+            self._finish_lo(data, temp, i, na, j, nb, dest)
+            return
+
+        min_gallop = self._min_gallop
+        while True:
+            # merge one entry after the other until one run wins min_gallop times in a row
+            a_count = 0
+            b_count = 0
+            while True:
+                # if data[j] < temp[i]
+                if TimSorter._less(data[j], temp[i], j, dest):
+                    Sorter.replace(data, dest, data[j])
+                    dest += 1
+                    j += 1
+                    nb -= 1
+                    b_count += 1
+                    a_count = 0
+                    if nb == 0:
+                        self._finish_lo(data, temp, i, na, j, nb, dest)
+                        return
+                    if b_count >= min_gallop:
+                        break
+                else:
+                    Sorter.replace(data, dest, temp[i])
+                    dest += 1
                     i += 1
-                    if i >= j or self.get_digit(b, data[i]) == '1':
+                    na -= 1
+                    a_count += 1
+                    b_count = 0
+                    if na == 1:
+                        self._finish_lo(data, temp, i, na, j, nb, dest)
+                        return
+                    if a_count >= min_gallop:
                         break
 
-                while True:
+            # gallop while it pays off, the longer galloping goes on the sooner it starts next time
+            min_gallop += 1
+            while True:
+                min_gallop -= min_gallop > 1
+                self._min_gallop = min_gallop
+
+                # entries of run a that are not bigger than data[j]
+                a_count = self._gallop_right(data[j], j, temp, dest - i, i, na, 0)
+                for k in range(a_count):
+                    Sorter.replace(data, dest + k, temp[i + k])
+                dest += a_count
+                i += a_count
+                na -= a_count
+                if na <= 1:
+                    self._finish_lo(data, temp, i, na, j, nb, dest)
+                    return
+                Sorter.replace(data, dest, data[j])
+                dest += 1
+                j += 1
+                nb -= 1
+                if nb == 0:
+                    self._finish_lo(data, temp, i, na, j, nb, dest)
+                    return
+
+                # entries of run b that are smaller than temp[i]
+                b_count = self._gallop_left(temp[i], dest, data, 0, j, nb, 0)
+                for k in range(b_count):
+                    Sorter.replace(data, dest + k, data[j + k])
+                dest += b_count
+                j += b_count
+                nb -= b_count
+                if nb == 0:
+                    self._finish_lo(data, temp, i, na, j, nb, dest)
+                    return
+                Sorter.replace(data, dest, temp[i])
+                dest += 1
+                i += 1
+                na -= 1
+                if na == 1:
+                    self._finish_lo(data, temp, i, na, j, nb, dest)
+                    return
+
+                if a_count < self._initial_min_gallop and b_count < self._initial_min_gallop:
+                    break
+
+            min_gallop += 1
+            self._min_gallop = min_gallop
+
+    @staticmethod
+    def _finish_lo(data: np.ndarray, temp: np.ndarray, i: int, na: int, j: int, nb: int, dest: int) -> None:
+        # the rest of run b is in place if run a is exhausted
+        if na == 0:
+            return
+
+        # move the rest of run b to the left, then the rest of run a follows, if only one entry of run a is left it is
+        # bigger than the rest of run b
+        for k in range(nb):
+            Sorter.replace(data, dest + k, data[j + k])
+        for k in range(na):
+            Sorter.replace(data, dest + nb + k, temp[i + k])
+
+    def _merge_hi(self, data: np.ndarray, base_a: int, na: int, base_b: int, nb: int) -> None:
+        # merge the longer run a and run b = data[base_b], ..., data[base_b + nb - 1] that follows it from right to
+        # left, run b is copied to temporary memory, whose entry temp[j] is headed for slot i + 1 + j
+        temp = data[base_b:base_b + nb].copy()
+        i = base_a + na - 1
+        j = nb - 1
+        dest = base_b + nb - 1
+
+        # the last entry of run a is bigger than all entries of run b
+        Sorter.replace(data, dest, data[i])
+        dest -= 1
+        i -= 1
+        na -= 1
+        if na == 0 or nb == 1:
+            self._finish_hi(data, temp, i, na, j, nb, dest)
+            return
+
+        min_gallop = self._min_gallop
+        while True:
+            # merge one entry after the other until one run wins min_gallop times in a row
+            a_count = 0
+            b_count = 0
+            while True:
+                # if temp[j] < data[i]
+                if TimSorter._less(temp[j], data[i], dest, i):
+                    Sorter.replace(data, dest, data[i])
+                    dest -= 1
+                    i -= 1
+                    na -= 1
+                    a_count += 1
+                    b_count = 0
+                    if na == 0:
+                        self._finish_hi(data, temp, i, na, j, nb, dest)
+                        return
+                    if a_count >= min_gallop:
+                        break
+                else:
+                    Sorter.replace(data, dest, temp[j])
+                    dest -= 1
                     j -= 1
-                    if i >= j or self.get_digit(b, data[j]) == '0':
+                    nb -= 1
+                    b_count += 1
+                    a_count = 0
+                    if nb == 1:
+                        self._finish_hi(data, temp, i, na, j, nb, dest)
+                        return
+                    if b_count >= min_gallop:
                         break
 
-                if i >= j:
+            # gallop while it pays off, the longer galloping goes on the sooner it starts next time
+            min_gallop += 1
+            while True:
+                min_gallop -= min_gallop > 1
+                self._min_gallop = min_gallop
+
+                # entries of run a that are bigger than temp[j]
+                a_count = na - self._gallop_right(temp[j], dest, data, 0, base_a, na, na - 1)
+                for k in range(a_count):
+                    Sorter.replace(data, dest - k, data[i - k])
+                dest -= a_count
+                i -= a_count
+                na -= a_count
+                if na == 0:
+                    self._finish_hi(data, temp, i, na, j, nb, dest)
+                    return
+                Sorter.replace(data, dest, temp[j])
+                dest -= 1
+                j -= 1
+                nb -= 1
+                if nb == 1:
+                    self._finish_hi(data, temp, i, na, j, nb, dest)
+                    return
+
+                # entries of run b that are not smaller than data[i]
+                b_count = nb - self._gallop_left(data[i], i, temp, i + 1, 0, nb, nb - 1)
+                for k in range(b_count):
+                    Sorter.replace(data, dest - k, temp[j - k])
+                dest -= b_count
+                j -= b_count
+                nb -= b_count
+                if nb <= 1:
+                    self._finish_hi(data, temp, i, na, j, nb, dest)
+                    return
+                Sorter.replace(data, dest, data[i])
+                dest -= 1
+                i -= 1
+                na -= 1
+                if na == 0:
+                    self._finish_hi(data, temp, i, na, j, nb, dest)
+                    return
+
+                if a_count < self._initial_min_gallop and b_count < self._initial_min_gallop:
                     break
+
+            min_gallop += 1
+            self._min_gallop = min_gallop
+
+    @staticmethod
+    def _finish_hi(data: np.ndarray, temp: np.ndarray, i: int, na: int, j: int, nb: int, dest: int) -> None:
+        # the rest of run a is in place if run b is exhausted
+        if nb == 0:
+            return
+
+        # move the rest of run a to the right, then the rest of run b precedes it, if only one entry of run b is left
+        # it is smaller than the rest of run a
+        for k in range(na):
+            Sorter.replace(data, dest - k, data[i - k])
+        for k in range(nb):
+            Sorter.replace(data, dest - na - k, temp[j - k])
+
+
+class RadixSorter(Sorter):
+
+    def __init__(self):
+        # length of representation
+        self._length = 0
+
+    def get_digit(self, index: int, representation: str) -> str:
+        return representation[self._length - index - 1]
+
+    @staticmethod
+    def _integer_keys(data: np.ndarray) -> tuple[np.ndarray, int]:
+        # offsets of the values to the smallest value, which are non-negative and as small as possible, and the
+        # number of bits of the largest offset
+        if len(data) == 0:
+            return np.empty(0, dtype=np.uint64), 0
+        keys = (data.astype(np.int64) - np.int64(data.min())).view(np.uint64)
+        return keys, int(keys.max()).bit_length()
+
+
+class BinaryRadixSorter(RadixSorter):
+    """
+    Radix exchange sort on the bits of the integer values of the data, from the most significant bit of the range of
+    the values downwards.
+
+    Subarrays are kept on an explicit stack instead of being sorted recursively. Subarrays of at least cutoff entries
+    are partitioned with NumPy: the entries with the bit set in the front part are swapped with the entries without it
+    in the back part in the order the exchange scan would find them, so the steps are the same as for smaller
+    subarrays, which are scanned entry by entry.
+    """
+
+    def __init__(self, cutoff: int = 64):
+        RadixSorter.__init__(self)
+
+        # size from which subarrays are partitioned with NumPy
+        self._cutoff: int = cutoff
+
+    def execute(self, data: np.ndarray) -> None:
+        # bits of the offsets of the values to the smallest value
+        keys, self._length = RadixSorter._integer_keys(data)
+
+        # subarrays data[l], ..., data[r] that are sorted by the bits b, ..., 0, the first one is on top, equal values
+        # have no bits to sort by
+        stack = [(0, len(data) - 1, self._length - 1)] if self._length > 0 else []
+        while stack:
+            l, r, b = stack.pop()
+            if r > l:
+                # set focus to subarray data[l], ..., data[r]
+                Sorter.focus(l, r)
+
+                # entries data[l], ..., data[i - 1] have bit b unset and data[i], ..., data[r] have it set
+                if r - l + 1 >= self._cutoff:
+                    i = BinaryRadixSorter._partition_many(data, keys, l, r, b)
                 else:
-                    Sorter.swap(data, i, j)
+                    i = BinaryRadixSorter._partition(data, keys, l, r, b)
 
-            if b > 0:
-                self._binary_radix_sort(data, l, i - 1, b - 1)
-                self._binary_radix_sort(data, i, r, b - 1)
+                if b > 0:
+                    stack.append((i, r, b - 1))
+                    stack.append((l, i - 1, b - 1))
 
+    @staticmethod
+    def _partition(data: np.ndarray, keys: np.ndarray, l: int, r: int, b: int) -> int:
+        # exchange entries with bit b set from the front with entries without it from the back
+        bits = [int(key) >> b & 1 for key in keys[l:r + 1].tolist()]
+        i = l - 1
+        j = r + 1
+        while True:
+            while True:
+                i += 1
+                if i >= j or bits[i - l]:
+                    break
 
-    def _binarize_data(self, data: np.ndarray) -> list[str]:
-        # determine required length of binary representation
-        self._length = len(np.binary_repr(len(data)))
+            while True:
+                j -= 1
+                if i >= j or not bits[j - l]:
+                    break
+
+            if i >= j:
+                return i
+
+            Sorter.swap(data, i, j)
+            keys[i], keys[j] = keys[j], keys[i]
+            bits[i - l], bits[j - l] = bits[j - l], bits[i - l]
+
+    @staticmethod
+    def _partition_many(data: np.ndarray, keys: np.ndarray, l: int, r: int, b: int) -> int:
+        # same as _partition: the k-th entry with bit b set from the front is swapped with the k-th entry without it
+        # from the back as long as the first one is in front of the second one, which holds for the entries with the
+        # bit set among the first as many entries as there are entries without it
+        bits = (keys[l:r + 1] >> np.uint64(b)) & np.uint64(1)
+        zeros = len(bits) - int(np.count_nonzero(bits))
+        front = l + np.flatnonzero(bits[:zeros])
+        back = l + zeros + np.flatnonzero(bits[zeros:] == 0)[::-1]
 
-        # return list of binary representations of equal length of data
-        return [np.binary_repr(d, self._length) for d in data]
+        Sorter.swap_many(data, front, back)
+        keys[front], keys[back] = keys[back], keys[front]
+        return l + zeros
 
 
 class DecimalRadixSorter(RadixSorter):
 
-    def __int__(self):
+    def __init__(self):
+        RadixSorter.__init__(self)
+
         # temporary memory for data
         self._temp: list[str] = []
 
@@ -569,23 +1498,51 @@ class DecimalRadixSorter(RadixSorter):
 
             # collection phase
             for i in range(len(data)):
-                data[i] = self._temp[i]
-
                 # visualize replace
                 # (don't use Sorter.replace method as with radix sort we are not working on original data)
-                Sorter._steps.append(SortingSteps.Replace(pos=i, height=int(self._temp[i]), delay=True))
+                Sorter._recording.steps.record(Opcode.REPLACE, i, int(self._temp[i]), True, int(data[i]))
+
+                data[i] = self._temp[i]
 
     def _generate_representation(self, data: np.ndarray) -> list[str]:
-        # determine length of representation
-        self._length = len(str(len(data)))
+        # determine length of representation from the largest value
+        self._length = len(str(max(data, default=0)))
 
         # return list of representations of equal length of data
         return [(self._length - len(str(d))) * '0' + str(d) for d in data]
 
 
+class LSDRadixSorter(RadixSorter):
+    """
+    Least significant digit radix sort on the integer values of the data.
 
+    Every pass distributes the data stably by one digit of radix_bits bits, which is extracted by a shift and a mask,
+    and collects it by replacing all entries. The number of passes follows from the range of the values, negative
+    values are sorted by their offset to the smallest value. The distribution is the order of a stable argsort of the
+    digits.
+    """
 
+    def __init__(self, radix_bits: int = 8):
+        RadixSorter.__init__(self)
 
+        # number of bits per digit, the radix is 2^radix_bits
+        self._radix_bits: int = radix_bits
 
+    def execute(self, data: np.ndarray) -> None:
+        # offsets of the values to the smallest value, which are non-negative and as small as possible
+        n = len(data)
+        keys, bits = RadixSorter._integer_keys(data)
 
+        positions = np.arange(n)
+        mask = np.uint64((1 << self._radix_bits) - 1)
+        for shift in range(0, bits, self._radix_bits):
+            Sorter.focus(0, n - 1, delay=False)
 
+            # stable distribution by the digit, entries with smaller digits come first
+            digits = (keys >> np.uint64(shift)) & mask
+            order = np.argsort(digits, kind='stable')
+            keys = keys[order]
+
+            # collection phase
+            Sorter.replace_many(data, positions, data[order])
+            Sorter.unreplace(delay=False)
@@ -1,6 +1,20 @@
 from dataclasses import dataclass
 
 
+class Opcode:
+    """
+    Opcodes identifying the type of a step in a Trace.
+    """
+    COMPARISON = 0
+    SWAP = 1
+    MARK = 2
+    UNMARK = 3
+    FOCUS = 4
+    UNFOCUS = 5
+    REPLACE = 6
+    UNREPLACE = 7
+
+
 @dataclass
 class Step:
     """
@@ -90,10 +104,13 @@ class Replace(Step):
     ----------
     pos, height: int
         Slot at pos will be replaced by a slot with height height.
+    old_height: int
+        Height of the slot at pos before it is replaced, used for undoing the step.
 
     """
     pos: int
     height: int
+    old_height: int = 0
 
 @dataclass
 class Unreplace(Step):
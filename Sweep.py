@@ -0,0 +1,235 @@
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass
+import itertools
+import json
+import math
+import os
+import resource
+import signal
+import sys
+
+import Benchmark
+import Registry
+
+
+@dataclass(frozen=True)
+class SweepJob:
+    """
+    Independent job of a sweep.
+
+    Attributes
+    ----------
+    algorithm, initiator: str
+        Names of the sorting algorithm and the initiator (see Registry).
+    n: int
+        Size of the array that will be sorted.
+    seed: int
+        Seed of the random number generator.
+    """
+    algorithm: str
+    initiator: str
+    n: int
+    seed: int
+
+
+class JobTimeout(Exception):
+    """
+    Raised in a worker process when a job exceeds its time limit.
+    """
+    pass
+
+
+def estimate_costs(jobs: list[SweepJob], pilot_size: int = 64) -> dict[SweepJob, float]:
+    """
+    Estimate the cost of jobs by the number of steps they will produce.
+
+    For every combination of sorting algorithm and initiator the number of steps is measured for two small pilot
+    sizes and extrapolated with the resulting growth exponent.
+    """
+    growth = {}
+    for algorithm, initiator in {(job.algorithm, job.initiator) for job in jobs}:
+        small = Benchmark.run_benchmark(algorithm, initiator, pilot_size, seed=0, measure_memory=False).steps
+        large = Benchmark.run_benchmark(algorithm, initiator, 2 * pilot_size, seed=0, measure_memory=False).steps
+        exponent = min(max(math.log2(max(large, 1) / max(small, 1)), 1.0), 2.0)
+        growth[(algorithm, initiator)] = (large, exponent)
+
+    costs = {}
+    for job in jobs:
+        steps, exponent = growth[(job.algorithm, job.initiator)]
+        costs[job] = steps * (job.n / (2 * pilot_size)) ** exponent
+
+    return costs
+
+
+def _initialize_worker(memory_limit: int | None) -> None:
+    # cap the address space of the worker process
+    if memory_limit:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+    # raise JobTimeout if a job exceeds its time limit
+    def on_alarm(signum, frame):
+        raise JobTimeout()
+
+    signal.signal(signal.SIGALRM, on_alarm)
+
+
+def _run_job(job: SweepJob, time_limit: float | None, measure_memory: bool, count_only: bool) -> dict:
+    record = asdict(job)
+
+    # start timer for time limit
+    if time_limit:
+        signal.setitimer(signal.ITIMER_REAL, time_limit)
+
+    try:
+        result = Benchmark.run_benchmark(job.algorithm, job.initiator, job.n, seed=job.seed,
+                                         measure_memory=measure_memory, count_only=count_only)
+        record.update(asdict(result))
+        record['status'] = 'ok'
+    except JobTimeout:
+        record['status'] = 'timeout'
+    except MemoryError:
+        record['status'] = 'memory'
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+    return record
+
+
+def load_completed_jobs(path: str, skip_failed: bool = False) -> set[SweepJob]:
+    # jobs with a record in the results file, jobs that crashed or timed out are only included if skip_failed is set,
+    # so they are run again when the sweep is resumed
+    completed = set()
+    if os.path.exists(path):
+        with open(path) as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                    if record['status'] in ('crashed', 'timeout') and not skip_failed:
+                        continue
+                    completed.add(SweepJob(algorithm=record['algorithm'], initiator=record['initiator'],
+                                           n=record['n'], seed=record['seed']))
+                except (json.JSONDecodeError, KeyError):
+                    # a line that has not been written completely
+                    continue
+
+    return completed
+
+
+def run_sweep(jobs: list[SweepJob], path: str, workers: int | None = None, time_limit: float | None = None,
+              memory_limit: int | None = None, measure_memory: bool = False, count_only: bool = False,
+              retries: int = 1, skip_failed: bool = False) -> None:
+    """
+    Run jobs in a pool of processes and append a JSON record for every finished job to the file at path.
+
+    Jobs are started in the order of decreasing estimated cost. Jobs that already have a record in the file are
+    skipped, so an interrupted sweep can be resumed by running it again, jobs that crashed or timed out are run again
+    unless skip_failed is set. If a worker process dies, the pool is restarted. The jobs that were running at that
+    time are run again one at a time, so the job that caused the crash is identified, and it is run up to retries
+    more times before it is recorded as crashed.
+    """
+    completed = load_completed_jobs(path, skip_failed)
+    jobs = [job for job in dict.fromkeys(jobs) if job not in completed]
+
+    # longest jobs first
+    costs = estimate_costs(jobs)
+    jobs.sort(key=lambda job: costs[job], reverse=True)
+
+    # jobs that were running when a worker process died
+    suspects = []
+    attempts = {job: 0 for job in jobs}
+
+    with open(path, 'a') as file:
+        while jobs or suspects:
+            # suspects are run one at a time, so a crash can only be caused by the job that is running
+            isolated = bool(suspects)
+            queue = suspects if isolated else jobs
+            max_workers = 1 if isolated else workers or os.cpu_count() or 1
+
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_initialize_worker,
+                                     initargs=(memory_limit,)) as executor:
+                # submit no more jobs than there are workers, so every submitted job is running
+                running = {}
+                crashed = []
+                while queue or running:
+                    while queue and len(running) < max_workers and not crashed:
+                        job = queue.pop(0)
+                        running[executor.submit(_run_job, job, time_limit, measure_memory, count_only)] = job
+                    if not running:
+                        break
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        job = running.pop(future)
+                        try:
+                            record = future.result()
+                        except BrokenProcessPool:
+                            # the pool has to be restarted, the job may have caused the crash
+                            crashed.append(job)
+                            continue
+
+                        # write record as soon as the job is finished
+                        _write_record(file, job, record)
+
+            if isolated:
+                # the job caused the crash, run it again if possible
+                for job in crashed:
+                    attempts[job] += 1
+                    if attempts[job] <= retries:
+                        suspects.insert(0, job)
+                    else:
+                        record = asdict(job)
+                        record['status'] = 'crashed'
+                        _write_record(file, job, record)
+            else:
+                # one of the jobs caused the crash, they are run again one at a time without charging an attempt
+                suspects.extend(sorted(crashed, key=lambda job: costs[job], reverse=True))
+
+
+def _write_record(file, job: SweepJob, record: dict) -> None:
+    # append record and report status
+    file.write(json.dumps(record) + '\n')
+    file.flush()
+    print(f'{job.algorithm} / {job.initiator} / n={job.n} / seed={job.seed}: {record["status"]}', file=sys.stderr)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='Run a grid of benchmarks in parallel processes.')
+    parser.add_argument('-a', '--algorithms', nargs='+', default=list(Registry.SortingAlgorithms.keys()),
+                        choices=list(Registry.SortingAlgorithms.keys()), metavar='ALGORITHM',
+                        help='sorting algorithms to benchmark (default: all)')
+    parser.add_argument('-i', '--initiators', nargs='+', default=list(Registry.InitializationAlgorithms.keys()),
+                        choices=list(Registry.InitializationAlgorithms.keys()), metavar='INITIATOR',
+                        help='initiators used for the data (default: all)')
+    parser.add_argument('-n', '--sizes', nargs='+', type=int, default=[50], metavar='N',
+                        help='sizes of the data (default: 50)')
+    parser.add_argument('-s', '--seeds', nargs='+', type=int, default=[0], metavar='SEED',
+                        help='seeds of the random number generator (default: 0)')
+    parser.add_argument('-o', '--output', default='sweep.jsonl',
+                        help='JSON lines file the results are appended to (default: sweep.jsonl)')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='number of worker processes (default: number of CPUs)')
+    parser.add_argument('--time-limit', type=float, default=None, metavar='SECONDS',
+                        help='time limit per job')
+    parser.add_argument('--memory-limit', type=int, default=None, metavar='MB',
+                        help='memory limit per worker process')
+    parser.add_argument('--memory', action='store_true',
+                        help='measure peak memory of every job (runs every job twice)')
+    parser.add_argument('--count-only', action='store_true',
+                        help='only count the steps instead of recording them')
+    parser.add_argument('--skip-failed', action='store_true',
+                        help='do not run jobs again that crashed or timed out in a previous run')
+    args = parser.parse_args(argv)
+
+    jobs = [SweepJob(algorithm=algorithm, initiator=initiator, n=n, seed=seed)
+            for algorithm, initiator, n, seed in itertools.product(args.algorithms, args.initiators, args.sizes,
+                                                                   args.seeds)]
+
+    run_sweep(jobs, args.output, workers=args.workers, time_limit=args.time_limit,
+              memory_limit=args.memory_limit * 1024 * 1024 if args.memory_limit else None,
+              measure_memory=args.memory, count_only=args.count_only, skip_failed=args.skip_failed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import numpy as np
+
+import Replay
+import Trace
+from SortingSteps import Opcode
+
+
+class Timeline:
+    """
+    Keyframes of a trace for seeking to any step of the sorting process.
+
+    Every interval steps a keyframe stores a snapshot of the data and the number of comparisons, swaps and replacements
+    up to that step. Seeking restores the nearest keyframe before the requested step and applies at most interval - 1
+    further steps. The interval is chosen so that all keyframes fit into memory_limit bytes, only the keyframe of the
+    initial data is kept if not even that one fits. The steps are applied by Replay in blocks instead of one after
+    another.
+
+    Positions count the steps that have been applied, i.e. position 0 is the initial data and position len(steps)
+    is the sorted data.
+    """
+
+    def __init__(self, initial_data: np.ndarray, steps: Trace.Trace, memory_limit: int = 64 * 1024 * 1024,
+                 min_interval: int = 1024):
+        # columns of the trace
+        self._columns: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray] = steps.columns()
+
+        # number of steps
+        self._length: int = len(steps)
+
+        # determine interval between keyframes so that the keyframes at 0, interval, 2 * interval, ..., up to length
+        # fit into memory, length // interval + 1 <= max_keyframes, the keyframe at 0 is kept even if it does not fit
+        keyframe_size = initial_data.nbytes + 3 * np.dtype(np.int64).itemsize
+        max_keyframes = max(memory_limit // keyframe_size, 1)
+        self._interval: int = max(min_interval, self._length // max_keyframes + 1)
+
+        # positions of keyframes
+        positions = np.arange(0, self._length + 1, self._interval)
+
+        # number of comparisons, swaps and replacements at the keyframes
+        self._counts: np.ndarray = Replay.counts(self._columns[0], positions)
+
+        # snapshots of the data at the keyframes
+        self._keyframes: np.ndarray = Replay.states(initial_data, self._columns, positions)
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def nbytes(self) -> int:
+        # memory used by the keyframes
+        return self._keyframes.nbytes + self._counts.nbytes
+
+    def seek(self, position: int) -> tuple[np.ndarray, tuple[int, int, int]]:
+        """
+        Parameters
+        ----------
+        position: int
+            Number of steps that have been applied.
+
+        Returns
+        -------
+        np.ndarray
+            Data after the steps up to position have been applied.
+        tuple[int, int, int]
+            Number of comparisons, swaps and replacements up to position.
+        """
+        position = min(max(position, 0), self._length)
+
+        # restore nearest keyframe
+        k = position // self._interval
+        start = k * self._interval
+        state = self._keyframes[k].copy()
+
+        # apply steps from keyframe up to position
+        Replay.apply(state, tuple(column[start:position] for column in self._columns))
+
+        # count steps from keyframe up to position
+        opcodes = self._columns[0][start:position]
+        counts = tuple(int(self._counts[k, column] + np.count_nonzero(opcodes == opcode))
+                       for column, opcode in enumerate((Opcode.COMPARISON, Opcode.SWAP, Opcode.REPLACE)))
+
+        return state, counts
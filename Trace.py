@@ -0,0 +1,415 @@
+from array import array
+import collections
+import queue
+import threading
+
+import numpy as np
+
+import SortingSteps
+from SortingSteps import Opcode
+
+
+class Trace:
+    """
+    Compact, columnar storage for the steps of a sorting process.
+
+    Every step is stored as one row in five NumPy columns instead of as a separate SortingSteps.Step object.
+    Steps are recorded into small buffers which are moved into NumPy chunks whenever a chunk is full, so the
+    trace grows in chunks without ever copying all previously recorded steps.
+
+    Columns
+    -------
+    opcode: int8
+        Type of the step (see SortingSteps.Opcode).
+    pos_1: int32
+        pos_1 of a comparison or swap, pos of a mark or replace and from_pos of a focus.
+    pos_2: int32
+        pos_2 of a comparison or swap, multiple of a mark, height of a replace and to_pos of a focus.
+    delay: bool
+        delay of the step.
+    aux: int32
+        old_height of a replace, so every step can be undone.
+    """
+
+    def __init__(self, chunk_size: int = 65536):
+        # number of steps per chunk
+        self._chunk_size: int = chunk_size
+
+        # completed chunks of the columns
+        self._chunks: list[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+
+        # buffers for the steps of the current chunk
+        self._opcode_buffer = array('b')
+        self._pos_1_buffer = array('i')
+        self._pos_2_buffer = array('i')
+        self._delay_buffer = array('b')
+        self._aux_buffer = array('i')
+
+        # number of recorded steps
+        self._length: int = 0
+
+    @classmethod
+    def from_columns(cls, columns: tuple[np.ndarray, ...], chunk_size: int = 65536) -> 'Trace':
+        # trace whose steps are given by columns as returned by columns()
+        trace = cls(chunk_size)
+        if len(columns[0]):
+            trace._chunks = [tuple(np.ascontiguousarray(column, dtype=dtype) for column, dtype in
+                                   zip(columns, (np.int8, np.int32, np.int32, np.bool_, np.int32)))]
+            trace._length = len(columns[0])
+        return trace
+
+    def record(self, opcode: int, pos_1: int = 0, pos_2: int = 0, delay: bool = True, aux: int = 0) -> None:
+        # append step to buffers
+        self._opcode_buffer.append(opcode)
+        self._pos_1_buffer.append(pos_1)
+        self._pos_2_buffer.append(pos_2)
+        self._delay_buffer.append(delay)
+        self._aux_buffer.append(aux)
+        self._length += 1
+
+        # move buffers to a new chunk if the current chunk is full
+        if len(self._opcode_buffer) >= self._chunk_size:
+            self._flush()
+
+    def record_many(self, opcode: int | np.ndarray, pos_1: int | np.ndarray = 0, pos_2: int | np.ndarray = 0,
+                    delay: bool | np.ndarray = True, aux: int | np.ndarray = 0) -> None:
+        # record steps given as columns at once, a single value is used for all steps
+        length = np.broadcast(opcode, pos_1, pos_2, delay, aux).size
+        columns = tuple(np.broadcast_to(column, length).astype(dtype) for column, dtype in
+                        zip((opcode, pos_1, pos_2, delay, aux), (np.int8, np.int32, np.int32, np.bool_, np.int32)))
+
+        # steps recorded before come first, the steps are moved into chunks right away
+        self._flush()
+        for start in range(0, length, self._chunk_size):
+            self._store(tuple(column[start:start + self._chunk_size] for column in columns))
+        self._length += length
+
+    def append(self, step: SortingSteps.Step) -> None:
+        # encode step and record it
+        self.record(*Trace.encode(step))
+
+    def clear(self) -> None:
+        # drop all recorded steps
+        self._chunks.clear()
+        del self._opcode_buffer[:]
+        del self._pos_1_buffer[:]
+        del self._pos_2_buffer[:]
+        del self._delay_buffer[:]
+        del self._aux_buffer[:]
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> SortingSteps.Step:
+        return Trace.decode(*(column[index] for column in self.columns()))
+
+    def columns(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # merge all chunks into a single chunk
+        self._flush()
+        if len(self._chunks) > 1:
+            self._chunks = [tuple(np.concatenate(column) for column in zip(*self._chunks))]
+
+        if self._chunks:
+            return self._chunks[0]
+
+        return (np.empty(0, dtype=np.int8), np.empty(0, dtype=np.int32),
+                np.empty(0, dtype=np.int32), np.empty(0, dtype=np.bool_), np.empty(0, dtype=np.int32))
+
+    def count(self, opcode: int) -> int:
+        # number of steps of type opcode
+        return int(np.count_nonzero(self.columns()[0] == opcode))
+
+    def markings(self, position: int, window: int = 4096) -> tuple[tuple[int, int] | None, list[int]]:
+        """
+        Determine focused and marked slots after the steps up to position have been visualized.
+
+        The trace is searched backwards from position in windows of the given size for the last focus and the
+        marks since then. Marked slots are followed through the swaps after they have been marked.
+
+        Returns
+        -------
+        tuple[int, int] | None
+            from_pos and to_pos of the focus, None if no slots are focused.
+        list[int]
+            Positions of the marked slots in the order they have been marked.
+        """
+        opcode, pos_1, pos_2, _, _ = self.columns()
+
+        focus = None
+        focus_complete = False
+        marks = []
+        marks_complete = False
+        stop = position
+        while stop > 0 and not (focus_complete and marks_complete):
+            start = max(stop - window, 0)
+            relevant = np.isin(opcode[start:stop], (Opcode.MARK, Opcode.UNMARK, Opcode.FOCUS, Opcode.UNFOCUS))
+            for i in reversed((np.flatnonzero(relevant) + start).tolist()):
+                match int(opcode[i]):
+                    case Opcode.MARK:
+                        if not marks_complete:
+                            marks.append((i, int(pos_1[i])))
+                            # a mark that is not multiple removes all previous marks
+                            marks_complete = not pos_2[i]
+                    case Opcode.UNMARK:
+                        marks_complete = True
+                    case Opcode.FOCUS:
+                        if not focus_complete:
+                            focus = (int(pos_1[i]), int(pos_2[i]))
+                            focus_complete = True
+                        # focusing removes all previous marks
+                        marks_complete = True
+                    case Opcode.UNFOCUS:
+                        focus_complete = True
+
+                if focus_complete and marks_complete:
+                    break
+            stop = start
+
+        # marked slots move along when they are swapped
+        if marks:
+            first = min(index for index, _ in marks)
+            swaps = np.flatnonzero(opcode[first:position] == Opcode.SWAP) + first
+            marks = [[index, pos] for index, pos in marks]
+            for i, p_1, p_2 in zip(swaps.tolist(), pos_1[swaps].tolist(), pos_2[swaps].tolist()):
+                for mark in marks:
+                    if mark[0] < i:
+                        if mark[1] == p_1:
+                            mark[1] = p_2
+                        elif mark[1] == p_2:
+                            mark[1] = p_1
+
+        return focus, [pos for _, pos in marks[::-1]]
+
+    def highlights(self, position: int, window: int = 4096) -> tuple[tuple[int, ...], tuple[int, ...], list[int]]:
+        """
+        Determine compared, swapped and replaced slots after the steps up to position have been visualized, the same
+        as Scene.Scene.apply leaves them.
+
+        The trace is searched backwards from position in windows of the given size. A replaced slot is followed
+        through the swaps after it has been replaced.
+
+        Returns
+        -------
+        tuple[int, ...]
+            Positions of the slots of the last comparison, empty if there has been a swap, replacement or focus since.
+        tuple[int, ...]
+            Positions of the slots of the last swap, empty if there has been a comparison, replacement or focus since.
+        list[int]
+            Position of the last replaced slot, empty if there has been an unreplace or focus since.
+        """
+        opcode, pos_1, pos_2, _, _ = self.columns()
+        compared, swapped, replaced = (), (), []
+
+        i = Trace._find_last(opcode, position, (Opcode.COMPARISON, Opcode.SWAP, Opcode.REPLACE, Opcode.FOCUS), window)
+        if i >= 0 and opcode[i] == Opcode.COMPARISON:
+            compared = (int(pos_1[i]), int(pos_2[i]))
+        elif i >= 0 and opcode[i] == Opcode.SWAP:
+            swapped = (int(pos_1[i]), int(pos_2[i]))
+
+        i = Trace._find_last(opcode, position, (Opcode.REPLACE, Opcode.UNREPLACE, Opcode.FOCUS), window)
+        if i >= 0 and opcode[i] == Opcode.REPLACE:
+            # the replaced slot moves along when it is swapped
+            pos = int(pos_1[i])
+            swaps = np.flatnonzero(opcode[i + 1:position] == Opcode.SWAP) + i + 1
+            for p_1, p_2 in zip(pos_1[swaps].tolist(), pos_2[swaps].tolist()):
+                if pos == p_1:
+                    pos = p_2
+                elif pos == p_2:
+                    pos = p_1
+            replaced = [pos]
+
+        return compared, swapped, replaced
+
+    @staticmethod
+    def _find_last(opcode: np.ndarray, position: int, opcodes: tuple[int, ...], window: int) -> int:
+        # index of the last step before position with one of the opcodes, -1 if there is none, the windows double in
+        # size, so a step far back is found in a few passes
+        stop = position
+        while stop > 0:
+            start = max(stop - window, 0)
+            found = np.flatnonzero(np.isin(opcode[start:stop], opcodes))
+            if len(found):
+                return start + int(found[-1])
+            stop = start
+            window *= 2
+
+        return -1
+
+    @property
+    def nbytes(self) -> int:
+        # memory used by the columns of the trace
+        return sum(column.nbytes for chunk in self._chunks for column in chunk) + \
+            len(self._opcode_buffer) * (self._opcode_buffer.itemsize + self._pos_1_buffer.itemsize +
+                                        self._pos_2_buffer.itemsize + self._delay_buffer.itemsize +
+                                        self._aux_buffer.itemsize)
+
+    @staticmethod
+    def encode(step: SortingSteps.Step) -> tuple[int, int, int, bool, int]:
+        # create row of the trace from a step object
+        match type(step):
+            case SortingSteps.Comparison:
+                return Opcode.COMPARISON, step.pos_1, step.pos_2, step.delay, 0
+            case SortingSteps.Swap:
+                return Opcode.SWAP, step.pos_1, step.pos_2, step.delay, 0
+            case SortingSteps.Mark:
+                return Opcode.MARK, step.pos, step.multiple, step.delay, 0
+            case SortingSteps.Unmark:
+                return Opcode.UNMARK, 0, 0, step.delay, 0
+            case SortingSteps.Focus:
+                return Opcode.FOCUS, step.from_pos, step.to_pos, step.delay, 0
+            case SortingSteps.Unfocus:
+                return Opcode.UNFOCUS, 0, 0, step.delay, 0
+            case SortingSteps.Replace:
+                return Opcode.REPLACE, step.pos, step.height, step.delay, step.old_height
+            case SortingSteps.Unreplace:
+                return Opcode.UNREPLACE, 0, 0, step.delay, 0
+
+    @staticmethod
+    def decode(opcode: int, pos_1: int, pos_2: int, delay: bool, aux: int) -> SortingSteps.Step:
+        # create step object from a row of the trace
+        pos_1, pos_2, delay = int(pos_1), int(pos_2), bool(delay)
+        match int(opcode):
+            case Opcode.COMPARISON:
+                return SortingSteps.Comparison(pos_1=pos_1, pos_2=pos_2, delay=delay)
+            case Opcode.SWAP:
+                return SortingSteps.Swap(pos_1=pos_1, pos_2=pos_2, delay=delay)
+            case Opcode.MARK:
+                return SortingSteps.Mark(pos=pos_1, multiple=bool(pos_2), delay=delay)
+            case Opcode.UNMARK:
+                return SortingSteps.Unmark(delay=delay)
+            case Opcode.FOCUS:
+                return SortingSteps.Focus(from_pos=pos_1, to_pos=pos_2, delay=delay)
+            case Opcode.UNFOCUS:
+                return SortingSteps.Unfocus(delay=delay)
+            case Opcode.REPLACE:
+                return SortingSteps.Replace(pos=pos_1, height=pos_2, old_height=int(aux), delay=delay)
+            case Opcode.UNREPLACE:
+                return SortingSteps.Unreplace(delay=delay)
+
+    def _flush(self) -> None:
+        # move buffers to a new chunk
+        if self._opcode_buffer:
+            self._store(self._take_buffers())
+
+    def _store(self, chunk: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]) -> None:
+        # keep a completed chunk
+        self._chunks.append(chunk)
+
+    def _take_buffers(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # copy buffers into columns and empty them
+        chunk = (np.frombuffer(self._opcode_buffer, dtype=np.int8).copy(),
+                 np.frombuffer(self._pos_1_buffer, dtype=np.int32).copy(),
+                 np.frombuffer(self._pos_2_buffer, dtype=np.int32).copy(),
+                 np.frombuffer(self._delay_buffer, dtype=np.int8).astype(np.bool_),
+                 np.frombuffer(self._aux_buffer, dtype=np.int32).copy())
+        del self._opcode_buffer[:]
+        del self._pos_1_buffer[:]
+        del self._pos_2_buffer[:]
+        del self._delay_buffer[:]
+        del self._aux_buffer[:]
+        return chunk
+
+
+class StepCounter:
+    """
+    Counts the steps of a sorting process by type without keeping them.
+
+    A StepCounter can be used instead of a Trace for recording steps if only the number of steps is needed. Its memory
+    use does not depend on the number of steps.
+    """
+
+    def __init__(self):
+        # number of steps by opcode
+        self._counts: collections.defaultdict[int, int] = collections.defaultdict(int)
+
+    def record(self, opcode: int, pos_1: int = 0, pos_2: int = 0, delay: bool = True, aux: int = 0) -> None:
+        # count step
+        self._counts[opcode] += 1
+
+    def record_many(self, opcode: int | np.ndarray, pos_1: int | np.ndarray = 0, pos_2: int | np.ndarray = 0,
+                    delay: bool | np.ndarray = True, aux: int | np.ndarray = 0) -> None:
+        # count steps given as columns
+        opcode = np.broadcast_to(opcode, np.broadcast(opcode, pos_1, pos_2, delay, aux).size)
+        for op, count in zip(*np.unique(opcode, return_counts=True)):
+            self._counts[int(op)] += int(count)
+
+    def append(self, step: SortingSteps.Step) -> None:
+        # count step
+        self.record(*Trace.encode(step))
+
+    def clear(self) -> None:
+        # reset counts
+        self._counts.clear()
+
+    def __len__(self) -> int:
+        return sum(self._counts.values())
+
+    def count(self, opcode: int) -> int:
+        # number of steps of type opcode
+        return self._counts.get(opcode, 0)
+
+
+class TraceStream(Trace):
+    """
+    Trace that hands its chunks over to a consumer through a bounded buffer instead of keeping them.
+
+    The producer records steps as usual and blocks as soon as the buffer is full, so the memory used by the stream
+    stays flat no matter how many steps are recorded. The consumer takes chunks from the buffer with get_chunk.
+    """
+
+    class Cancelled(Exception):
+        """
+        Raised in the producer when the stream has been cancelled by the consumer.
+        """
+        pass
+
+    def __init__(self, chunk_size: int = 4096, buffer_size: int = 16):
+        Trace.__init__(self, chunk_size)
+
+        # bounded buffer of chunks, None marks the end of the stream
+        self._buffer: queue.Queue = queue.Queue(maxsize=buffer_size)
+
+        # set if the consumer is not interested in further chunks
+        self._cancelled: threading.Event = threading.Event()
+
+    def close(self) -> None:
+        # hand over the remaining steps and mark the end of the stream
+        try:
+            self._flush()
+            self._put(None)
+        except TraceStream.Cancelled:
+            pass
+
+    def cancel(self) -> None:
+        # stop the producer at its next step
+        self._cancelled.set()
+
+    def get_chunk(self, block: bool = True) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray] | None:
+        # wait for the next chunk, returns None at the end of the stream
+        # if block is False then queue.Empty is raised if the next chunk has not been generated yet
+        if not block:
+            return self._buffer.get_nowait() if not self._cancelled.is_set() else None
+
+        while not self._cancelled.is_set():
+            try:
+                return self._buffer.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+        return None
+
+    def _store(self, chunk: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]) -> None:
+        # hand over a completed chunk
+        self._put(chunk)
+
+    def _put(self, chunk: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray] | None) -> None:
+        # wait for free space in the buffer unless the stream is cancelled
+        while True:
+            if self._cancelled.is_set():
+                raise TraceStream.Cancelled()
+            try:
+                self._buffer.put(chunk, timeout=0.1)
+                return
+            except queue.Full:
+                pass
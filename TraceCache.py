@@ -0,0 +1,211 @@
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+import threading
+
+import numpy as np
+
+import Registry
+import Trace
+import TraceOptimizer
+
+
+@dataclass(frozen=True)
+class TraceKey:
+    """
+    Identifies the trace of a sorting process.
+
+    Attributes
+    ----------
+    algorithm, initiator: str
+        Names of the sorting algorithm and the initiator (see Registry).
+    n: int
+        Size of the array that is sorted.
+    seed: int
+        Seed of the random number generator used to create the array and to sort it.
+    """
+    algorithm: str
+    initiator: str
+    n: int
+    seed: int
+
+
+def record(key: TraceKey, optimize: bool = False) -> tuple[np.ndarray, Trace.Trace]:
+    """
+    Create the initial data and record the steps of sorting it, optimized by TraceOptimizer if requested.
+
+    Returns
+    -------
+    np.ndarray
+        Initial data.
+    Trace.Trace
+        Steps of the sorting process.
+    """
+    # the seed determines the initial data and the random choices of the sorting algorithm, so the same key yields
+    # the same trace in every process
+    np.random.seed(key.seed)
+    initial_data = Registry.InitializationAlgorithms[key.initiator].initiate(key.n,
+                                                                             rng=np.random.default_rng(key.seed))
+    steps = Registry.SortingAlgorithms[key.algorithm].sort(initial_data.copy())
+    if optimize:
+        steps = TraceOptimizer.optimize(steps)
+
+    # merge chunks so the trace is transferred as a single chunk
+    steps.columns()
+
+    return initial_data, steps
+
+
+class TraceCache:
+    """
+    Least recently used traces whose total size is bounded by a number of bytes.
+
+    The cache may be used from several threads.
+    """
+
+    def __init__(self, max_bytes: int):
+        # maximum total size of the cached traces and their initial data
+        self._max_bytes: int = max_bytes
+
+        # cached traces with the least recently used first
+        self._entries: OrderedDict[TraceKey, tuple[np.ndarray, Trace.Trace]] = OrderedDict()
+
+        # total size of the cached traces
+        self._nbytes: int = 0
+
+        self._lock = threading.Lock()
+
+    def get(self, key: TraceKey) -> tuple[np.ndarray, Trace.Trace] | None:
+        # cached trace, which becomes the most recently used one
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: TraceKey, initial_data: np.ndarray, steps: Trace.Trace) -> None:
+        size = TraceCache._size(initial_data, steps)
+
+        with self._lock:
+            # replace cached trace of the same key
+            if key in self._entries:
+                self._nbytes -= TraceCache._size(*self._entries.pop(key))
+
+            # traces that do not fit at all are not cached
+            if size > self._max_bytes:
+                return
+
+            # evict least recently used traces until the trace fits
+            while self._nbytes + size > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._nbytes -= TraceCache._size(*evicted)
+
+            self._entries[key] = (initial_data, steps)
+            self._nbytes += size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def __contains__(self, key: TraceKey) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        # total size of the cached traces and their initial data
+        return self._nbytes
+
+    @staticmethod
+    def _size(initial_data: np.ndarray, steps: Trace.Trace) -> int:
+        return initial_data.nbytes + steps.nbytes
+
+
+class Precomputer:
+    """
+    Provides traces from a TraceCache and records traces that are likely to be needed next in a pool of processes.
+
+    Precomputed traces are put into the cache as soon as they are finished. Precomputing the traces of another input
+    cancels all precomputations that have not been started yet.
+    """
+
+    def __init__(self, cache: TraceCache, workers: int | None = None, optimize: bool = False):
+        # cache for recorded traces
+        self._cache: TraceCache = cache
+
+        # True if traces are optimized by TraceOptimizer
+        self._optimize: bool = optimize
+
+        # number of worker processes, by default the number of processors
+        self._workers: int | None = workers
+
+        # pool of processes, created on first use
+        self._executor: ProcessPoolExecutor | None = None
+
+        # precomputations that have not finished yet
+        self._futures: dict[TraceKey, Future] = {}
+
+        # precomputations finish on a thread of the pool, reentrant since callbacks of finished futures are called
+        # right away
+        self._lock = threading.RLock()
+
+    def get(self, key: TraceKey) -> tuple[np.ndarray, Trace.Trace]:
+        """
+        Trace for the key, recorded in the calling thread unless it is cached or already being precomputed.
+        """
+        entry = self._cache.get(key)
+        if entry is not None:
+            return entry
+
+        # wait for a running precomputation, precomputations that have not been started are recorded right away
+        with self._lock:
+            future = self._futures.pop(key, None)
+        if future is not None and not future.cancel():
+            entry = future.result()
+        else:
+            entry = record(key, self._optimize)
+
+        self._cache.put(key, *entry)
+        return entry
+
+    def precompute(self, keys: list[TraceKey]) -> None:
+        with self._lock:
+            # cancel precomputations that are not wanted anymore
+            for key in list(self._futures.keys()):
+                if key not in keys and self._futures[key].cancel():
+                    del self._futures[key]
+
+            # precompute traces that are neither cached nor being precomputed
+            for key in keys:
+                if key not in self._cache and key not in self._futures:
+                    if self._executor is None:
+                        self._executor = ProcessPoolExecutor(max_workers=self._workers)
+                    future = self._executor.submit(record, key, self._optimize)
+                    self._futures[key] = future
+                    future.add_done_callback(lambda future, key=key: self._on_done(key, future))
+
+    def cancel(self) -> None:
+        # cancel all precomputations that have not been started yet
+        self.precompute([])
+
+    def shutdown(self) -> None:
+        # cancel precomputations and release the pool of processes
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            self._futures.clear()
+
+    def _on_done(self, key: TraceKey, future: Future) -> None:
+        # put finished precomputation into the cache, called by a thread of the pool
+        if future.cancelled() or future.exception() is not None:
+            return
+        with self._lock:
+            if self._futures.get(key) is not future:
+                return
+            del self._futures[key]
+        self._cache.put(key, *future.result())
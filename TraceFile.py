@@ -0,0 +1,246 @@
+"""
+Binary file format for the trace of a sorting process.
+
+A trace file holds, in this order and in little-endian byte order:
+
+    magic      8 bytes b'SORTTRC\\x00'
+    version    uint32
+    length     uint32, length of the header
+    header     UTF-8 encoded JSON object with algorithm, initiator, n, seed and dtype of the initial data, padded
+               with spaces so that the initial data starts at a multiple of 8 bytes
+    initial    n values of the initial data
+    steps      one fixed-width record of type RECORD per step
+
+The number of steps follows from the size of the file, so the steps can be written while they are recorded and a file
+that has not been written completely can still be read up to its last complete step.
+"""
+
+import argparse
+from dataclasses import asdict, dataclass
+import json
+import sys
+
+import numpy as np
+
+import Registry
+import Trace
+
+# first bytes of a trace file
+MAGIC = b'SORTTRC\x00'
+
+# version of the file format
+VERSION = 1
+
+# record of a step, the fields correspond to the columns of Trace.Trace
+RECORD = np.dtype([('opcode', 'i1'), ('delay', '?'), ('pos_1', '<i4'), ('pos_2', '<i4'), ('aux', '<i4')])
+
+
+@dataclass
+class Header:
+    """
+    Header of a trace file.
+
+    Attributes
+    ----------
+    algorithm, initiator: str
+        Names of the sorting algorithm and the initiator (see Registry).
+    n: int
+        Size of the data.
+    seed: int | None
+        Seed of the random number generator, None if it has not been seeded.
+    """
+    algorithm: str
+    initiator: str
+    n: int
+    seed: int | None
+
+
+class TraceWriter(Trace.Trace):
+    """
+    Trace that writes its steps to a trace file whenever a chunk is full instead of keeping them.
+
+    The memory used while recording does not depend on the number of steps. The file is complete after close has been
+    called.
+    """
+
+    def __init__(self, path: str, header: Header, initial_data: np.ndarray, chunk_size: int = 65536):
+        Trace.Trace.__init__(self, chunk_size)
+
+        # write header and initial data
+        self._file = open(path, 'wb')
+        _write_head(self._file, header, initial_data)
+
+    def close(self) -> None:
+        # write remaining steps
+        self._flush()
+        self._file.close()
+
+    def _store(self, chunk: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]) -> None:
+        # write completed chunk as records
+        self._file.write(_to_records(chunk).tobytes())
+
+
+class MappedTrace(Trace.Trace):
+    """
+    Read-only trace whose columns are views of the records of a memory-mapped trace file.
+
+    Steps are only read from disk when they are accessed, so opening a trace does not depend on its size.
+    """
+
+    def __init__(self, records: np.ndarray):
+        Trace.Trace.__init__(self)
+
+        # records and views of their fields in the order of the columns of a trace
+        self._records: np.ndarray = records
+        self._columns: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray] = tuple(
+            records[name] for name in ('opcode', 'pos_1', 'pos_2', 'delay', 'aux'))
+        self._length = len(records)
+
+    def record(self, opcode: int, pos_1: int = 0, pos_2: int = 0, delay: bool = True, aux: int = 0) -> None:
+        raise TypeError('a mapped trace is read-only')
+
+    def record_many(self, opcode, pos_1=0, pos_2=0, delay=True, aux=0) -> None:
+        raise TypeError('a mapped trace is read-only')
+
+    def clear(self) -> None:
+        raise TypeError('a mapped trace is read-only')
+
+    def columns(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        return self._columns
+
+    @property
+    def nbytes(self) -> int:
+        # size of the records on disk
+        return self._records.nbytes
+
+
+def write(path: str, header: Header, initial_data: np.ndarray, steps: Trace.Trace) -> None:
+    # write a trace that has been recorded in memory
+    columns = steps.columns()
+    with open(path, 'wb') as file:
+        _write_head(file, header, initial_data)
+        for start in range(0, len(steps), 1 << 20):
+            file.write(_to_records(tuple(column[start:start + (1 << 20)] for column in columns)).tobytes())
+
+
+def read_header(path: str) -> Header:
+    with open(path, 'rb') as file:
+        header, _, _ = _read_head(file)
+    return header
+
+
+def read(path: str) -> tuple[Header, np.ndarray, MappedTrace]:
+    """
+    Open a trace file.
+
+    Returns
+    -------
+    Header
+        Header of the trace file.
+    np.ndarray
+        Initial data.
+    MappedTrace
+        Steps of the sorting process, mapped into memory.
+    """
+    with open(path, 'rb') as file:
+        header, dtype, offset = _read_head(file)
+        initial_data = np.fromfile(file, dtype=dtype, count=header.n)
+        if len(initial_data) < header.n:
+            raise ValueError(f'{path} is truncated')
+        file.seek(0, 2)
+        size = file.tell()
+
+    # map complete records, np.memmap does not support empty maps
+    offset += initial_data.nbytes
+    count = (size - offset) // RECORD.itemsize
+    if count:
+        records = np.memmap(path, dtype=RECORD, mode='r', offset=offset, shape=(count,))
+    else:
+        records = np.empty(0, dtype=RECORD)
+
+    return header, initial_data, MappedTrace(records)
+
+
+def record(path: str, algorithm: str, initiator: str, n: int, seed: int | None = None) -> int:
+    """
+    Sort data created by the initiator with the sorting algorithm (see Registry) and write the trace to path
+    while it is recorded.
+
+    Returns
+    -------
+    int
+        Number of steps.
+    """
+    # seed random number generator used by the sorting algorithms
+    if seed is not None:
+        np.random.seed(seed)
+
+    rng = np.random.default_rng(seed) if seed is not None else None
+    initial_data = Registry.InitializationAlgorithms[initiator].initiate(n, rng=rng)
+
+    steps = TraceWriter(path, Header(algorithm=algorithm, initiator=initiator, n=n, seed=seed), initial_data)
+    try:
+        Registry.SortingAlgorithms[algorithm].record(initial_data.copy(), steps)
+    finally:
+        steps.close()
+
+    return len(steps)
+
+
+def _write_head(file, header: Header, initial_data: np.ndarray) -> None:
+    # write magic, version, header and initial data
+    initial_data = np.asarray(initial_data)
+    dtype = initial_data.dtype.newbyteorder('<')
+    text = json.dumps(dict(asdict(header), dtype=dtype.str)).encode()
+    text += b' ' * (-(len(MAGIC) + 8 + len(text)) % 8)
+
+    file.write(MAGIC + np.array([VERSION, len(text)], dtype='<u4').tobytes() + text)
+    file.write(initial_data.astype(dtype).tobytes())
+
+
+def _read_head(file) -> tuple[Header, np.dtype, int]:
+    # read magic, version and header, returns header, dtype of initial data and offset of initial data
+    magic = file.read(len(MAGIC))
+    if magic != MAGIC:
+        raise ValueError(f'{file.name} is not a trace file')
+
+    version, length = np.frombuffer(file.read(8), dtype='<u4')
+    if version != VERSION:
+        raise ValueError(f'{file.name} has unsupported version {version}')
+
+    fields = json.loads(file.read(int(length)))
+    dtype = np.dtype(fields.pop('dtype'))
+
+    return Header(**fields), dtype, len(MAGIC) + 8 + int(length)
+
+
+def _to_records(columns: tuple[np.ndarray, ...]) -> np.ndarray:
+    # records of the steps in the columns of a trace
+    records = np.empty(len(columns[0]), dtype=RECORD)
+    for name, column in zip(('opcode', 'pos_1', 'pos_2', 'delay', 'aux'), columns):
+        records[name] = column
+    return records
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='Record the trace of a sorting algorithm into a trace file.')
+    parser.add_argument('-a', '--algorithm', required=True, choices=list(Registry.SortingAlgorithms.keys()),
+                        help='sorting algorithm')
+    parser.add_argument('-i', '--initiator', default='Permutation',
+                        choices=list(Registry.InitializationAlgorithms.keys()),
+                        help='initiator used for the data (default: Permutation)')
+    parser.add_argument('-n', '--size', type=int, default=1000,
+                        help='size of the data (default: 1000)')
+    parser.add_argument('-s', '--seed', type=int, default=None,
+                        help='seed of the random number generator (default: not seeded)')
+    parser.add_argument('-o', '--output', required=True,
+                        help='trace file the steps are written to')
+    args = parser.parse_args(argv)
+
+    steps = record(args.output, args.algorithm, args.initiator, args.size, seed=args.seed)
+    print(f'{args.algorithm} / {args.initiator} / n={args.size}: {steps} steps written to {args.output}',
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
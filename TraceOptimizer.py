@@ -0,0 +1,147 @@
+"""
+Pass over a trace that removes steps which do not change what is visualized.
+
+A trace is visualized in frames of steps that end with a delayed step (see Data.Data.get_next_steps), so only the
+state after every delayed step is ever drawn. The pass keeps this state, the delayed steps and the number of
+comparisons, swaps and replacements, while it
+
+- merges runs of non-delayed Mark, Unmark, Focus, Unfocus and Unreplace steps within a frame into their net effect
+  and
+- drops Mark, Unmark, Unfocus and Unreplace steps that do not change anything, such as an Unmark while nothing is
+  marked. The delay of a dropped delayed step moves to the previous step of its frame.
+"""
+
+import numpy as np
+
+import Trace
+from SortingSteps import Opcode
+
+# steps that only change marked, focused or replaced slots
+MARKINGS = (Opcode.MARK, Opcode.UNMARK, Opcode.FOCUS, Opcode.UNFOCUS, Opcode.UNREPLACE)
+
+
+def optimize(steps: Trace.Trace, max_swaps: int = 8) -> Trace.Trace:
+    """
+    Optimize the steps of a sorting process.
+
+    Parameters
+    ----------
+    steps: Trace.Trace
+        Steps of the sorting process, which are not changed.
+    max_swaps: int
+        Number of swaps a marked slot is followed through to detect that marking it again does not change anything.
+
+    Returns
+    -------
+    Trace.Trace
+        Optimized steps.
+    """
+    columns = tuple(column.copy() for column in steps.columns())
+    columns = _compress(columns, _merge_runs(columns))
+    columns = _compress(columns, _drop_no_ops(columns, max_swaps))
+    return Trace.Trace.from_columns(columns)
+
+
+def _merge_runs(columns: tuple[np.ndarray, ...]) -> np.ndarray:
+    # steps that are kept when every run of marking steps within a frame is reduced to its net effect, changes
+    # columns in place
+    opcode, _, pos_2, delay, _ = columns
+    keep = np.ones(len(opcode), dtype=np.bool_)
+
+    # runs of consecutive marking steps of which only the last one may be delayed
+    marking = np.isin(opcode, MARKINGS)
+    start = marking.copy()
+    start[1:] &= ~(marking[:-1] & ~delay[:-1])
+    index = np.flatnonzero(marking)
+    if len(index) == 0:
+        return keep
+    run = np.cumsum(start)[index] - 1
+    offsets = np.flatnonzero(start[index])
+    op = opcode[index]
+
+    def last(condition: np.ndarray) -> np.ndarray:
+        # index of the last step of every run that satisfies condition, -1 if there is none
+        return np.maximum.reduceat(np.where(condition, index, -1), offsets)[run]
+
+    # a focus clears all marks and highlights, so the steps before the last focus of a run do not matter
+    last_focus = last(op == Opcode.FOCUS)
+    keep[index] &= index >= last_focus
+
+    # an unmark or a mark that is not multiple removes all marks, so marks before the last of them do not matter
+    is_mark = op == Opcode.MARK
+    last_reset = last((op == Opcode.UNMARK) | (is_mark & (pos_2[index] == 0)))
+    keep[index] &= ~((is_mark | (op == Opcode.UNMARK)) & (index < last_reset))
+
+    # only the last unfocus and the last unreplace of a run matter
+    keep[index] &= ~((op == Opcode.UNFOCUS) & (index < last(op == Opcode.UNFOCUS)))
+    keep[index] &= ~((op == Opcode.UNREPLACE) & (index < last(op == Opcode.UNREPLACE)))
+
+    # an unmark followed by multiple marks is the same as a mark that is not multiple followed by multiple marks
+    first_mark = np.minimum.reduceat(np.where(is_mark & (index > last_reset), index, len(opcode)), offsets)[run]
+    fold = (op == Opcode.UNMARK) & (index == last_reset) & (first_mark < len(opcode)) & keep[index]
+    keep[index[fold]] = False
+    pos_2[first_mark[fold]] = 0
+
+    return keep
+
+
+def _drop_no_ops(columns: tuple[np.ndarray, ...], max_swaps: int) -> np.ndarray:
+    # steps that are kept when steps that do not change anything are dropped, changes columns in place
+    opcode, pos_1, pos_2, delay, _ = columns
+    index = np.arange(len(opcode))
+
+    def last_before(opcodes: tuple[int, ...]) -> np.ndarray:
+        # index of the last step before every step whose opcode is one of opcodes, -1 if there is none
+        found = np.maximum.accumulate(np.where(np.isin(opcode, opcodes), index, -1))
+        return np.concatenate(([-1], found[:-1]))
+
+    def opcode_at(positions: np.ndarray) -> np.ndarray:
+        # opcode of the steps at positions, -1 for position -1
+        return np.where(positions >= 0, opcode[positions], -1)
+
+    # an unmark while nothing is marked, an unfocus while nothing is focused and an unreplace while nothing is
+    # replaced
+    marks = last_before((Opcode.MARK, Opcode.UNMARK, Opcode.FOCUS))
+    no_op = (opcode == Opcode.UNMARK) & (opcode_at(marks) != Opcode.MARK)
+    no_op |= (opcode == Opcode.UNFOCUS) & (opcode_at(last_before((Opcode.FOCUS, Opcode.UNFOCUS))) != Opcode.FOCUS)
+    no_op |= (opcode == Opcode.UNREPLACE) & \
+        (opcode_at(last_before((Opcode.REPLACE, Opcode.UNREPLACE, Opcode.FOCUS))) != Opcode.REPLACE)
+
+    # a mark that is not multiple of the slot that is the only marked slot, which is followed through the swaps since
+    # it has been marked
+    candidate = np.flatnonzero((opcode == Opcode.MARK) & (pos_2 == 0))
+    previous = marks[candidate]
+    valid = previous >= 0
+    candidate, previous = candidate[valid], previous[valid]
+    valid = (opcode[previous] == Opcode.MARK) & (pos_2[previous] == 0)
+    candidate, previous = candidate[valid], previous[valid]
+    swaps = np.flatnonzero(opcode == Opcode.SWAP)
+    first = np.searchsorted(swaps, previous)
+    count = np.searchsorted(swaps, candidate) - first
+    marked = pos_1[previous]
+    for k in range(min(max_swaps, int(count.max(initial=0)))):
+        active = count > k
+        swap = swaps[np.where(active, first + k, 0)]
+        marked = np.where(active & (marked == pos_1[swap]), pos_2[swap],
+                          np.where(active & (marked == pos_2[swap]), pos_1[swap], marked))
+    no_op[candidate[(count <= max_swaps) & (marked == pos_1[candidate])]] = True
+
+    # a dropped delayed step passes its delay on to the last kept step before it, if that step is in the same frame
+    kept = np.concatenate(([-1], np.maximum.accumulate(np.where(no_op, -1, index))[:-1]))
+    delayed = np.concatenate(([-1], np.maximum.accumulate(np.where(delay, index, -1))[:-1]))
+    moved = np.flatnonzero(no_op & delay)
+    moved = moved[kept[moved] > delayed[moved]]
+    delay[kept[moved]] = True
+
+    # other dropped delayed steps are kept, so the number of frames does not change
+    no_op[np.flatnonzero(no_op & delay)] = False
+    no_op[moved] = True
+
+    return ~no_op
+
+
+def _compress(columns: tuple[np.ndarray, ...], keep: np.ndarray) -> tuple[np.ndarray, ...]:
+    # columns of the kept steps
+    if keep.all():
+        return columns
+    return tuple(column[keep] for column in columns)
@@ -1,12 +1,15 @@
 from dataclasses import dataclass
 import numpy as np
 import tkinter as tk
+import tkinter.filedialog as filedialog
+import tkinter.messagebox as messagebox
 import tkinter.ttk as ttk
 
 import Data
 import Diagram
-import Initiator
-import SortingAlgorithms
+import Registry
+import TraceCache
+import TraceFile
 import Worker
 
 @dataclass
@@ -25,43 +28,83 @@ class Settings:
         Name and a class instance of a sorting algorithm.
 
     data_size: int
-        Size of the array that should be sorted.
+        Default size of the array that should be sorted.
+
+    min_data_size, max_data_size: int
+        Range of sizes that can be chosen for the array that should be sorted.
+
+    diagram_width, diagram_height: int
+        Initial size of the area for the bars in pixels.
+
+    raster: bool
+        If True then the bars are always drawn by a Diagram.RasterDiagram. Otherwise a Diagram.Diagram is used as long
+        as its slots fit into the area for the bars.
+
+    streaming: bool
+        If True then the steps of the sorting process are generated while they are visualized.
+
+    keyframe_memory: int
+        Memory in bytes that may be used by the keyframes of the timeline.
+
+    frame_rate: int
+        Number of frames per second drawn by the visualization.
+
+    trace_cache_memory: int
+        Memory in bytes that may be used by the traces of recently visualized and precomputed sorting processes.
+
+    optimize_traces: bool
+        If True then steps that do not change the visualization are removed from the traces (see TraceOptimizer).
+
+    precompute: bool
+        If True then the traces of the other sorting algorithms for the same data are recorded in the background, so
+        switching the sorting algorithm is instant.
+
+    precompute_max_data_size: int
+        Largest data size for which traces are precomputed.
 
     speed
-        Settings for the speed of the visualization and the associated scale widget.
+        Settings for the speed of the visualization and the associated scale widget. The speed function maps the
+        value of the scale to the delay in seconds after a step, the highest speed visualizes about a million steps
+        per second.
 
     '''
 
-    InitializationAlgorithms = {'Permutation': Initiator.PermutationInitiator(),
-                                'Local': Initiator.LocalInitiator(),
-                                'Transposition': Initiator.TranspositionInitiater(),
-                                'Reverse': Initiator.ReverseInitiator(),
-                                'Sorted': Initiator.SortedInitiator()}
-
-    SortingAlgorithms = {'Selectionsort': SortingAlgorithms.SelectionSorter(),
-                         'Heapsort': SortingAlgorithms.HeapSorter(),
-                         'Insertionsort': SortingAlgorithms.InsertionSorter(),
-                         'Shellsort': SortingAlgorithms.ShellSorter(),
-                         'Bubblesort': SortingAlgorithms.BubbleSorter(),
-                         'Shakersort': SortingAlgorithms.ShakerSorter(),
-                         'Combsort': SortingAlgorithms.CombSorter(),
-                         'Quicksort': SortingAlgorithms.QuickSorter(),
-                         'Quicksort (Median)': SortingAlgorithms.MedianQuickSorter(),
-                         'Quicksort (Random)': SortingAlgorithms.RandomQuickSorter(),
-                         'Mergesort': SortingAlgorithms.MergeSorter(),
-                         'Mergesort (Straight)': SortingAlgorithms.StraightMergeSorter(),
-                         'Mergesort (Natural)': SortingAlgorithms.NaturalMergeSorter(),
-                         'Radixsort': SortingAlgorithms.DecimalRadixSorter(),
-                         'Radixsort (Binary)': SortingAlgorithms.BinaryRadixSorter()}
+    InitializationAlgorithms = Registry.InitializationAlgorithms
+
+    SortingAlgorithms = Registry.SortingAlgorithms
 
     data_size: int = 50
 
+    min_data_size: int = 10
+
+    max_data_size: int = 10000000
+
+    diagram_width: int = 1200
+
+    diagram_height: int = 600
+
+    raster: bool = False
+
+    streaming: bool = False
+
+    keyframe_memory: int = 64 * 1024 * 1024
+
+    frame_rate: int = 60
+
+    trace_cache_memory: int = 256 * 1024 * 1024
+
+    optimize_traces: bool = True
+
+    precompute: bool = True
+
+    precompute_max_data_size: int = 2000
+
     @dataclass
     class Speed:
         scale_speed_from: int = 0
         scale_speed_to: int = 100
-        scale_speed_default_value: int = 40
-        speed_function = lambda x: np.exp(-0.07 * x)
+        scale_speed_default_value: int = 20
+        speed_function = lambda x: np.exp(-0.14 * x)
 
 
 class View(tk.Tk):
@@ -76,16 +119,16 @@ class View(tk.Tk):
         # set window title
         self.title('Sorting Algorithm Visualization')
 
-        # prevent window from being resized
-        self.resizable(width=False, height=False)
+        # let the diagram take up additional space when the window is resized
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(1, weight=1)
 
         # frame for controls
         self.frame_controls = ttk.Frame(master=self)
         self.frame_controls.grid(row=0, column=0, sticky='N')
 
-        # sorting bar diagram widget
-        self.diagram: Diagram.Diagram = Diagram.Diagram(self, Settings.data_size)
-        self.diagram.grid(row=0, column=1)
+        # sorting bar diagram widget, created for the chosen data size
+        self.diagram: Diagram.Diagram | Diagram.RasterDiagram | None = None
 
         # frame for initialization controls
         self.frame_initialization = ttk.LabelFrame(self.frame_controls, text='Initialization')
@@ -128,13 +171,34 @@ class View(tk.Tk):
                                                              self.option_menu_sorting_algorithms_current_value,
                                                              self.option_menu_sorting_algorithms_current_value.get(),
                                                              *list(Settings.SortingAlgorithms.keys()),
-                                                             command=self._on_click_button_initiate)
+                                                             command=self._on_change_sorting_algorithm)
         self.option_menu_sorting_algorithms.grid(row=1, column=1, sticky='WE')
 
+        # label for choosing data size
+        self.label_data_size = ttk.Label(master=self.frame_initialization, text='Data Size:')
+        self.label_data_size.grid(row=2, column=0, sticky='W')
+
+        # spinbox current value for choosing data size
+        self.spinbox_data_size_current_value = tk.IntVar(master=self.frame_initialization, value=Settings.data_size)
+
+        # spinbox for choosing data size
+        self.spinbox_data_size = ttk.Spinbox(master=self.frame_initialization,
+                                             from_=Settings.min_data_size,
+                                             to=Settings.max_data_size,
+                                             textvariable=self.spinbox_data_size_current_value,
+                                             width=10)
+        self.spinbox_data_size.grid(row=2, column=1, sticky='WE')
+        self.spinbox_data_size.bind('<Return>', self._on_click_button_initiate)
+
         # initiate button
         self.button_initiate = ttk.Button(master=self.frame_initialization, text='Initiate',
                                           command=self._on_click_button_initiate)
-        self.button_initiate.grid(row=2, column=1, sticky='WE')
+        self.button_initiate.grid(row=3, column=1, sticky='WE')
+
+        # open button for trace files
+        self.button_open = ttk.Button(master=self.frame_initialization, text='Open...',
+                                      command=self._on_click_button_open)
+        self.button_open.grid(row=4, column=1, sticky='WE')
 
         # label for speed scale
         self.label_speed = ttk.Label(self.frame_visualization, text='Visualization Speed:')
@@ -169,6 +233,37 @@ class View(tk.Tk):
                                            command=self._on_click_button_next_step)
         self.button_next_step.grid(row=1, column=1, sticky='WE')
 
+        # previous step button
+        self.button_previous_step = ttk.Button(master=self.frame_visualization, text='Previous Step',
+                                               command=self._on_click_button_previous_step)
+        self.button_previous_step.grid(row=2, column=1, sticky='WE')
+
+        # reverse button
+        self.button_reverse = ttk.Button(master=self.frame_visualization, text='Reverse',
+                                         command=self._on_click_button_reverse)
+        self.button_reverse.grid(row=3, column=0, sticky='WE')
+
+        # skip to end button
+        self.button_skip_to_end = ttk.Button(master=self.frame_visualization, text='Skip to End',
+                                             command=self._on_click_button_skip_to_end)
+        self.button_skip_to_end.grid(row=3, column=1, sticky='WE')
+
+        # label for timeline scale
+        self.label_timeline = ttk.Label(self.frame_visualization, text='Timeline:')
+        self.label_timeline.grid(row=4, column=0)
+
+        # timeline scale current value
+        self.scale_timeline_current_value = tk.DoubleVar(master=self.frame_visualization, value=0)
+
+        # timeline scale
+        self.scale_timeline = ttk.Scale(master=self.frame_visualization,
+                                        from_=0,
+                                        to=1,
+                                        variable=self.scale_timeline_current_value,
+                                        orient=tk.HORIZONTAL,
+                                        command=self._on_change_scale_timeline)
+        self.scale_timeline.grid(row=4, column=1)
+
         # n label
         self.label_n = ttk.Label(master=self.frame_analysis, text=f'Data Size: {Settings.data_size}')
         self.label_n.grid(row=0, column=0, sticky='W')
@@ -186,33 +281,153 @@ class View(tk.Tk):
         self.label_replace_count.grid(row=3, column=0, sticky='W')
 
         # visualization worker
-        self.visualization_worker = Worker.Worker(self.diagram,
+        self.visualization_worker = Worker.Worker(None,
                                                   callback_on_no_next_step_available=self._on_no_next_step_available,
+                                                  callback_on_no_previous_step_available=
+                                                  self._on_no_previous_step_available,
                                                   callback_on_update_comparison_count=self._on_update_comparison_count,
                                                   callback_on_update_swap_count=self._on_update_swap_count,
                                                   callback_on_update_replace_count=self._on_update_replace_count,
+                                                  callback_on_update_position=self._on_update_position,
                                                   delay=Settings.Speed.speed_function(
-                                                      self.scale_speed_current_value.get()))
+                                                      self.scale_speed_current_value.get()),
+                                                  frame_rate=Settings.frame_rate)
+
+        # cache for traces, which are precomputed for the other sorting algorithms
+        self.trace_cache = TraceCache.TraceCache(Settings.trace_cache_memory)
+        self.precomputer = TraceCache.Precomputer(self.trace_cache, optimize=Settings.optimize_traces)
+
+        # seed of the random number generator that determines the current input
+        self._seed: int = 0
 
         # initiate
         self._on_click_button_initiate()
 
+    def destroy(self) -> None:
+        # stop precomputing traces
+        self.precomputer.shutdown()
+        tk.Tk.destroy(self)
+
     def _on_click_button_initiate(self, *args) -> None:
+        # new input
+        self._seed = int(np.random.SeedSequence().generate_state(1)[0])
+        self._initiate()
+
+    def _on_change_sorting_algorithm(self, *args) -> None:
+        # same input, sorted by the chosen sorting algorithm
+        self._initiate()
+
+    def _initiate(self) -> None:
+        # release previous visualization
+        self.visualization_worker.close_visualization()
+
+        # data that will be visualized
+        n = self._get_data_size()
+        initiator = self.option_menu_initialization_algorithms_current_value.get()
+        algorithm = self.option_menu_sorting_algorithms_current_value.get()
+        if Settings.streaming:
+            self.precomputer.cancel()
+            np.random.seed(self._seed)
+            data = Data.StreamingData(initiator=Settings.InitializationAlgorithms[initiator],
+                                      sorter=Settings.SortingAlgorithms[algorithm], n=n,
+                                      rng=np.random.default_rng(self._seed))
+        else:
+            key = TraceCache.TraceKey(algorithm=algorithm, initiator=initiator, n=n, seed=self._seed)
+            data = Data.Data.from_steps(*self.precomputer.get(key), keyframe_memory=Settings.keyframe_memory)
+
+            # precompute traces of the other sorting algorithms for the same input, which cancels the pending
+            # precomputations for a previous input
+            if Settings.precompute and n <= Settings.precompute_max_data_size:
+                self.precomputer.precompute([TraceCache.TraceKey(algorithm=other, initiator=initiator, n=n,
+                                                                 seed=self._seed)
+                                             for other in Settings.SortingAlgorithms.keys() if other != algorithm])
+            else:
+                self.precomputer.cancel()
+
+        # initiate visualization
+        self._initiate_visualization(data)
+
+    def _on_click_button_open(self) -> None:
+        # choose trace file
+        path = filedialog.askopenfilename(parent=self, title='Open Trace',
+                                          filetypes=[('Traces', '*.trace'), ('All Files', '*')])
+        if not path:
+            return
+
+        # data whose steps are mapped into memory from the trace file
+        try:
+            header = TraceFile.read_header(path)
+            data = Data.Data.from_file(path, keyframe_memory=Settings.keyframe_memory)
+        except (OSError, ValueError) as error:
+            messagebox.showerror(parent=self, title='Open Trace', message=str(error))
+            return
+
+        # show algorithms and data size of the trace
+        if header.initiator in Settings.InitializationAlgorithms:
+            self.option_menu_initialization_algorithms_current_value.set(header.initiator)
+        if header.algorithm in Settings.SortingAlgorithms:
+            self.option_menu_sorting_algorithms_current_value.set(header.algorithm)
+        self.spinbox_data_size_current_value.set(header.n)
+
+        # release previous visualization and initiate visualization
+        self.visualization_worker.close_visualization()
+        self._initiate_visualization(data)
+
+    def _initiate_visualization(self, data: Data.Data) -> None:
         # set gui status
         self.option_menu_initialization_algorithms.config(state='normal')
         self.option_menu_sorting_algorithms.config(state='normal')
         self.button_initiate.config(state='normal')
+        self.button_open.config(state='normal')
         self.button_start_resume.config(state='normal', text='Start')
         self.button_pause.config(state='disabled')
         self.button_next_step.config(state='normal')
+        self.button_previous_step.config(state='disabled')
+        self.button_reverse.config(state='disabled')
+        self.button_skip_to_end.config(state='normal' if data.seekable() else 'disabled')
+
+        # diagram for the data size
+        n = len(data.get_initial_data())
+        self.label_n.config(text=f'Data Size: {n}')
+        self._setup_diagram(n)
+
+        # setup timeline
+        self.scale_timeline.config(to=max(data.get_number_of_steps(), 1))
+        self.scale_timeline.state(['!disabled' if data.seekable() else 'disabled'])
 
         # initiate visualization
-        self.visualization_worker.initiate_visualization(
-            Data.Data(initiator=Settings.InitializationAlgorithms[
-                self.option_menu_initialization_algorithms_current_value.get()],
-                      sorter=Settings.SortingAlgorithms[
-                          self.option_menu_sorting_algorithms_current_value.get()],
-                      n=Settings.data_size))
+        self.visualization_worker.initiate_visualization(data)
+
+    def _get_data_size(self) -> int:
+        # chosen data size within the allowed range
+        try:
+            n = self.spinbox_data_size_current_value.get()
+        except tk.TclError:
+            n = Settings.data_size
+        n = min(max(n, Settings.min_data_size), Settings.max_data_size)
+        self.spinbox_data_size_current_value.set(n)
+
+        return n
+
+    def _setup_diagram(self, n: int) -> None:
+        # use canvas diagram if its slots fit into the area for the bars
+        width, height = Diagram.Diagram.size(n)
+        raster = Settings.raster or width > Settings.diagram_width or height > Settings.diagram_height
+
+        # keep a raster diagram since it fits any number of slots
+        if raster and isinstance(self.diagram, Diagram.RasterDiagram):
+            return
+
+        # replace diagram
+        if self.diagram:
+            self.diagram.destroy()
+        if raster:
+            self.diagram = Diagram.RasterDiagram(self, Settings.diagram_width, Settings.diagram_height)
+            self.diagram.grid(row=0, column=1, sticky='NSEW')
+        else:
+            self.diagram = Diagram.Diagram(self, n)
+            self.diagram.grid(row=0, column=1)
+        self.visualization_worker.set_diagram(self.diagram)
 
     def _on_change_scale_speed(self, *args) -> None:
         # set delay of VisualizationWorker
@@ -223,37 +438,92 @@ class View(tk.Tk):
         self.option_menu_initialization_algorithms.config(state='disabled')
         self.option_menu_sorting_algorithms.config(state='disabled')
         self.button_initiate.config(state='disabled')
+        self.button_open.config(state='disabled')
         self.button_start_resume.config(state='disabled')
         self.button_pause.config(state='normal')
         self.button_next_step.config(state='disabled')
+        self.button_previous_step.config(state='disabled')
+        self.button_reverse.config(state='disabled')
 
         # start visualization
         self.visualization_worker.start_visualization()
 
-    def _on_click_button_pause(self) -> None:
+    def _on_click_button_reverse(self) -> None:
         # setup gui status
-        self.option_menu_initialization_algorithms.config(state='normal')
-        self.option_menu_sorting_algorithms.config(state='normal')
-        self.button_initiate.config(state='normal')
-        self.button_start_resume.config(state='normal', text='Resume')
-        self.button_pause.config(state='disabled')
-        self.button_next_step.config(state='normal')
+        self.option_menu_initialization_algorithms.config(state='disabled')
+        self.option_menu_sorting_algorithms.config(state='disabled')
+        self.button_initiate.config(state='disabled')
+        self.button_open.config(state='disabled')
+        self.button_start_resume.config(state='disabled')
+        self.button_pause.config(state='normal')
+        self.button_next_step.config(state='disabled')
+        self.button_previous_step.config(state='disabled')
+        self.button_reverse.config(state='disabled')
+
+        # start reverse visualization
+        self.visualization_worker.start_reverse_visualization()
 
+    def _on_click_button_pause(self) -> None:
         # pause visualization
         self.visualization_worker.pause_visualization()
 
+        # setup gui status
+        self._set_gui_status_paused()
+
+    def _on_change_scale_timeline(self, value: str) -> None:
+        # seek to the selected step
+        self.visualization_worker.seek(int(float(value)))
+
+        # setup gui status
+        self._set_gui_status_paused()
+
+    def _on_click_button_skip_to_end(self) -> None:
+        # show the sorted data right away
+        self.visualization_worker.skip_to_end()
+
+        # setup gui status
+        self._set_gui_status_paused()
+
     def _on_click_button_next_step(self) -> None:
         # visualize next step
         self.visualization_worker.visualize_next_step()
 
+        # setup gui status
+        self._set_gui_status_paused()
+
+    def _on_click_button_previous_step(self) -> None:
+        # undo previous step
+        self.visualization_worker.visualize_previous_step()
+
+        # setup gui status
+        self._set_gui_status_paused()
+
     def _on_no_next_step_available(self) -> None:
+        # setup gui status
+        self._set_gui_status_paused()
+
+    def _on_no_previous_step_available(self) -> None:
+        # setup gui status
+        self._set_gui_status_paused()
+
+    def _set_gui_status_paused(self) -> None:
+        # enable controls for the steps that are available
+        next_step_available = self.visualization_worker.next_step_available()
+        previous_step_available = self.visualization_worker.previous_step_available()
+
         # setup gui status
         self.option_menu_initialization_algorithms.config(state='normal')
         self.option_menu_sorting_algorithms.config(state='normal')
         self.button_initiate.config(state='normal')
-        self.button_start_resume.config(state='disabled', text='Start')
+        self.button_open.config(state='normal')
+        self.button_start_resume.config(state='normal' if next_step_available else 'disabled',
+                                        text='Resume' if previous_step_available else 'Start')
         self.button_pause.config(state='disabled')
-        self.button_next_step.config(state='disabled')
+        self.button_next_step.config(state='normal' if next_step_available else 'disabled')
+        self.button_previous_step.config(state='normal' if previous_step_available else 'disabled')
+        self.button_reverse.config(state='normal' if previous_step_available else 'disabled')
+        self.button_skip_to_end.config(state='normal' if next_step_available and self.visualization_worker.seekable()
+                                       else 'disabled')
 
     def _on_update_swap_count(self, count: int) -> None:
         # display swap count in label
@@ -265,3 +535,7 @@ class View(tk.Tk):
     def _on_update_replace_count(self, count: int) -> None:
         # display replace count in label
         self.label_replace_count.config(text=f'Replacements: {count}')
+
+    def _on_update_position(self, position: int) -> None:
+        # display position in timeline
+        self.scale_timeline_current_value.set(position)
@@ -1,22 +1,33 @@
 import time
-import threading
+
+import numpy as np
 
 import Data
 import Diagram
-import SortingSteps
+import Scene
 
 
 class Worker:
+    """
+    Visualizes the steps of Data in a Diagram.
+
+    All work is done on the thread of the Tk event loop: frames are scheduled with after() at a fixed frame rate and
+    every frame applies as many steps as the delay allows before the diagram and the callbacks are updated once.
+    """
 
     def __init__(self, diagram: Diagram.Diagram, callback_on_no_next_step_available,
-                 callback_on_update_comparison_count, callback_on_update_swap_count,
-                 callback_on_update_replace_count, delay: float):
+                 callback_on_no_previous_step_available, callback_on_update_comparison_count, callback_on_update_swap_count,
+                 callback_on_update_replace_count, callback_on_update_position, delay: float,
+                 frame_rate: float = 60):
         # diagram used for visualization
         self._diagram: Diagram.Diagram = diagram
 
         # callback executed when no next step is available
         self._callback_on_no_next_step_available = callback_on_no_next_step_available
 
+        # callback executed when no previous step is available
+        self._callback_on_no_previous_step_available = callback_on_no_previous_step_available
+
         # callback executed when a comparison is visualized
         self._callback_on_update_comparison_count = callback_on_update_comparison_count
 
@@ -26,147 +37,211 @@ class Worker:
         # callback executed when a replace is visualized
         self._callback_on_update_replace_count = callback_on_update_replace_count
 
+        # callback executed when the number of visualized steps changes
+        self._callback_on_update_position = callback_on_update_position
+
         # delay for visualization
         self._delay: float = delay
 
-        # thread for visualization
-        self._thread: threading.Thread = None
+        # number of frames per second
+        self._frame_rate: float = frame_rate
 
-        # data to be visualized
-        self._data: Data.Data = None
+        # id of the scheduled frame, None if the visualization is paused
+        self._after_id: str | None = None
 
-        # comparisons visualized count
-        self._comparison_count: int = 0
+        # time at which the current frame is due
+        self._next_frame: float = 0
 
-        # swaps visualized count
-        self._swap_count: int = 0
+        # delayed steps that may be visualized in the current frame
+        self._credit: float = 0
 
-        # replacements visualized count
-        self._replace_count: int = 0
+        # maximum number of delayed steps that are applied at once, the duration of a frame is checked in between
+        self._batch_size: int = 4096
 
-        # interrupt to stop thread
-        self._stop_thread: bool = False
+        # data to be visualized
+        self._data: Data.Data = None
+
+        # state of the visualization
+        self._scene: Scene.Scene = None
 
     def initiate_visualization(self, data: Data.Data):
         # setup data
         self._data = data
-        self._comparison_count = 0
-        self._swap_count = 0
-        self._replace_count = 0
-
-        # execute callback for comparison count
-        self._callback_on_update_comparison_count(self._comparison_count)
-
-        # execute callback for swap count
-        self._callback_on_update_swap_count(self._swap_count)
-
-        # execute callback for replace count
-        self._callback_on_update_replace_count(self._replace_count)
+        self._scene = Scene.Scene(self._data.get_initial_data())
 
         # setup bars in diagram
         self._diagram.create_slots(self._data.get_initial_data())
+        self._draw()
+
+    def close_visualization(self):
+        # stop visualization and release data
+        self.pause_visualization()
+        if self._data:
+            self._data.close()
 
     def start_visualization(self):
         # if there are steps to visualize
         if self._data.next_step_available():
-            # visualize steps in separate thread
-            self._thread = threading.Thread(target=self._visualize_steps, daemon=True)
-            self._stop_thread = False
-            self._thread.start()
+            # visualize frames on the event loop
+            self._start_frames(self._visualize_frame)
 
     def pause_visualization(self):
-        # set interrupt of thread
-        self._stop_thread = True
+        # cancel scheduled frame
+        if self._after_id is not None:
+            self._diagram.after_cancel(self._after_id)
+            self._after_id = None
 
     def visualize_next_step(self):
         # visualize next step if it is available
         if self._data.next_step_available():
-            # visualize next step in separate thread
-            self._thread = threading.Thread(target=self._visualize_step,
-                                            args=(self._data.get_next_step(),), daemon=True)
-            self._thread.start()
+            # visualize steps up to the next delayed step
+            self._scene.apply(self._data.get_next_steps(1))
+            self._draw()
 
             # if after this visualization there is no further next step
             if not self._data.next_step_available():
                 self._finish_visualization()
 
-    def set_delay(self, delay: float) -> None:
-        self._delay = delay
+    def seek(self, position: int):
+        # stop visualization
+        self.pause_visualization()
 
-    def _visualize_steps(self):
-        # visualize steps while there are steps to visualize
-        while self._data.next_step_available():
-            # this flag stops the thread in which this method is running
-            if self._stop_thread:
-                break
+        # restore data after the steps up to position
+        state, counts = self._data.seek(position)
+        self._scene = Scene.Scene(state, counts)
+        self._scene.set_highlights(*self._data.get_highlights())
+        self._scene.set_markings(*self._data.get_markings())
 
-            # visualize next step and wait
-            if self._visualize_step(self._data.get_next_step()):
-                time.sleep(self._delay)
+        # redraw bars in diagram
+        self._diagram.create_slots(state)
+        self._draw()
 
-        # if after this visualization there is no further next step
+        # if there is no further next step
         if not self._data.next_step_available():
             self._finish_visualization()
 
-    def _visualize_step(self, step: SortingSteps.Step) -> bool:
-        # handle step
-        match type(step):
-
-            case SortingSteps.Comparison:
-                # visualize comparison
-                self._diagram.compare_slots(step)
-
-                # increment comparison count
-                self._comparison_count += 1
-
-                # execute callback for comparison count
-                self._callback_on_update_comparison_count(self._comparison_count)
+    def skip_to_end(self):
+        # restore data after the last step and draw it once instead of visualizing the remaining steps
+        self.seek(self._data.get_number_of_steps())
 
-            case SortingSteps.Swap:
-                # visualize swap
-                self._diagram.swap_slots(step)
+    def start_reverse_visualization(self):
+        # if there are steps to undo
+        if self._data.previous_step_available():
+            # visualize frames on the event loop
+            self._start_frames(self._visualize_previous_frame)
 
-                # increment swap count
-                self._swap_count += 1
+    def visualize_previous_step(self):
+        # undo previous step if it is available
+        if self._data.previous_step_available():
+            # undo steps back to the previous delayed step
+            self._undo(self._data.get_previous_steps(1))
+            self._draw()
 
-                # execute callback for swap count
-                self._callback_on_update_swap_count(self._swap_count)
+            # if after this visualization there is no further previous step
+            if not self._data.previous_step_available():
+                self._callback_on_no_previous_step_available()
 
-            case SortingSteps.Mark:
-                # visualize mark
-                self._diagram.mark_slot(step)
+    def next_step_available(self) -> bool:
+        return self._data.next_step_available()
 
-            case SortingSteps.Unmark:
-                # visualize unmark
-                self._diagram.unmark_slots()
+    def previous_step_available(self) -> bool:
+        return self._data.previous_step_available()
 
-            case SortingSteps.Focus:
-                # visualize focus
-                self._diagram.focus_slots(step)
+    def seekable(self) -> bool:
+        return self._data.seekable()
 
-            case SortingSteps.Unfocus:
-                # visualize unfocus
-                self._diagram.unfocus_slots()
-
-            case SortingSteps.Replace:
-                # visualize insert
-                self._diagram.replace_slot(step)
-
-                # increment replace count
-                self._replace_count += 1
-
-                # execute callback for replace count
-                self._callback_on_update_replace_count(self._replace_count)
+    def set_delay(self, delay: float) -> None:
+        self._delay = delay
 
-            case SortingSteps.Unreplace:
-                # visualize uninsert
-                self._diagram.unreplace_slots()
+    def set_diagram(self, diagram: Diagram.Diagram) -> None:
+        # diagram used for the next visualization
+        self.pause_visualization()
+        self._diagram = diagram
+
+    def _start_frames(self, visualize_frame):
+        # stop running visualization
+        self.pause_visualization()
+
+        # visualize first delayed step right away
+        self._credit = 1.0
+        self._next_frame = time.perf_counter()
+        visualize_frame()
+
+    def _visualize_frame(self):
+        self._after_id = None
+
+        # apply as many steps as the delay and the duration of a frame allow and draw their net change
+        applied = False
+        deadline = time.perf_counter() + 1 / self._frame_rate
+        while self._credit >= 1 and self._data.next_step_ready() and time.perf_counter() < deadline:
+            columns = self._data.get_next_steps(min(int(self._credit), self._batch_size))
+            self._credit -= np.count_nonzero(columns[3])
+            self._scene.apply(columns)
+            applied = True
+        if applied:
+            self._draw()
+        self._add_credit()
+
+        # continue while there are steps to visualize
+        if self._data.next_step_ready() or self._data.steps_pending():
+            self._schedule_frame(self._visualize_frame)
+        else:
+            self._finish_visualization()
 
-        return step.delay
+    def _visualize_previous_frame(self):
+        self._after_id = None
+
+        # undo as many steps as the delay and the duration of a frame allow and draw their net change
+        applied = False
+        deadline = time.perf_counter() + 1 / self._frame_rate
+        while self._credit >= 1 and self._data.previous_step_available() and time.perf_counter() < deadline:
+            columns = self._data.get_previous_steps(min(int(self._credit), self._batch_size))
+            self._credit -= np.count_nonzero(columns[3])
+            self._undo(columns)
+            applied = True
+        if applied:
+            self._draw()
+        self._add_credit()
+
+        # continue while there are steps to undo
+        if self._data.previous_step_available():
+            self._schedule_frame(self._visualize_previous_frame)
+        else:
+            self._callback_on_no_previous_step_available()
+
+    def _add_credit(self):
+        # delayed steps for the next frame, credit does not pile up while steps are not ready
+        self._credit = min(self._credit, 1.0) + 1 / (self._frame_rate * self._delay)
+
+    def _schedule_frame(self, visualize_frame):
+        # schedule next frame relative to the due time of the current one, so rounding to milliseconds and late
+        # frames do not make the frame rate drift, frames that are overdue are dropped
+        self._next_frame += 1 / self._frame_rate
+        now = time.perf_counter()
+        if self._next_frame < now:
+            self._next_frame = now
+        self._after_id = self._diagram.after(round((self._next_frame - now) * 1000), visualize_frame)
+
+    def _undo(self, columns: tuple[np.ndarray, ...]):
+        # undo steps, restore highlights and restore focused and marked slots if they have been changed
+        if self._scene.undo(columns):
+            self._scene.set_markings(*self._data.get_markings())
+        self._scene.set_highlights(*self._data.get_highlights())
+
+    def _draw(self):
+        # draw net change of the scene
+        self._diagram.draw_scene(self._scene)
+
+        # execute callbacks for counts and position
+        self._callback_on_update_comparison_count(self._scene.comparison_count)
+        self._callback_on_update_swap_count(self._scene.swap_count)
+        self._callback_on_update_replace_count(self._scene.replace_count)
+        self._callback_on_update_position(self._data.get_position())
 
     def _finish_visualization(self):
         # clean up visualization
-        self._diagram.clean_slots()
+        self._scene.clean()
+        self._diagram.draw_scene(self._scene)
 
         # execute callback for no next step available
         self._callback_on_no_next_step_available()
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+import Framebuffer
+import Scene
+
+
+@pytest.mark.parametrize('n, width', [(10000, 300), (1000, 999), (5000, 64)])
+def test_incremental_aggregates_match_full_recompute(n, width):
+    rng = np.random.default_rng(0)
+    scene = Scene.Scene(rng.integers(1, 50, size=n))
+    framebuffer = Framebuffer.Framebuffer(n, width, 100)
+    framebuffer.reset(scene.heights, max_height=59)
+
+    for _ in range(200):
+        # random swaps and replaces, some of them touching the same columns and the last slots of columns
+        size = int(rng.integers(1, 40))
+        pos_1 = rng.integers(0, n, size=size)
+        pos_2 = np.where(rng.random(size) < 0.5, rng.integers(0, n, size=size),
+                         framebuffer._column_stop[rng.integers(0, width, size=size)] - 1)
+        opcode = rng.integers(1, 7, size=size)
+        opcode[opcode != 1] = 6
+        replaced = rng.integers(0, 60, size=size)
+        pos_2 = np.where(opcode == 6, replaced, pos_2)
+        scene.apply((opcode.astype(np.int8), pos_1.astype(np.int32), pos_2.astype(np.int32)))
+        framebuffer.draw(scene)
+
+        low, high, last = framebuffer._aggregate(scene.heights, framebuffer._column_start, framebuffer._column_stop)
+        assert (framebuffer._low == low).all()
+        assert (framebuffer._high == high).all()
+        assert (framebuffer._last == last).all()
+
+    # the image equals the image of a framebuffer that draws the final scene at once
+    reference = Framebuffer.Framebuffer(n, width, 100)
+    reference.reset(scene.heights, max_height=59)
+    reference.draw(scene)
+    assert (framebuffer.pixels == reference.pixels).all()
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+import Registry
+import Scene
+
+
+def _highlights(scene):
+    return scene.compared, scene.swapped, scene.replaced
+
+
+@pytest.mark.parametrize('algorithm', ['Quicksort', 'Mergesort', 'Timsort', 'Radixsort (LSD)', 'Shellsort'])
+def test_undo_restores_highlights_of_forward_playback(algorithm):
+    data = Registry.InitializationAlgorithms['Permutation'].initiate(60, rng=np.random.default_rng(0))
+    steps = Registry.SortingAlgorithms[algorithm].sort(data.copy())
+    columns = steps.columns()
+    rng = np.random.default_rng(1)
+
+    for _ in range(50):
+        k = int(rng.integers(0, len(steps)))
+        m = int(rng.integers(1, len(steps) - k + 1))
+
+        # do(k)
+        forward = Scene.Scene(data)
+        forward.apply(tuple(column[:k] for column in columns))
+
+        # do(k + m), then undo(m) and restore the highlights from the trace
+        backward = Scene.Scene(data)
+        backward.apply(tuple(column[:k + m] for column in columns))
+        backward.undo(tuple(column[k:k + m] for column in columns))
+        backward.set_highlights(*steps.highlights(k))
+
+        assert _highlights(backward) == _highlights(forward)
+        assert (backward.heights == forward.heights).all()
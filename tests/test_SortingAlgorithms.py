@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+import Replay
+import SortingAlgorithms
+
+
+@pytest.mark.parametrize('cutoff', [64, 1])
+@pytest.mark.parametrize('data', [[5, 5, 5], [0, 0, 0, 0, 0, 0, 0, 0, 0, 0], [0], []])
+def test_binary_radix_sort_of_equal_values(data, cutoff):
+    # a cutoff of 1 partitions every subarray with swap_many, 64 scans every entry
+    data = np.array(data, dtype=np.int64)
+    sorted_data = data.copy()
+    steps = SortingAlgorithms.BinaryRadixSorter(cutoff=cutoff).sort(sorted_data)
+
+    assert (sorted_data == data).all()
+    assert steps.count(0) == steps.count(1) == 0
+
+
+@pytest.mark.parametrize('cutoff', [64, 1])
+def test_binary_radix_sort_of_few_values(cutoff):
+    data = np.random.default_rng(0).integers(-3, 3, size=200)
+    sorted_data = data.copy()
+    steps = SortingAlgorithms.BinaryRadixSorter(cutoff=cutoff).sort(sorted_data)
+    assert (sorted_data == np.sort(data)).all()
+
+    replayed = data.copy()
+    Replay.apply(replayed, steps.columns())
+    assert (replayed == sorted_data).all()
@@ -0,0 +1,53 @@
+import json
+import os
+
+import Sweep
+
+
+def _run_job_crashing_heapsort(job, time_limit, measure_memory, count_only):
+    # the worker process dies on Heapsort, every other job finishes at once
+    if job.algorithm == 'Heapsort':
+        os._exit(1)
+    record = Sweep.asdict(job)
+    record['status'] = 'ok'
+    return record
+
+
+def _statuses(path):
+    with open(path) as file:
+        return [(record['algorithm'], record['n'], record['status']) for record in map(json.loads, file)]
+
+
+def test_crash_is_charged_to_its_job_only(tmp_path, monkeypatch):
+    # the worker processes are forked, so they run the patched job
+    monkeypatch.setattr(Sweep, '_run_job', _run_job_crashing_heapsort)
+    path = str(tmp_path / 'sweep.jsonl')
+    jobs = [Sweep.SweepJob(algorithm=algorithm, initiator='Permutation', n=n, seed=0)
+            for algorithm in ('Heapsort', 'Mergesort', 'Quicksort') for n in (100, 200, 300, 3000)]
+
+    for workers in (1, 3):
+        if os.path.exists(path):
+            os.remove(path)
+        Sweep.run_sweep(jobs, path, workers=workers, retries=1)
+
+        statuses = _statuses(path)
+        assert len(statuses) == len(jobs)
+        assert sorted(status for status in statuses if status[2] == 'crashed') == \
+            [('Heapsort', n, 'crashed') for n in (100, 200, 300, 3000)]
+
+
+def test_resume_runs_failed_jobs_again(tmp_path, monkeypatch):
+    monkeypatch.setattr(Sweep, '_run_job', _run_job_crashing_heapsort)
+    path = str(tmp_path / 'sweep.jsonl')
+    jobs = [Sweep.SweepJob(algorithm=algorithm, initiator='Permutation', n=100, seed=0)
+            for algorithm in ('Heapsort', 'Mergesort')]
+    Sweep.run_sweep(jobs, path, workers=2, retries=0)
+    assert Sweep.load_completed_jobs(path) == {jobs[1]}
+    assert Sweep.load_completed_jobs(path, skip_failed=True) == set(jobs)
+
+    # only the crashed job is run again
+    Sweep.run_sweep(jobs, path, workers=2, retries=0)
+    assert _statuses(path)[2:] == [('Heapsort', 100, 'crashed')]
+
+    Sweep.run_sweep(jobs, path, workers=2, retries=0, skip_failed=True)
+    assert len(_statuses(path)) == 3
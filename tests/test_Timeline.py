@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+import Registry
+import Replay
+import Timeline
+
+
+@pytest.mark.parametrize('keyframes', [0, 1, 2, 3, 7])
+def test_keyframes_fit_into_memory_limit(keyframes):
+    data = Registry.InitializationAlgorithms['Permutation'].initiate(300, rng=np.random.default_rng(0))
+    steps = Registry.SortingAlgorithms['Bubblesort'].sort(data.copy())
+    keyframe_size = data.nbytes + 3 * np.dtype(np.int64).itemsize
+    memory_limit = keyframes * keyframe_size + keyframe_size // 2
+
+    timeline = Timeline.Timeline(data, steps, memory_limit=memory_limit, min_interval=1)
+    assert timeline.nbytes <= max(memory_limit, keyframe_size)
+
+    # seeking is not affected by the number of keyframes
+    rng = np.random.default_rng(1)
+    for position in [0, len(steps)] + rng.integers(0, len(steps), size=10).tolist():
+        state, _ = timeline.seek(position)
+        expected = data.copy()
+        Replay.apply(expected, tuple(column[:position] for column in steps.columns()))
+        assert (state == expected).all()